@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from hirerank.background_jobs.scoring import AnalysisStateStore, ScoringCoordinator
+from hirerank.background_jobs.worker import Worker, build_failure_handlers, build_task_handlers
+from hirerank.imports.service import import_settings_from_env
+from hirerank.storage.backends import STORAGE_BACKENDS, open_repositories
+
+
+def _rebuild_insights(args: argparse.Namespace) -> int:
+    repositories = open_repositories(Path(args.storage_dir).resolve(), args.backend)
+    if args.job_id:
+        if not args.owner_id:
+            raise SystemExit("--owner-id is required together with --job-id.")
+        repositories.insights.rebuild(args.owner_id, args.job_id)
+        print(f"Rebuilt insights for job '{args.job_id}'.")
+    else:
+        count = repositories.insights.rebuild_all()
+        print(f"Rebuilt insights for {count} job(s).")
+    return 0
+
+
+def _run_workers(args: argparse.Namespace) -> int:
+    repositories = open_repositories(Path(args.storage_dir).resolve(), args.backend)
+    coordinator = ScoringCoordinator(
+        config_repo=repositories.scoring_configs,
+        result_repo=repositories.scores,
+        state_store=AnalysisStateStore(
+            repositories.analysis_states,
+            max_entries=int(os.getenv("HIRERANK_ANALYSIS_STATE_MAX_ENTRIES", "10000")),
+            ttl=timedelta(hours=float(os.getenv("HIRERANK_ANALYSIS_STATE_TTL_HOURS", "168"))),
+        ),
+    )
+    handlers = build_task_handlers(repositories, coordinator, import_settings_from_env())
+    workers = [
+        Worker(
+            repositories.tasks,
+            handlers,
+            visibility_timeout=timedelta(seconds=args.visibility_timeout),
+            poll_interval=args.poll_interval,
+            max_leases_per_owner=args.owner_concurrency or None,
+            failure_handlers=build_failure_handlers(repositories),
+        )
+        for _ in range(max(1, args.concurrency))
+    ]
+    if args.burst:
+        processed = sum(worker.run_until_idle() for worker in workers)
+        print(f"Processed {processed} task(s).")
+        return 0
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    threads = [
+        threading.Thread(target=worker.run, args=(stop,), name=f"hirerank-worker-{index}")
+        for index, worker in enumerate(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    print(f"Started {len(threads)} worker(s); waiting for tasks.")
+    # Leased tasks finish before exit; anything still queued stays in the table.
+    for thread in threads:
+        thread.join()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="hirerank")
+    parser.add_argument("--storage-dir", default=os.getenv("HIRERANK_STORAGE_DIR", ".data"))
+    parser.add_argument(
+        "--backend",
+        default=os.getenv("HIRERANK_STORAGE_BACKEND", "json").strip().lower(),
+        choices=STORAGE_BACKENDS,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-insights", help="Recompute job insight aggregates from primary storage.")
+    rebuild.add_argument("--owner-id")
+    rebuild.add_argument("--job-id")
+    rebuild.set_defaults(handler=_rebuild_insights)
+
+    worker = commands.add_parser("worker", help="Claim and run queued import and rescore tasks.")
+    worker.add_argument("--concurrency", type=int, default=int(os.getenv("HIRERANK_WORKER_CONCURRENCY", "1")))
+    worker.add_argument(
+        "--visibility-timeout",
+        type=float,
+        default=float(os.getenv("HIRERANK_TASK_VISIBILITY_TIMEOUT_S", "300")),
+        help="Seconds a claimed task stays hidden from other workers without a heartbeat.",
+    )
+    worker.add_argument(
+        "--owner-concurrency",
+        type=int,
+        default=int(os.getenv("HIRERANK_WORKER_OWNER_CONCURRENCY", "2")),
+        help="Most tasks one owner may have running at once; 0 disables the cap.",
+    )
+    worker.add_argument("--poll-interval", type=float, default=1.0)
+    worker.add_argument("--burst", action="store_true", help="Exit once the queue is empty.")
+    worker.set_defaults(handler=_run_workers)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+from hirerank.scoring.engine import GitHubAnalysis, ResumeAnalysis
+
+
+@dataclass
+class CandidateAnalysisState:
+    candidate_id: str
+    job_id: str
+    resume_analysis: Optional[ResumeAnalysis] = None
+    github_analysis: Optional[GitHubAnalysis] = None
+    github_url: Optional[str] = None
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+    def ready_for_scoring(self, github_required: bool) -> bool:
+        if self.resume_analysis is None:
+            return False
+        if self.github_analysis is not None:
+            return True
+        if github_required:
+            return False
+        return not self.github_url
+
+
+@dataclass
+class QueuedTask:
+    task_id: str
+    kind: str
+    payload: Dict[str, object]
+    attempts: int = 0
+    max_attempts: int = 5
+    fair_key: Optional[str] = None
+    ref: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
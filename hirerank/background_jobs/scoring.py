@@ -1,55 +1,135 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+from hirerank.background_jobs.models import CandidateAnalysisState
 from hirerank.scoring.config import ScoringConfig
-from hirerank.scoring.engine import GitHubAnalysis, ResumeAnalysis, compute_score
-from hirerank.scoring.models import ScoreResult
-from hirerank.storage.scoring_config_repository import ScoringConfigRepository
-from hirerank.storage.scoring_repository import ScoringRepository
-
-
-@dataclass
-class CandidateAnalysisState:
-    candidate_id: str
-    job_id: str
-    resume_analysis: Optional[ResumeAnalysis] = None
-    github_analysis: Optional[GitHubAnalysis] = None
-    github_url: Optional[str] = None
-
-    def ready_for_scoring(self, github_required: bool) -> bool:
-        if self.resume_analysis is None:
-            return False
-        if self.github_analysis is not None:
-            return True
-        if github_required:
-            return False
-        return not self.github_url
-
-
-@dataclass
+from hirerank.scoring.engine import (
+    GitHubAnalysis,
+    ResumeAnalysis,
+    compute_score,
+    compute_scores_batch,
+    rescore_batch,
+    score_fingerprint,
+    score_fingerprints,
+)
+from hirerank.scoring.models import ScoreBatch, ScoreResult
+from hirerank.storage.backends import open_repositories
+from hirerank.storage.protocols import AnalysisStatePersistence, ScoreStore, ScoringConfigStore
+from hirerank.storage.unit_of_work import UnitOfWork
+
+
+_StateKey = Tuple[str, str]
+
+
 class AnalysisStateStore:
-    _state: Dict[str, CandidateAnalysisState] = field(default_factory=dict)
+    # Pending analysis states live in a bounded LRU. With persistence configured,
+    # states still waiting on an analysis are written through (and spilled on
+    # eviction), so they survive restarts; scored states are deleted.
+    def __init__(
+        self,
+        persistence: Optional[AnalysisStatePersistence] = None,
+        max_entries: int = 10000,
+        ttl: timedelta = timedelta(days=7),
+        purge_interval: timedelta = timedelta(hours=1),
+    ) -> None:
+        self.persistence = persistence
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[_StateKey, CandidateAnalysisState]" = OrderedDict()
+        self._persisted: Set[_StateKey] = set()
+        self._last_purge = datetime.utcnow()
 
     def get_or_create(self, candidate_id: str, job_id: str) -> CandidateAnalysisState:
-        key = f"{job_id}:{candidate_id}"
-        if key not in self._state:
-            self._state[key] = CandidateAnalysisState(candidate_id=candidate_id, job_id=job_id)
-        return self._state[key]
+        key = (job_id, candidate_id)
+        now = datetime.utcnow()
+        with self._lock:
+            self._maybe_purge(now)
+            state = self._entries.get(key)
+            if state is None and self.persistence is not None:
+                state = self.persistence.get(job_id, candidate_id)
+                if state is not None:
+                    self._persisted.add(key)
+            if state is not None and now - state.updated_at > self.ttl:
+                state = None
+            if state is None:
+                state = CandidateAnalysisState(candidate_id=candidate_id, job_id=job_id)
+            self._entries[key] = state
+            self._entries.move_to_end(key)
+            self._evict()
+            return state
+
+    def save_pending(self, states: Iterable[CandidateAnalysisState]) -> None:
+        now = datetime.utcnow()
+        states = list(states)
+        for state in states:
+            state.updated_at = now
+        if self.persistence is None or not states:
+            return
+        with self._lock:
+            self.persistence.save_many(states)
+            self._persisted.update((state.job_id, state.candidate_id) for state in states)
+
+    def complete(self, states: Iterable[CandidateAnalysisState]) -> None:
+        with self._lock:
+            persisted = []
+            for state in states:
+                key = (state.job_id, state.candidate_id)
+                self._entries.pop(key, None)
+                if key in self._persisted:
+                    self._persisted.discard(key)
+                    persisted.append(key)
+            if persisted and self.persistence is not None:
+                self.persistence.delete_many(persisted)
+
+    def purge_expired(self) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            self._last_purge = now
+            expired = [key for key, state in self._entries.items() if now - state.updated_at > self.ttl]
+            for key in expired:
+                del self._entries[key]
+                self._persisted.discard(key)
+            if self.persistence is None:
+                return len(expired)
+            # Keys of evicted states are reloaded on demand; dropping them keeps this set bounded.
+            self._persisted.intersection_update(self._entries)
+            return self.persistence.delete_expired(now - self.ttl)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        spilled = []
+        while len(self._entries) > self.max_entries:
+            key, state = self._entries.popitem(last=False)
+            if key not in self._persisted:
+                spilled.append(state)
+        if spilled and self.persistence is not None:
+            self.persistence.save_many(spilled)
+            self._persisted.update((state.job_id, state.candidate_id) for state in spilled)
+
+    def _maybe_purge(self, now: datetime) -> None:
+        if now - self._last_purge >= self.purge_interval:
+            self.purge_expired()
 
 
 class ScoringCoordinator:
     def __init__(
         self,
-        config_repo: ScoringConfigRepository,
-        result_repo: ScoringRepository,
+        config_repo: ScoringConfigStore,
+        result_repo: ScoreStore,
         state_store: Optional[AnalysisStateStore] = None,
     ) -> None:
         self.config_repo = config_repo
         self.result_repo = result_repo
-        self.state_store = state_store or AnalysisStateStore()
+        self.state_store = state_store if state_store is not None else AnalysisStateStore()
 
     def on_resume_parsed(
         self,
@@ -57,27 +137,108 @@ class ScoringCoordinator:
         job_id: str,
         resume_analysis: ResumeAnalysis,
         github_url: Optional[str],
+        unit_of_work: Optional[UnitOfWork] = None,
     ) -> Optional[ScoreResult]:
         state = self.state_store.get_or_create(candidate_id, job_id)
         state.resume_analysis = resume_analysis
         state.github_url = github_url
-        return self._maybe_score(state)
+        return self._maybe_score(state, unit_of_work)
 
     def on_github_analysis_completed(
         self,
         candidate_id: str,
         job_id: str,
         github_analysis: GitHubAnalysis,
+        unit_of_work: Optional[UnitOfWork] = None,
     ) -> Optional[ScoreResult]:
         state = self.state_store.get_or_create(candidate_id, job_id)
         state.github_analysis = github_analysis
-        return self._maybe_score(state)
+        return self._maybe_score(state, unit_of_work)
+
+    def on_analyses_completed(
+        self,
+        analyses: Iterable[CandidateAnalysisState],
+        unit_of_work: Optional[UnitOfWork] = None,
+    ) -> Sequence[ScoreResult]:
+        # Batch form of on_resume_parsed + on_github_analysis_completed: merge
+        # each analysis into its state, then score every ready candidate per job
+        # in one vectorized pass and one write. Candidates whose stored score
+        # already has the same fingerprint are neither rescored nor rewritten.
+        ready: Dict[str, List[CandidateAnalysisState]] = {}
+        configs: Dict[str, ScoringConfig] = {}
+        touched: Dict[Tuple[str, str], CandidateAnalysisState] = {}
+        for analysis in analyses:
+            state = self.state_store.get_or_create(analysis.candidate_id, analysis.job_id)
+            touched[(state.job_id, state.candidate_id)] = state
+            state.resume_analysis = analysis.resume_analysis
+            state.github_url = analysis.github_url
+            if analysis.github_analysis is not None:
+                state.github_analysis = analysis.github_analysis
+            if state.job_id not in configs:
+                configs[state.job_id] = self.config_repo.get(state.job_id)
+            if state.ready_for_scoring(configs[state.job_id].github_required):
+                ready.setdefault(state.job_id, []).append(state)
+
+        batches: List[ScoreBatch] = []
+        unchanged: Set[Tuple[str, str]] = set()
+        for job_id, states in ready.items():
+            stored = self.result_repo.get_fingerprints(job_id, [state.candidate_id for state in states])
+            if stored:
+                fingerprints = score_fingerprints(
+                    configs[job_id],
+                    [state.resume_analysis for state in states],
+                    [state.github_analysis for state in states],
+                )
+                changed = []
+                for state, fingerprint in zip(states, fingerprints):
+                    if stored.get(state.candidate_id) == fingerprint:
+                        unchanged.add((job_id, state.candidate_id))
+                    else:
+                        changed.append(state)
+                states = changed
+            if not states:
+                continue
+            batches.append(
+                compute_scores_batch(
+                    configs[job_id],
+                    [state.resume_analysis for state in states],
+                    [state.github_analysis for state in states],
+                    [state.candidate_id for state in states],
+                )
+            )
+        results = ScoreBatch.concat(batches)
+        self._save(results, unit_of_work)
+        scored = set(zip(results.job_ids, results.candidate_ids)) | unchanged
+        self.state_store.complete(state for key, state in touched.items() if key in scored)
+        self.state_store.save_pending(state for key, state in touched.items() if key not in scored)
+        return results
 
-    def _maybe_score(self, state: CandidateAnalysisState) -> Optional[ScoreResult]:
+    def rescore_job(self, config: ScoringConfig) -> int:
+        # rescore_batch recomputes the total and timestamp, so only read what it keeps.
+        results = self.result_repo.list_by_job(config.job_id, fields=("breakdown", "config_version", "fingerprint"))
+        rescored = rescore_batch(
+            [result for result in results.values() if result.config_version != config.version], config
+        )
+        self.result_repo.save_many(rescored)
+        return len(rescored)
+
+    def _maybe_score(
+        self,
+        state: CandidateAnalysisState,
+        unit_of_work: Optional[UnitOfWork] = None,
+    ) -> Optional[ScoreResult]:
         config = self.config_repo.get(state.job_id)
         if not state.ready_for_scoring(config.github_required):
+            self.state_store.save_pending([state])
             return None
 
+        fingerprint = score_fingerprint(config, state.resume_analysis, state.github_analysis)
+        stored = self.result_repo.get_many(state.job_id, [state.candidate_id]).get(state.candidate_id)
+        if stored is not None and stored.fingerprint == fingerprint:
+            # Duplicate delivery or unchanged re-import: the stored score is current.
+            self.state_store.complete([state])
+            return stored
+
         result = compute_score(
             candidate_id=state.candidate_id,
             job_id=state.job_id,
@@ -85,11 +246,21 @@ class ScoringCoordinator:
             resume=state.resume_analysis,
             github=state.github_analysis,
         )
-        self.result_repo.save(result)
+        self._save([result], unit_of_work)
+        self.state_store.complete([state])
         return result
 
+    def _save(self, results: Sequence[ScoreResult], unit_of_work: Optional[UnitOfWork]) -> None:
+        if unit_of_work is not None:
+            unit_of_work.save_scores(results)
+        else:
+            self.result_repo.save_many(results)
+
 
-def build_default_coordinator(storage_root: Path) -> ScoringCoordinator:
-    config_repo = ScoringConfigRepository(storage_root / "scoring_configs.json")
-    result_repo = ScoringRepository(storage_root / "scoring_results.json")
-    return ScoringCoordinator(config_repo=config_repo, result_repo=result_repo)
+def build_default_coordinator(storage_root: Path, backend: str = "json") -> ScoringCoordinator:
+    repositories = open_repositories(storage_root, backend)
+    return ScoringCoordinator(
+        config_repo=repositories.scoring_configs,
+        result_repo=repositories.scores,
+        state_store=AnalysisStateStore(repositories.analysis_states),
+    )
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from uuid import uuid4
+
+from hirerank.background_jobs.models import QueuedTask
+from hirerank.background_jobs.scoring import ScoringCoordinator
+from hirerank.imports.models import CandidateImportJob
+from hirerank.imports.service import ImportSettings, fail_import_task, process_import_task
+from hirerank.storage.backends import Repositories
+from hirerank.storage.protocols import TaskQueue
+
+IMPORT_TASK = "import"
+RESCORE_TASK = "rescore"
+
+
+@dataclass(frozen=True)
+class Requeue:
+    # Returned by a handler that stopped early; the task goes back on the queue
+    # with this much remaining work instead of completing.
+    cost: float
+
+
+TaskHandler = Callable[[Dict[str, object]], Optional[Requeue]]
+# Called with the payload and last error once a task has used up its attempts.
+FailureHandler = Callable[[Dict[str, object], str], None]
+
+
+def enqueue_import_task(
+    queue: TaskQueue,
+    job: CandidateImportJob,
+    source: Path,
+    task_rows: int,
+    weight: float = 1.0,
+) -> QueuedTask:
+    # Imports are queued fairly per owner; each slice costs the rows it will process.
+    return queue.enqueue(
+        IMPORT_TASK,
+        {"import_id": job.import_id, "owner_id": job.owner_id, "job_id": job.job_id, "source": str(source)},
+        fair_key=job.owner_id,
+        cost=_import_cost(job, task_rows),
+        weight=weight,
+        ref=job.import_id,
+    )
+
+
+def _import_cost(job: CandidateImportJob, task_rows: int) -> float:
+    # Rows are only counted once the first slice runs; until then assume a full slice.
+    remaining = task_rows if job.status == "queued" else job.total_rows - job.processed_rows
+    return float(min(max(remaining, 1), max(task_rows, 1)))
+
+
+def build_task_handlers(
+    repositories: Repositories,
+    coordinator: ScoringCoordinator,
+    settings: ImportSettings,
+) -> Dict[str, TaskHandler]:
+    def run_import(payload: Dict[str, object]) -> Optional[Requeue]:
+        job = process_import_task(payload, repositories.imports, repositories.applications, coordinator, settings)
+        # Send the next slice back behind whatever other owners have waiting.
+        return Requeue(cost=_import_cost(job, settings.task_rows)) if job is not None else None
+
+    def run_rescore(payload: Dict[str, object]) -> Optional[Requeue]:
+        # Rescoring reads the latest config, so a burst of config updates converges on the last one.
+        coordinator.rescore_job(coordinator.config_repo.get(str(payload["job_id"])))
+        return None
+
+    return {IMPORT_TASK: run_import, RESCORE_TASK: run_rescore}
+
+
+def build_failure_handlers(repositories: Repositories) -> Dict[str, FailureHandler]:
+    def fail_import(payload: Dict[str, object], error: str) -> None:
+        fail_import_task(payload, repositories.imports, error)
+
+    return {IMPORT_TASK: fail_import}
+
+
+class Worker:
+    def __init__(
+        self,
+        queue: TaskQueue,
+        handlers: Dict[str, TaskHandler],
+        worker_id: Optional[str] = None,
+        visibility_timeout: timedelta = timedelta(minutes=5),
+        retry_delay: timedelta = timedelta(seconds=30),
+        max_retry_delay: timedelta = timedelta(hours=1),
+        poll_interval: float = 1.0,
+        max_leases_per_owner: Optional[int] = None,
+        failure_handlers: Optional[Dict[str, FailureHandler]] = None,
+    ) -> None:
+        self.queue = queue
+        self.handlers = handlers
+        self.failure_handlers = failure_handlers or {}
+        self.worker_id = worker_id or str(uuid4())
+        self.visibility_timeout = visibility_timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.poll_interval = poll_interval
+        self.max_leases_per_owner = max_leases_per_owner
+
+    def run(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            if not self.run_once():
+                stop.wait(self.poll_interval)
+
+    def run_until_idle(self) -> int:
+        processed = 0
+        while self.run_once():
+            processed += 1
+        return processed
+
+    def run_once(self) -> bool:
+        task = self.queue.claim(self.worker_id, self.visibility_timeout, self.max_leases_per_owner)
+        if task is None:
+            return False
+        if task.attempts > task.max_attempts:
+            # The last attempt's lease ran out, so its worker died; give up without running it again.
+            self._give_up(task, task.last_error or "Lease expired.")
+            return True
+        # Long imports outlive a single lease, so keep extending it while the handler runs.
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task, done), daemon=True)
+        heartbeat.start()
+        try:
+            handler = self.handlers.get(task.kind)
+            if handler is None:
+                raise ValueError(f"Unsupported task kind '{task.kind}'.")
+            requeue = handler(task.payload)
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+            if task.attempts >= task.max_attempts:
+                self._give_up(task, error)
+            else:
+                delay = min(self.retry_delay * 2 ** (task.attempts - 1), self.max_retry_delay)
+                self.queue.fail(task.task_id, self.worker_id, error, delay)
+        else:
+            if requeue is not None:
+                self.queue.requeue(task.task_id, self.worker_id, requeue.cost)
+            else:
+                self.queue.complete(task.task_id, self.worker_id)
+        finally:
+            done.set()
+            heartbeat.join()
+        return True
+
+    def _give_up(self, task: QueuedTask, error: str) -> None:
+        on_failure = self.failure_handlers.get(task.kind)
+        try:
+            if on_failure is not None:
+                on_failure(task.payload, error)
+        except Exception:
+            # Leave the lease to expire; the next claim marks the task failed outright.
+            return
+        self.queue.fail(task.task_id, self.worker_id, error, timedelta(0))
+
+    def _heartbeat(self, task: QueuedTask, done: threading.Event) -> None:
+        interval = self.visibility_timeout.total_seconds() / 3
+        while not done.wait(interval):
+            if not self.queue.extend(task.task_id, self.worker_id, self.visibility_timeout):
+                return
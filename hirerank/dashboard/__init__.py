@@ -1,15 +1,23 @@
 from hirerank.dashboard.models import (
     CandidateApplication,
     CandidateDashboardEntry,
+    CandidatePage,
     JobInsights,
+    JobInsightsAggregate,
+    JobSimulation,
     ScoreDistributionBucket,
+    SimulatedCandidate,
     SkillMatchCount,
 )
 
 __all__ = [
     "CandidateApplication",
     "CandidateDashboardEntry",
+    "CandidatePage",
     "JobInsights",
+    "JobInsightsAggregate",
+    "JobSimulation",
     "ScoreDistributionBucket",
+    "SimulatedCandidate",
     "SkillMatchCount",
 ]
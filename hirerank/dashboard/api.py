@@ -1,48 +1,111 @@
 from __future__ import annotations
 
+import csv
+import json
 import os
-from dataclasses import asdict
+from dataclasses import asdict, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from uuid import uuid4
 
-from fastapi import BackgroundTasks, Depends, FastAPI, File, Form, Header, HTTPException, Query, UploadFile
+from fastapi import Body, Depends, FastAPI, File, Form, Header, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
-from hirerank.dashboard.service import job_insights, list_candidates_for_job
+from hirerank.dashboard.models import CandidateDashboardEntry, CandidateStream
+from hirerank.dashboard.service import (
+    candidate_detail,
+    job_insights,
+    simulate_job_ranking,
+    stream_candidates_for_job,
+)
+from hirerank.dashboard.simulation import ComponentMatrixCache
 from hirerank.imports.models import CandidateImportJob
+from hirerank.background_jobs.worker import RESCORE_TASK, enqueue_import_task
 from hirerank.imports.service import (
-    enqueue_import,
+    import_settings_from_env,
     parse_csv_preview,
-    parse_csv_rows,
     parse_mapping,
+    read_csv_headers,
+    spool_upload,
+    validate_duplicate_mode,
     validate_mapping,
 )
-from hirerank.storage.application_repository import ApplicationRepository
-from hirerank.storage.import_repository import CandidateImportRepository
-from hirerank.storage.scoring_repository import ScoringRepository
-from hirerank.background_jobs.scoring import build_default_coordinator
+from hirerank.scoring.config import ScoringConfig
+from hirerank.storage.backends import Repositories, open_repositories
+from hirerank.storage.serialization import scoring_config_to_payload
+from hirerank.storage.protocols import ApplicationStore, CandidateImportStore, ScoreStore
 
 
 def _storage_dir() -> Path:
     return Path(os.getenv("HIRERANK_STORAGE_DIR", ".data")).resolve()
 
 
-def _application_repository() -> ApplicationRepository:
-    return ApplicationRepository(_storage_dir() / "applications.json")
+def _upload_dir() -> Path:
+    return _storage_dir() / "import_uploads"
+
+
+def _storage_backend() -> str:
+    return os.getenv("HIRERANK_STORAGE_BACKEND", "json").strip().lower()
+
+
+@lru_cache(maxsize=None)
+def _repositories_at(storage_dir: Path, backend: str) -> Repositories:
+    # Repositories keep in-memory indexes and connections, so reuse one set per store.
+    return open_repositories(storage_dir, backend)
+
+
+def _repositories() -> Repositories:
+    return _repositories_at(_storage_dir(), _storage_backend())
+
+
+@lru_cache(maxsize=None)
+def _matrix_cache_at(storage_dir: Path, backend: str) -> ComponentMatrixCache:
+    return ComponentMatrixCache(_repositories_at(storage_dir, backend).scores)
+
 
+def _matrix_cache() -> ComponentMatrixCache:
+    return _matrix_cache_at(_storage_dir(), _storage_backend())
 
-def _scoring_repository() -> ScoringRepository:
-    return ScoringRepository(_storage_dir() / "scores.json")
 
+def _application_repository() -> ApplicationStore:
+    return _repositories().applications
 
-def _import_repository() -> CandidateImportRepository:
-    return CandidateImportRepository(_storage_dir() / "candidate_imports.json")
+
+def _scoring_repository() -> ScoreStore:
+    return _repositories().scores
+
+
+def _import_repository() -> CandidateImportStore:
+    return _repositories().imports
+
+
+def _owner_weight(owner_id: str) -> float:
+    # HIRERANK_OWNER_WEIGHTS="owner-a=2,owner-b=0.5" gives owners a larger or
+    # smaller share of import throughput; everyone else gets weight 1.
+    for entry in os.getenv("HIRERANK_OWNER_WEIGHTS", "").split(","):
+        key, _, value = entry.partition("=")
+        if key.strip() == owner_id and value.strip():
+            return float(value)
+    return 1.0
 
 
 def _owner_id(x_owner_id: str = Header(..., alias="X-Owner-Id")) -> str:
     return x_owner_id
 
 
+def _require_job(owner_id: str, job_id: str, allow_unclaimed: bool = False) -> None:
+    # Scores and scoring configs are keyed by job alone, so only an owner with
+    # applications for the job may read or change them. With allow_unclaimed, a
+    # job nobody has applications for yet can be set up before its first import.
+    owners = _application_repository().job_owners(job_id)
+    if owner_id not in owners and (owners or not allow_unclaimed):
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+
+_STREAM_FORMATS = ("json", "ndjson")
+_STREAM_CHUNK_ENTRIES = 64
+
 app = FastAPI(title="HireRank Dashboard API", version="0.1.0")
 
 
@@ -53,9 +116,19 @@ def dashboard_candidates(
     min_score: Optional[float] = Query(None, ge=0.0, le=100.0),
     status: Optional[str] = Query(None, description="new | shortlisted | rejected"),
     skill: Optional[List[str]] = Query(None),
-) -> dict:
+    skill_match: str = Query("any", description="any | all"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[List[str]] = Query(None, description="Entry fields to return, repeated or comma-separated"),
+    response_format: str = Query("json", alias="format", description="json | ndjson"),
+) -> StreamingResponse:
+    if response_format not in _STREAM_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{response_format}'. Expected one of: {', '.join(_STREAM_FORMATS)}.",
+        )
     try:
-        candidates = list_candidates_for_job(
+        stream = stream_candidates_for_job(
             owner_id=owner_id,
             job_id=job_id,
             applications_repo=_application_repository(),
@@ -63,15 +136,64 @@ def dashboard_candidates(
             min_score=min_score,
             status=status,
             skills=skill,
+            skill_match=skill_match,
+            limit=limit,
+            cursor=cursor,
+            fields=[name.strip() for value in fields for name in value.split(",")] if fields else None,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return {
-        "job_id": job_id,
-        "owner_id": owner_id,
-        "candidates": [candidate.__dict__ for candidate in candidates],
-    }
+    # Entries are serialized as the ranking yields them, so the first bytes go
+    # out before the page is built and memory does not grow with the page.
+    if response_format == "ndjson":
+        return StreamingResponse(_ndjson_candidates(stream), media_type="application/x-ndjson")
+    return StreamingResponse(_json_candidates(job_id, owner_id, stream), media_type="application/json")
+
+
+def _dump(value: object) -> str:
+    # Same encoding as FastAPI's JSONResponse.
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _project(entry: CandidateDashboardEntry, fields: Tuple[str, ...]) -> Dict[str, object]:
+    return {name: getattr(entry, name) for name in fields}
+
+
+def _json_candidates(job_id: str, owner_id: str, stream: CandidateStream) -> Iterator[str]:
+    yield f'{{"job_id":{_dump(job_id)},"owner_id":{_dump(owner_id)},"candidates":['
+    chunk: List[str] = []
+    for index, entry in enumerate(stream.entries):
+        chunk.append(("," if index else "") + _dump(_project(entry, stream.fields)))
+        if len(chunk) == _STREAM_CHUNK_ENTRIES:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk) + f'],"next_cursor":{_dump(stream.next_cursor)}}}'
+
+
+def _ndjson_candidates(stream: CandidateStream) -> Iterator[str]:
+    # One entry per line, then a final line carrying the cursor for the next page.
+    chunk: List[str] = []
+    for entry in stream.entries:
+        chunk.append(_dump(_project(entry, stream.fields)) + "\n")
+        if len(chunk) == _STREAM_CHUNK_ENTRIES:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk) + _dump({"next_cursor": stream.next_cursor}) + "\n"
+
+
+@app.get("/dashboard/jobs/{job_id}/candidates/{candidate_id}")
+def dashboard_candidate(job_id: str, candidate_id: str, owner_id: str = Depends(_owner_id)) -> dict:
+    detail = candidate_detail(
+        owner_id=owner_id,
+        job_id=job_id,
+        candidate_id=candidate_id,
+        applications_repo=_application_repository(),
+        scoring_repo=_scoring_repository(),
+    )
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Candidate not found.")
+    return {"job_id": job_id, "owner_id": owner_id, "candidate": asdict(detail)}
 
 
 @app.get("/dashboard/jobs/{job_id}/insights")
@@ -79,8 +201,7 @@ def dashboard_insights(job_id: str, owner_id: str = Depends(_owner_id)) -> dict:
     insights = job_insights(
         owner_id=owner_id,
         job_id=job_id,
-        applications_repo=_application_repository(),
-        scoring_repo=_scoring_repository(),
+        insights=_repositories().insights,
     )
     return {
         "job_id": job_id,
@@ -89,12 +210,72 @@ def dashboard_insights(job_id: str, owner_id: str = Depends(_owner_id)) -> dict:
             "total_applications": insights.total_applications,
             "scored_applications": insights.scored_applications,
             "unscored_applications": insights.unscored_applications,
-            "score_distribution": [bucket.__dict__ for bucket in insights.score_distribution],
-            "top_skill_matches": [skill.__dict__ for skill in insights.top_skill_matches],
+            "score_distribution": [asdict(bucket) for bucket in insights.score_distribution],
+            "top_skill_matches": [asdict(skill) for skill in insights.top_skill_matches],
+        },
+    }
+
+
+@app.post("/dashboard/jobs/{job_id}/simulate")
+def simulate_scoring(
+    job_id: str,
+    owner_id: str = Depends(_owner_id),
+    category_weights: Optional[Dict[str, float]] = Body(None),
+    resume_subweights: Optional[Dict[str, float]] = Body(None),
+    top_k: int = Body(10, ge=1, le=100),
+) -> dict:
+    _require_job(owner_id, job_id)
+    config = _override_config(
+        _repositories().scoring_configs.get(job_id),
+        category_weights=category_weights,
+        resume_subweights=resume_subweights,
+    )
+
+    simulation = simulate_job_ranking(job_id=job_id, config=config, matrix_cache=_matrix_cache(), top_k=top_k)
+    return {
+        "job_id": job_id,
+        "owner_id": owner_id,
+        "simulation": {
+            "total_candidates": simulation.total_candidates,
+            "top_candidates": [asdict(candidate) for candidate in simulation.top_candidates],
+            "score_distribution": [asdict(bucket) for bucket in simulation.score_distribution],
         },
     }
 
 
+@app.put("/dashboard/jobs/{job_id}/scoring-config")
+def update_scoring_config(
+    job_id: str,
+    owner_id: str = Depends(_owner_id),
+    category_weights: Optional[Dict[str, float]] = Body(None),
+    resume_subweights: Optional[Dict[str, float]] = Body(None),
+    github_required: Optional[bool] = Body(None),
+) -> dict:
+    _require_job(owner_id, job_id, allow_unclaimed=True)
+    repositories = _repositories()
+    config = _override_config(
+        repositories.scoring_configs.get(job_id),
+        category_weights=category_weights,
+        resume_subweights=resume_subweights,
+        github_required=github_required,
+    )
+
+    saved = repositories.scoring_configs.save(config)
+    # Re-weighting every stored score is left to the workers.
+    task = repositories.tasks.enqueue(
+        RESCORE_TASK,
+        {"job_id": job_id},
+        fair_key=owner_id,
+        weight=_owner_weight(owner_id),
+    )
+    return {
+        "job_id": job_id,
+        "owner_id": owner_id,
+        "config": scoring_config_to_payload(saved),
+        "rescore_task_id": task.task_id,
+    }
+
+
 @app.post("/dashboard/jobs/{job_id}/imports/preview")
 def import_preview(
     job_id: str,
@@ -102,8 +283,7 @@ def import_preview(
     preview_rows: int = Query(5, ge=1, le=50),
     file: UploadFile = File(...),
 ) -> dict:
-    data = file.file.read()
-    preview = parse_csv_preview(data, preview_rows=preview_rows)
+    preview = parse_csv_preview(file.file, preview_rows=preview_rows)
     return {
         "job_id": job_id,
         "owner_id": owner_id,
@@ -115,43 +295,54 @@ def import_preview(
 @app.post("/dashboard/jobs/{job_id}/imports")
 def create_import_job(
     job_id: str,
-    background_tasks: BackgroundTasks,
     owner_id: str = Depends(_owner_id),
     file: UploadFile = File(...),
     mapping: str = Form(...),
+    duplicate_mode: str = Form("skip", description="skip | update"),
 ) -> dict:
-    data = file.file.read()
-    headers, rows = parse_csv_rows(data)
+    # Spool the upload to disk and stream it; large exports never sit in memory.
+    import_id = str(uuid4())
+    upload_path = _upload_dir() / f"{import_id}.csv"
+    spool_upload(file.file, upload_path)
+    # The queued task owns the upload from here on; anything failing before that removes it.
+    queued = False
     try:
-        parsed_mapping = parse_mapping(mapping)
-        resolved_mapping = validate_mapping(parsed_mapping, headers)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+        try:
+            headers = read_csv_headers(upload_path)
+            parsed_mapping = parse_mapping(mapping)
+            resolved_mapping = validate_mapping(parsed_mapping, headers)
+            resolved_duplicate_mode = validate_duplicate_mode(duplicate_mode)
+        except (csv.Error, UnicodeDecodeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    import_job = CandidateImportJob(
-        import_id=str(uuid4()),
-        owner_id=owner_id,
-        job_id=job_id,
-        status="queued",
-        headers=headers,
-        mapping=resolved_mapping,
-        total_rows=len(rows),
-        processed_rows=0,
-        success_count=0,
-        failure_count=0,
-        results=[],
-    )
-    import_repo = _import_repository()
-    import_repo.create(import_job)
-
-    background_tasks.add_task(
-        enqueue_import,
-        import_job,
-        import_repo,
-        rows,
-        _application_repository(),
-        build_default_coordinator(_storage_dir()),
-    )
+        import_job = CandidateImportJob(
+            import_id=import_id,
+            owner_id=owner_id,
+            job_id=job_id,
+            status="queued",
+            headers=headers,
+            mapping=resolved_mapping,
+            # Counted by the worker when the import starts.
+            total_rows=0,
+            processed_rows=0,
+            success_count=0,
+            failure_count=0,
+            results=[],
+            duplicate_mode=resolved_duplicate_mode,
+        )
+        repositories = _repositories()
+        repositories.imports.create(import_job)
+        enqueue_import_task(
+            repositories.tasks,
+            import_job,
+            upload_path,
+            import_settings_from_env().task_rows,
+            weight=_owner_weight(owner_id),
+        )
+        queued = True
+    finally:
+        if not queued:
+            upload_path.unlink(missing_ok=True)
     return _serialize_import_job(import_job)
 
 
@@ -167,8 +358,32 @@ def get_import_job(
     return _serialize_import_job(import_job)
 
 
+def _override_config(
+    config: ScoringConfig,
+    category_weights: Optional[Dict[str, float]] = None,
+    resume_subweights: Optional[Dict[str, float]] = None,
+    github_required: Optional[bool] = None,
+) -> ScoringConfig:
+    try:
+        if category_weights is not None:
+            # Weights left out keep their current values.
+            config = replace(config, category_weights=replace(config.category_weights, **category_weights))
+        if resume_subweights is not None:
+            config = replace(config, resume_subweights=replace(config.resume_subweights, **resume_subweights))
+        if github_required is not None:
+            config = replace(config, github_required=github_required)
+        config.normalized()
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return config
+
+
 def _serialize_import_job(job: CandidateImportJob) -> dict:
     payload = asdict(job)
     payload["created_at"] = job.created_at.isoformat()
     payload["updated_at"] = job.updated_at.isoformat()
+    # 0 while a worker is on it, otherwise its place in line (1 = claimed next); None once finished.
+    payload["queue_position"] = (
+        _repositories().tasks.queue_position(job.import_id) if job.status in ("queued", "processing") else None
+    )
     return payload
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from hirerank.dashboard.models import CandidateApplication, JobInsightsAggregate
+from hirerank.scoring.models import ScoreBatch, ScoreResult
+from hirerank.storage.protocols import ApplicationStore, JobInsightsStore, ScoreStore
+
+SCORE_BUCKETS = [
+    (0.0, 20.0, "0-20"),
+    (20.0, 40.0, "20-40"),
+    (40.0, 60.0, "40-60"),
+    (60.0, 80.0, "60-80"),
+    (80.0, 100.0, "80-100"),
+]
+_BUCKET_EDGES = [max_score for _, max_score, _ in SCORE_BUCKETS[:-1]]
+
+
+def normalize_skill(skill: str) -> str:
+    return skill.strip().lower()
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def bucket_index(score: float) -> Optional[int]:
+    # Buckets are half-open except the last, which also takes 100.
+    if score < SCORE_BUCKETS[0][0] or score > SCORE_BUCKETS[-1][1]:
+        return None
+    return bisect_right(_BUCKET_EDGES, score)
+
+
+def empty_aggregate(owner_id: str, job_id: str) -> JobInsightsAggregate:
+    return JobInsightsAggregate(owner_id=owner_id, job_id=job_id, bucket_counts=[0] * len(SCORE_BUCKETS))
+
+
+def apply_application(
+    aggregate: JobInsightsAggregate,
+    application: CandidateApplication,
+    total_score: Optional[float],
+    sign: int = 1,
+) -> None:
+    aggregate.total_applications += sign
+    apply_score(aggregate, total_score, sign)
+    for skill in application.skills:
+        normalized = normalize_skill(skill)
+        if not normalized:
+            continue
+        count = aggregate.skill_counts.get(normalized, 0) + sign
+        if count > 0:
+            aggregate.skill_counts[normalized] = count
+            aggregate.skill_names.setdefault(normalized, skill.strip())
+        else:
+            aggregate.skill_counts.pop(normalized, None)
+            aggregate.skill_names.pop(normalized, None)
+
+
+def apply_score(aggregate: JobInsightsAggregate, total_score: Optional[float], sign: int = 1) -> None:
+    if total_score is None:
+        return
+    aggregate.scored_applications += sign
+    index = bucket_index(total_score)
+    if index is not None:
+        aggregate.bucket_counts[index] += sign
+
+
+class InsightsTracker:
+    def __init__(self, store: JobInsightsStore, applications: ApplicationStore, scores: ScoreStore) -> None:
+        self.store = store
+        self.applications = applications
+        self.scores = scores
+
+    def get(self, owner_id: str, job_id: str) -> JobInsightsAggregate:
+        aggregate = self.store.get(owner_id, job_id)
+        if aggregate is None:
+            # Reads never write; a missing aggregate is computed here and stored by the next write or rebuild.
+            aggregate = self._compute(owner_id, job_id)
+        return aggregate
+
+    def rebuild(self, owner_id: str, job_id: str) -> JobInsightsAggregate:
+        with self.store.locked([job_id]):
+            return self._rebuild(owner_id, job_id)
+
+    def rebuild_all(self) -> int:
+        jobs = self.applications.list_jobs()
+        for owner_id, job_id in jobs:
+            self.rebuild(owner_id, job_id)
+        return len(jobs)
+
+    def save_applications(self, applications: List[CandidateApplication]) -> None:
+        if not applications:
+            return
+        # Aggregate updates are deltas against the versions being replaced, so the
+        # reads, the write and the delta all happen under the store's cross-process lock.
+        with self.store.locked({application.job_id for application in applications}):
+            aggregates: Dict[Tuple[str, str], Optional[JobInsightsAggregate]] = {}
+            # Pair each write with the version it replaces, including earlier writes in this batch.
+            latest: Dict[Tuple[str, str, str], CandidateApplication] = {}
+            changes: Dict[Tuple[str, str], List[Tuple[Optional[CandidateApplication], CandidateApplication]]] = {}
+            for application in applications:
+                key = (application.owner_id, application.job_id)
+                if key not in aggregates:
+                    aggregates[key] = self.store.get(*key)
+                lookup = (application.owner_id, application.job_id, application.application_id)
+                if lookup in latest:
+                    previous: Optional[CandidateApplication] = latest[lookup]
+                elif aggregates[key] is None:
+                    # The aggregate is rebuilt from scratch below, so the replaced version is not needed.
+                    previous = None
+                else:
+                    previous = self.applications.get(*lookup)
+                latest[lookup] = application
+                changes.setdefault(key, []).append((previous, application))
+
+            self.applications.save_many(applications)
+
+            for (owner_id, job_id), job_changes in changes.items():
+                aggregate = aggregates[(owner_id, job_id)]
+                if aggregate is None:
+                    self._rebuild(owner_id, job_id)
+                    continue
+                candidate_ids = {application.candidate_id for _, application in job_changes}
+                candidate_ids.update(previous.candidate_id for previous, _ in job_changes if previous is not None)
+                totals = self.scores.get_totals(job_id, candidate_ids)
+                for previous, application in job_changes:
+                    if previous is not None:
+                        apply_application(aggregate, previous, totals.get(previous.candidate_id), sign=-1)
+                    apply_application(aggregate, application, totals.get(application.candidate_id))
+                self.store.save(aggregate)
+
+    def save_scores(self, results: Sequence[ScoreResult]) -> None:
+        if not results:
+            return
+        results = ScoreBatch.of(results)
+        new_totals: Dict[str, Dict[str, float]] = {}
+        for job_id, candidate_id, total_score in zip(results.job_ids, results.candidate_ids, results.total_scores):
+            new_totals.setdefault(job_id, {})[candidate_id] = total_score
+        with self.store.locked(new_totals):
+            previous_totals = {
+                job_id: self.scores.get_totals(job_id, totals) for job_id, totals in new_totals.items()
+            }
+            self.scores.save_many(results)
+            for job_id, totals in new_totals.items():
+                # Scores are keyed by job only; every owner with applications for the job has an aggregate.
+                for owner_id in self.store.owners_for_job(job_id):
+                    aggregate = self.store.get(owner_id, job_id)
+                    if aggregate is None:
+                        continue
+                    applications = self.applications.get_by_candidates(owner_id, job_id, totals)
+                    if not applications:
+                        continue
+                    for candidate_id in applications:
+                        apply_score(aggregate, previous_totals[job_id].get(candidate_id), sign=-1)
+                        apply_score(aggregate, totals[candidate_id])
+                    self.store.save(aggregate)
+
+    def _rebuild(self, owner_id: str, job_id: str) -> JobInsightsAggregate:
+        aggregate = self._compute(owner_id, job_id)
+        self.store.save(aggregate)
+        return aggregate
+
+    def _compute(self, owner_id: str, job_id: str) -> JobInsightsAggregate:
+        applications = self.applications.list_by_job(owner_id, job_id)
+        totals = self.scores.get_totals(job_id, {application.candidate_id for application in applications})
+        aggregate = empty_aggregate(owner_id, job_id)
+        for application in applications:
+            apply_application(aggregate, application, totals.get(application.candidate_id))
+        return aggregate
+
+
+class InsightsTrackingApplicationStore:
+    def __init__(self, inner: ApplicationStore, tracker: InsightsTracker) -> None:
+        self.inner = inner
+        self.tracker = tracker
+
+    def save(self, application: CandidateApplication) -> None:
+        self.tracker.save_applications([application])
+
+    def save_many(self, applications: Iterable[CandidateApplication]) -> None:
+        self.tracker.save_applications(list(applications))
+
+    def list_by_job(self, owner_id: str, job_id: str) -> List[CandidateApplication]:
+        return self.inner.list_by_job(owner_id, job_id)
+
+    def get(self, owner_id: str, job_id: str, application_id: str) -> Optional[CandidateApplication]:
+        return self.inner.get(owner_id, job_id, application_id)
+
+    def list_jobs(self) -> List[Tuple[str, str]]:
+        return self.inner.list_jobs()
+
+    def job_owners(self, job_id: str) -> Set[str]:
+        return self.inner.job_owners(job_id)
+
+    def get_by_candidates(
+        self, owner_id: str, job_id: str, candidate_ids: Iterable[str]
+    ) -> Dict[str, CandidateApplication]:
+        return self.inner.get_by_candidates(owner_id, job_id, candidate_ids)
+
+    def iter_by_job(
+        self, owner_id: str, job_id: str, after: Optional[int] = None
+    ) -> Iterator[Tuple[int, CandidateApplication]]:
+        return self.inner.iter_by_job(owner_id, job_id, after=after)
+
+    def match_emails(self, owner_id: str, job_id: str, emails: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+        return self.inner.match_emails(owner_id, job_id, emails)
+
+    def match_candidates(
+        self,
+        owner_id: str,
+        job_id: str,
+        skills: Iterable[str] = (),
+        status: Optional[str] = None,
+        match_all: bool = False,
+    ) -> Dict[str, int]:
+        return self.inner.match_candidates(owner_id, job_id, skills=skills, status=status, match_all=match_all)
+
+
+class InsightsTrackingScoreStore:
+    def __init__(self, inner: ScoreStore, tracker: InsightsTracker) -> None:
+        self.inner = inner
+        self.tracker = tracker
+
+    def save(self, result: ScoreResult) -> None:
+        self.tracker.save_scores([result])
+
+    def save_many(self, results: Iterable[ScoreResult]) -> None:
+        self.tracker.save_scores(ScoreBatch.of(results))
+
+    def list_by_job(self, job_id: str, fields: Optional[Collection[str]] = None) -> Dict[str, ScoreResult]:
+        return self.inner.list_by_job(job_id, fields=fields)
+
+    def get_many(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, ScoreResult]:
+        return self.inner.get_many(job_id, candidate_ids)
+
+    def get_totals(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, float]:
+        return self.inner.get_totals(job_id, candidate_ids)
+
+    def get_fingerprints(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, str]:
+        return self.inner.get_fingerprints(job_id, candidate_ids)
+
+    def scored_candidate_ids(self, job_id: str, candidate_ids: Iterable[str]) -> Set[str]:
+        return self.inner.scored_candidate_ids(job_id, candidate_ids)
+
+    def iter_ranked(self, job_id: str, after: Optional[Tuple[float, str]] = None) -> Iterator[Tuple[str, float]]:
+        return self.inner.iter_ranked(job_id, after=after)
+
+    def job_revision(self, job_id: str) -> Optional[str]:
+        return self.inner.job_revision(job_id)
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class CandidateApplication:
     application_id: str
     candidate_id: str
@@ -13,22 +13,49 @@ class CandidateApplication:
     owner_id: str
     status: str
     skills: List[str] = field(default_factory=list)
+    email: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
 
 
-@dataclass
+@dataclass(slots=True)
 class CandidateDashboardEntry:
     application_id: str
     candidate_id: str
     status: str
     skills: List[str]
     total_score: Optional[float]
-    breakdown: Dict[str, Dict[str, float | str | None]]
+    breakdown: Dict[str, Dict[str, object]]
     explanation_summary: str
+    score_created_at: Optional[str]
+
+
+@dataclass
+class CandidateStream:
+    # Entries are produced lazily from the ranking; next_cursor is set once
+    # they have been consumed.
+    fields: Tuple[str, ...]
+    entries: Iterator[CandidateDashboardEntry] = field(default_factory=lambda: iter(()))
+    next_cursor: Optional[str] = None
+
+
+@dataclass(slots=True)
+class CandidateDetail:
+    application_id: str
+    candidate_id: str
+    status: str
+    skills: List[str]
+    total_score: Optional[float]
+    breakdown: Dict[str, Dict[str, object]]
     explanation: str
     score_created_at: Optional[str]
 
 
+@dataclass
+class CandidatePage:
+    candidates: List[CandidateDashboardEntry]
+    next_cursor: Optional[str] = None
+
+
 @dataclass
 class ScoreDistributionBucket:
     label: str
@@ -51,3 +78,29 @@ class JobInsights:
     unscored_applications: int
     score_distribution: List[ScoreDistributionBucket]
     top_skill_matches: List[SkillMatchCount]
+
+
+@dataclass
+class JobInsightsAggregate:
+    owner_id: str
+    job_id: str
+    total_applications: int = 0
+    scored_applications: int = 0
+    # One count per score bucket, in bucket order.
+    bucket_counts: List[int] = field(default_factory=list)
+    skill_counts: Dict[str, int] = field(default_factory=dict)
+    skill_names: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class SimulatedCandidate:
+    candidate_id: str
+    total_score: float
+
+
+@dataclass
+class JobSimulation:
+    job_id: str
+    total_candidates: int
+    top_candidates: List[SimulatedCandidate]
+    score_distribution: List[ScoreDistributionBucket]
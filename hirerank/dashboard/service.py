@@ -1,145 +1,401 @@
 from __future__ import annotations
 
-from collections import Counter
-from typing import Iterable, List, Optional
+import base64
+import heapq
+import json
+from bisect import bisect_right
+from dataclasses import fields as dataclass_fields
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
 
 from hirerank.dashboard.models import (
+    CandidateApplication,
     CandidateDashboardEntry,
+    CandidateDetail,
+    CandidatePage,
+    CandidateStream,
     JobInsights,
+    JobSimulation,
     ScoreDistributionBucket,
+    SimulatedCandidate,
     SkillMatchCount,
 )
-from hirerank.storage.application_repository import ApplicationRepository
-from hirerank.storage.scoring_repository import ScoringRepository
+from hirerank.dashboard.insights import SCORE_BUCKETS, InsightsTracker, normalize_skill
+from hirerank.dashboard.simulation import ComponentMatrixCache
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.explanations import render_component, render_explanation, summarize_explanation
+from hirerank.scoring.models import ScoreResult
+from hirerank.storage.protocols import ApplicationStore, ScoreStore
+
+T = TypeVar("T")
+
+DASHBOARD_ENTRY_FIELDS = tuple(field.name for field in dataclass_fields(CandidateDashboardEntry))
+# Entry fields built from the stored score result rather than the ranking.
+_SCORE_ENTRY_FIELDS = frozenset({"breakdown", "explanation_summary", "score_created_at"})
 
 _VALID_STATUSES = {"new", "shortlisted", "rejected"}
+_SKILL_MATCH_MODES = ("any", "all")
 
 
-def _normalize_skill(skill: str) -> str:
-    return skill.strip().lower()
+def _encode_cursor(state: Dict[str, object]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
 
-def _summarize_explanation(explanation: str, max_lines: int = 2) -> str:
-    lines = [line.strip() for line in explanation.splitlines() if line.strip()]
-    summary = "\n".join(lines[:max_lines])
-    return summary or "Score explanation pending."
+def _decode_cursor(cursor: str) -> Dict[str, object]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor.") from None
+    if isinstance(state, dict):
+        if isinstance(state.get("s"), (int, float)) and isinstance(state.get("c"), str):
+            return state
+        if isinstance(state.get("p"), int):
+            return state
+    raise ValueError("Invalid cursor.")
 
 
-def list_candidates_for_job(
+def _breakdown(score: Optional[ScoreResult], explain: bool = False) -> Dict[str, Dict[str, object]]:
+    breakdown: Dict[str, Dict[str, object]] = {}
+    if score is None:
+        return breakdown
+    for component in score.breakdown.components:
+        details: Dict[str, object] = {
+            "score": component.score,
+            "weight": component.weight,
+            "weighted_score": component.weighted_score,
+        }
+        if component.subscores is not None:
+            details["subscores"] = dict(component.subscores)
+        if explain:
+            details["explanation"] = render_component(component)
+        breakdown[component.category] = details
+    return breakdown
+
+
+def _dashboard_entry(
+    application: CandidateApplication,
+    score: Optional[ScoreResult],
+    total_score: Optional[float] = None,
+) -> CandidateDashboardEntry:
+    # Listings carry only the summary; full explanations are rendered by candidate_detail.
+    # A bare total_score stands in for score when the projection needs nothing else from it.
+    return CandidateDashboardEntry(
+        application_id=application.application_id,
+        candidate_id=application.candidate_id,
+        status=application.status,
+        skills=application.skills,
+        total_score=score.total_score if score else total_score,
+        breakdown=_breakdown(score),
+        explanation_summary=summarize_explanation(score),
+        score_created_at=score.created_at.isoformat() if score else None,
+    )
+
+
+def _batched(items: Iterator[T], size: int) -> Iterator[List[T]]:
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _ranked_from_index(
+    totals: Dict[str, float],
+    min_score: Optional[float],
+    after: Optional[Tuple[float, str]],
+) -> Iterator[Tuple[str, float]]:
+    ranking = sorted(
+        (-total, candidate_id) for candidate_id, total in totals.items() if min_score is None or total >= min_score
+    )
+    start = bisect_right(ranking, (-after[0], after[1])) if after else 0
+    for negative_total, candidate_id in ranking[start:]:
+        yield candidate_id, -negative_total
+
+
+def _unscored_from_index(
+    owner_id: str,
+    job_id: str,
+    applications_repo: ApplicationStore,
+    positions: List[Tuple[int, str]],
+    after: Optional[int],
+    batch_size: int,
+) -> Iterator[Tuple[int, CandidateApplication]]:
+    remaining = iter([entry for entry in positions if after is None or entry[0] > after])
+    for batch in _batched(remaining, batch_size):
+        applications = applications_repo.get_by_candidates(owner_id, job_id, (candidate_id for _, candidate_id in batch))
+        for position, candidate_id in batch:
+            application = applications.get(candidate_id)
+            if application is not None:
+                yield position, application
+
+
+def _unscored_by_scan(
     owner_id: str,
     job_id: str,
-    applications_repo: ApplicationRepository,
-    scoring_repo: ScoringRepository,
+    applications_repo: ApplicationStore,
+    scoring_repo: ScoreStore,
+    after: Optional[int],
+    batch_size: int,
+) -> Iterator[Tuple[int, CandidateApplication]]:
+    for batch in _batched(applications_repo.iter_by_job(owner_id, job_id, after=after), batch_size):
+        scored = scoring_repo.scored_candidate_ids(job_id, (application.candidate_id for _, application in batch))
+        for position, application in batch:
+            if application.candidate_id not in scored:
+                yield position, application
+
+
+def candidate_fields(projection: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+    if projection is None:
+        return DASHBOARD_ENTRY_FIELDS
+    requested = [name for name in projection if name]
+    unknown = sorted(set(requested) - set(DASHBOARD_ENTRY_FIELDS))
+    if unknown:
+        raise ValueError(
+            f"Unsupported fields: {', '.join(unknown)}. Expected any of: {', '.join(DASHBOARD_ENTRY_FIELDS)}."
+        )
+    # Keep the entry's own field order so projected responses stay stable.
+    return tuple(name for name in DASHBOARD_ENTRY_FIELDS if name in requested)
+
+
+def stream_candidates_for_job(
+    owner_id: str,
+    job_id: str,
+    applications_repo: ApplicationStore,
+    scoring_repo: ScoreStore,
     min_score: Optional[float] = None,
     status: Optional[str] = None,
     skills: Optional[Iterable[str]] = None,
-) -> List[CandidateDashboardEntry]:
-    applications = applications_repo.list_by_job(owner_id=owner_id, job_id=job_id)
-
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    skill_match: str = "any",
+    fields: Optional[Iterable[str]] = None,
+) -> CandidateStream:
     status_filter = status.lower().strip() if status else None
     if status_filter and status_filter not in _VALID_STATUSES:
         raise ValueError(f"Unsupported status '{status}'.")
+    if skill_match not in _SKILL_MATCH_MODES:
+        raise ValueError(f"Unsupported skill match '{skill_match}'. Expected one of: {', '.join(_SKILL_MATCH_MODES)}.")
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be at least 1.")
 
-    skill_filters = {_normalize_skill(skill) for skill in skills or [] if skill.strip()}
-
-    filtered_apps = []
-    for application in applications:
-        if status_filter and application.status.lower() != status_filter:
-            continue
-        if skill_filters:
-            app_skills = {_normalize_skill(skill) for skill in application.skills}
-            if not app_skills.intersection(skill_filters):
-                continue
-        filtered_apps.append(application)
-
-    scores_by_candidate = scoring_repo.list_by_job(job_id=job_id)
-    entries: List[CandidateDashboardEntry] = []
-    for application in filtered_apps:
-        score = scores_by_candidate.get(application.candidate_id)
-        if min_score is not None:
-            if score is None or score.total_score < min_score:
-                continue
-        entries.append(
-            CandidateDashboardEntry(
-                application_id=application.application_id,
-                candidate_id=application.candidate_id,
-                status=application.status,
-                skills=application.skills,
-                total_score=score.total_score if score else None,
-                breakdown=score.breakdown.as_dict() if score else {},
-                explanation_summary=_summarize_explanation(score.explanation) if score else "Score pending.",
-                explanation=score.explanation if score else "",
-                score_created_at=score.created_at.isoformat() if score else None,
-            )
+    projection = candidate_fields(fields)
+    skill_filters = {normalize_skill(skill) for skill in skills or [] if skill.strip()}
+    state = _decode_cursor(cursor) if cursor else {}
+    after_ranked = (float(state["s"]), str(state["c"])) if "s" in state else None
+    after_position = state.get("p")
+    batch_size = min(max(limit or 0, 64), 512)
+
+    # Scored candidates come first in (score desc, candidate id) order; unscored
+    # applications follow in application order. Filtered listings resolve the
+    # matching candidates from the skill/status index and only rank those.
+    if status_filter or skill_filters:
+        matching = applications_repo.match_candidates(
+            owner_id,
+            job_id,
+            skills=skill_filters,
+            status=status_filter,
+            match_all=skill_match == "all",
+        )
+        totals = scoring_repo.get_totals(job_id, matching)
+        ranked = _ranked_from_index(totals, min_score, after_ranked)
+        unscored = _unscored_from_index(
+            owner_id,
+            job_id,
+            applications_repo,
+            sorted((position, candidate_id) for candidate_id, position in matching.items() if candidate_id not in totals),
+            after_position,
+            batch_size,
         )
+    else:
+        ranked = scoring_repo.iter_ranked(job_id, after=after_ranked)
+        unscored = _unscored_by_scan(owner_id, job_id, applications_repo, scoring_repo, after_position, batch_size)
+
+    stream = CandidateStream(fields=projection)
+    stream.entries = _stream_entries(
+        stream,
+        owner_id,
+        job_id,
+        applications_repo,
+        scoring_repo,
+        ranked,
+        unscored,
+        min_score,
+        limit,
+        after_position,
+        batch_size,
+        # Totals come with the ranking; stored results are only read for the fields built from them.
+        load_scores=not _SCORE_ENTRY_FIELDS.isdisjoint(projection),
+    )
+    return stream
+
+
+def _stream_entries(
+    stream: CandidateStream,
+    owner_id: str,
+    job_id: str,
+    applications_repo: ApplicationStore,
+    scoring_repo: ScoreStore,
+    ranked: Iterator[Tuple[str, float]],
+    unscored: Iterator[Tuple[int, CandidateApplication]],
+    min_score: Optional[float],
+    limit: Optional[int],
+    after_position: Optional[int],
+    batch_size: int,
+    load_scores: bool,
+) -> Iterator[CandidateDashboardEntry]:
+    emitted = 0
+    next_state: Optional[Dict[str, object]] = None
 
-    entries.sort(key=lambda entry: (entry.total_score is None, -(entry.total_score or 0.0)))
-    return entries
+    if after_position is None:
+        last_ranked: Optional[Tuple[float, str]] = None
+        done = False
+        for batch in _batched(ranked, batch_size):
+            applications = applications_repo.get_by_candidates(
+                owner_id, job_id, (candidate_id for candidate_id, _ in batch)
+            )
+            page: List[Tuple[CandidateApplication, float]] = []
+            for candidate_id, total in batch:
+                if min_score is not None and total < min_score:
+                    done = True
+                    break
+                application = applications.get(candidate_id)
+                if application is None:
+                    continue
+                if limit is not None and emitted == limit:
+                    next_state = {"s": last_ranked[0], "c": last_ranked[1]}
+                    done = True
+                    break
+                page.append((application, total))
+                emitted += 1
+                last_ranked = (total, candidate_id)
+            scores = (
+                scoring_repo.get_many(job_id, (application.candidate_id for application, _ in page))
+                if load_scores
+                else {}
+            )
+            for application, total in page:
+                score = scores.get(application.candidate_id)
+                yield _dashboard_entry(application, score, total if not load_scores else None)
+            if done:
+                break
+
+    if next_state is None and min_score is None:
+        # -1 marks "before the first application" when a page ends on the last scored entry.
+        last_position = -1 if after_position is None else after_position
+        for position, application in unscored:
+            if limit is not None and emitted == limit:
+                next_state = {"p": last_position}
+                break
+            yield _dashboard_entry(application, None)
+            emitted += 1
+            last_position = position
+
+    stream.next_cursor = _encode_cursor(next_state) if next_state is not None else None
+
+
+def list_candidates_for_job(
+    owner_id: str,
+    job_id: str,
+    applications_repo: ApplicationStore,
+    scoring_repo: ScoreStore,
+    min_score: Optional[float] = None,
+    status: Optional[str] = None,
+    skills: Optional[Iterable[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    skill_match: str = "any",
+) -> CandidatePage:
+    stream = stream_candidates_for_job(
+        owner_id,
+        job_id,
+        applications_repo,
+        scoring_repo,
+        min_score=min_score,
+        status=status,
+        skills=skills,
+        limit=limit,
+        cursor=cursor,
+        skill_match=skill_match,
+    )
+    candidates = list(stream.entries)
+    return CandidatePage(candidates=candidates, next_cursor=stream.next_cursor)
 
 
-def job_insights(
+def candidate_detail(
     owner_id: str,
     job_id: str,
-    applications_repo: ApplicationRepository,
-    scoring_repo: ScoringRepository,
-) -> JobInsights:
-    applications = applications_repo.list_by_job(owner_id=owner_id, job_id=job_id)
-    scores_by_candidate = scoring_repo.list_by_job(job_id=job_id)
-
-    scores = [
-        scores_by_candidate[application.candidate_id].total_score
-        for application in applications
-        if application.candidate_id in scores_by_candidate
-    ]
-    distribution = _score_distribution(scores)
-
-    skill_counter: Counter[str] = Counter()
-    display_names = {}
-    for application in applications:
-        for skill in application.skills:
-            normalized = _normalize_skill(skill)
-            if not normalized:
-                continue
-            skill_counter[normalized] += 1
-            display_names.setdefault(normalized, skill.strip())
-
-    top_skills = [
-        SkillMatchCount(skill=display_names[key], count=count)
-        for key, count in skill_counter.most_common(5)
-    ]
+    candidate_id: str,
+    applications_repo: ApplicationStore,
+    scoring_repo: ScoreStore,
+) -> Optional[CandidateDetail]:
+    application = applications_repo.get_by_candidates(owner_id, job_id, [candidate_id]).get(candidate_id)
+    if application is None:
+        return None
+    score = scoring_repo.get_many(job_id, [candidate_id]).get(candidate_id)
+    return CandidateDetail(
+        application_id=application.application_id,
+        candidate_id=application.candidate_id,
+        status=application.status,
+        skills=application.skills,
+        total_score=score.total_score if score else None,
+        breakdown=_breakdown(score, explain=True),
+        explanation=render_explanation(score) if score else "",
+        score_created_at=score.created_at.isoformat() if score else None,
+    )
+
+
+def job_insights(owner_id: str, job_id: str, insights: InsightsTracker) -> JobInsights:
+    aggregate = insights.get(owner_id, job_id)
+    top_skills = heapq.nsmallest(5, aggregate.skill_counts.items(), key=lambda item: (-item[1], item[0]))
 
     return JobInsights(
         job_id=job_id,
-        total_applications=len(applications),
-        scored_applications=len(scores),
-        unscored_applications=len(applications) - len(scores),
-        score_distribution=distribution,
-        top_skill_matches=top_skills,
+        total_applications=aggregate.total_applications,
+        scored_applications=aggregate.scored_applications,
+        unscored_applications=aggregate.total_applications - aggregate.scored_applications,
+        score_distribution=[
+            ScoreDistributionBucket(label=label, min_score=min_score, max_score=max_score, count=count)
+            for (min_score, max_score, label), count in zip(SCORE_BUCKETS, aggregate.bucket_counts)
+        ],
+        top_skill_matches=[
+            SkillMatchCount(skill=aggregate.skill_names.get(key, key), count=count) for key, count in top_skills
+        ],
     )
 
 
-def _score_distribution(scores: Iterable[float]) -> List[ScoreDistributionBucket]:
-    buckets = [
-        (0.0, 20.0, "0-20"),
-        (20.0, 40.0, "20-40"),
-        (40.0, 60.0, "40-60"),
-        (60.0, 80.0, "60-80"),
-        (80.0, 100.0, "80-100"),
-    ]
-    bucket_counts = {label: 0 for _, _, label in buckets}
-    for score in scores:
-        for min_score, max_score, label in buckets:
-            is_last = max_score == 100.0
-            if (min_score <= score < max_score) or (is_last and score <= max_score):
-                bucket_counts[label] += 1
-                break
+def simulate_job_ranking(
+    job_id: str,
+    config: ScoringConfig,
+    matrix_cache: ComponentMatrixCache,
+    top_k: int = 10,
+) -> JobSimulation:
+    matrix = matrix_cache.get(job_id)
+    totals = matrix.totals(config)
+    count = len(totals)
 
-    return [
-        ScoreDistributionBucket(
-            label=label,
-            min_score=min_score,
-            max_score=max_score,
-            count=bucket_counts[label],
-        )
-        for min_score, max_score, label in buckets
-    ]
+    top_k = min(top_k, count)
+    if top_k:
+        top = np.argpartition(-totals, top_k - 1)[:top_k]
+        top = sorted(top.tolist(), key=lambda row: (-totals[row], matrix.candidate_ids[row]))
+    else:
+        top = []
+
+    # Buckets are half-open except the last, which also takes 100.
+    edges = [max_score for _, max_score, _ in SCORE_BUCKETS[:-1]]
+    bucket_counts = np.bincount(np.searchsorted(edges, totals, side="right"), minlength=len(SCORE_BUCKETS))
+
+    return JobSimulation(
+        job_id=job_id,
+        total_candidates=count,
+        top_candidates=[
+            SimulatedCandidate(candidate_id=matrix.candidate_ids[row], total_score=float(totals[row])) for row in top
+        ],
+        score_distribution=[
+            ScoreDistributionBucket(label=label, min_score=min_score, max_score=max_score, count=int(bucket_count))
+            for (min_score, max_score, label), bucket_count in zip(SCORE_BUCKETS, bucket_counts)
+        ],
+    )
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from hirerank.scoring.matrix import ComponentMatrix, component_matrix
+from hirerank.scoring.models import SCORE_BREAKDOWNS
+from hirerank.storage.protocols import ScoreStore
+
+
+def build_component_matrix(scoring_repo: ScoreStore, job_id: str) -> ComponentMatrix:
+    return component_matrix(list(scoring_repo.list_by_job(job_id, fields=SCORE_BREAKDOWNS).values()))
+
+
+class ComponentMatrixCache:
+    def __init__(self, scoring_repo: ScoreStore, max_jobs: int = 32) -> None:
+        self.scoring_repo = scoring_repo
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[str], ComponentMatrix]]" = OrderedDict()
+
+    def get(self, job_id: str) -> ComponentMatrix:
+        revision = self.scoring_repo.job_revision(job_id)
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is not None and entry[0] == revision:
+                self._entries.move_to_end(job_id)
+                return entry[1]
+
+        matrix = build_component_matrix(self.scoring_repo, job_id)
+        with self._lock:
+            self._entries[job_id] = (revision, matrix)
+            self._entries.move_to_end(job_id)
+            while len(self._entries) > self.max_jobs:
+                self._entries.popitem(last=False)
+        return matrix
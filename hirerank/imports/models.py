@@ -26,7 +26,12 @@ class CandidateImportJob:
     success_count: int
     failure_count: int
     results: List[CandidateImportResult] = field(default_factory=list)
+    skipped_count: int = 0
+    # "skip" leaves rows whose email already applied to the job alone; "update" overwrites that application.
+    duplicate_mode: str = "skip"
     error_message: Optional[str] = None
+    # Bytes of the uploaded CSV consumed by checkpointed rows; processing resumes here.
+    source_offset: int = 0
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
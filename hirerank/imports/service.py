@@ -3,17 +3,26 @@ from __future__ import annotations
 import csv
 import io
 import json
-from dataclasses import replace
+import math
+import os
+import shutil
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional, Tuple
-from uuid import uuid4
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid5
 
-from hirerank.background_jobs.scoring import ScoringCoordinator, build_default_coordinator
+from hirerank.background_jobs.scoring import CandidateAnalysisState, ScoringCoordinator, build_default_coordinator
+from hirerank.dashboard.insights import normalize_email
 from hirerank.dashboard.models import CandidateApplication
 from hirerank.imports.models import CandidateImportJob, CandidateImportPreview, CandidateImportResult
 from hirerank.scoring.engine import GitHubAnalysis, ResumeAnalysis
-from hirerank.storage.application_repository import ApplicationRepository
-from hirerank.storage.import_repository import CandidateImportRepository
+from hirerank.storage.protocols import ApplicationStore, CandidateImportStore
+from hirerank.storage.unit_of_work import UnitOfWork
 
 REQUIRED_FIELDS = ("name", "email")
 OPTIONAL_FIELDS = (
@@ -26,16 +35,109 @@ OPTIONAL_FIELDS = (
 )
 SUPPORTED_FIELDS = REQUIRED_FIELDS + OPTIONAL_FIELDS
 VALID_STATUSES = {"new", "shortlisted", "rejected"}
+DUPLICATE_MODES = ("skip", "update")
+
+# Ids for imported rows derive from (import_id, row_number), so rows replayed
+# after a crash overwrite their earlier writes instead of duplicating them.
+_IMPORT_ROW_NAMESPACE = UUID("497e4067-81cc-4a87-9ae7-866c8e7837b0")
+
+# Errors in the uploaded data itself fail the import; anything else (I/O, the
+# database) propagates so the task is retried from its last checkpoint.
+_DATA_ERRORS = (csv.Error, ValueError)
+
+# csv.Sniffer is slow on large samples, so sniff a few KiB / lines at most.
+_SNIFF_BYTES = 8 * 1024
+_SNIFF_LINES = 20
+_SNIFF_DELIMITERS = ",;\t|"
+
+
+@dataclass(frozen=True)
+class ImportSettings:
+    checkpoint_every_rows: int = 500
+    checkpoint_interval_ms: int = 1000
+    chunk_size: int = 500
+    # workers <= 1 prepares rows inline; executor is "thread" or "process".
+    workers: int = 1
+    executor: str = "thread"
+    # Rows one queued task processes before the rest goes back through fair queuing.
+    task_rows: int = 5000
+
+
+@dataclass
+class _PreparedRow:
+    result: CandidateImportResult
+    application: Optional[CandidateApplication] = None
+    analysis: Optional[CandidateAnalysisState] = None
+
+
+def parse_csv_preview(stream: BinaryIO, preview_rows: int = 5) -> CandidateImportPreview:
+    # Only the sniffing sample and the bytes up to the last preview row are read.
+    start = stream.tell()
+    delimiter = sniff_delimiter(stream.read(_SNIFF_BYTES))
+    stream.seek(start)
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+    try:
+        reader = csv.DictReader(text, delimiter=delimiter)
+        headers = _clean_headers(reader)
+        rows = list(islice(_clean_rows(reader), preview_rows))
+    finally:
+        text.detach()
+    return CandidateImportPreview(headers=headers, rows=rows)
+
+
+def spool_upload(stream: BinaryIO, path: Path, chunk_size: int = 1024 * 1024) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".part")
+    with temp_path.open("wb") as target:
+        shutil.copyfileobj(stream, target, chunk_size)
+    os.replace(temp_path, path)
+
+
+def sniff_delimiter(sample: bytes) -> str:
+    lines = sample.decode("utf-8", errors="replace").splitlines(keepends=True)
+    # Sniff complete lines only; a full sample usually ends mid-row.
+    if len(sample) >= _SNIFF_BYTES and len(lines) > 1:
+        lines.pop()
+    text = "".join(lines[:_SNIFF_LINES])
+    try:
+        return csv.Sniffer().sniff(text, delimiters=_SNIFF_DELIMITERS).delimiter
+    except csv.Error:
+        return csv.excel.delimiter
+
+
+def read_csv_headers(path: Path) -> List[str]:
+    with _open_csv(path) as reader:
+        return _clean_headers(reader)
 
 
-def parse_csv_preview(data: bytes, preview_rows: int = 5) -> CandidateImportPreview:
-    headers, rows = _parse_csv_bytes(data)
-    preview = rows[:preview_rows]
-    return CandidateImportPreview(headers=headers, rows=preview)
+def count_csv_rows(path: Path) -> int:
+    with _open_csv(path) as reader:
+        return sum(1 for _ in reader)
 
 
-def parse_csv_rows(data: bytes) -> Tuple[List[str], List[Dict[str, str]]]:
-    return _parse_csv_bytes(data)
+def iter_csv_records(path: Path, start_offset: int = 0) -> Iterator[Tuple[int, Dict[str, str]]]:
+    # Yields (end offset, row): the byte offset just past each row, so an import
+    # can checkpoint it and resume with the following row.
+    with path.open("rb") as handle:
+        delimiter = sniff_delimiter(handle.read(_SNIFF_BYTES))
+        handle.seek(0)
+        position = 0
+
+        def lines() -> Iterator[str]:
+            nonlocal position
+            # The csv module pulls one physical line at a time, so once a row is
+            # returned, position is the end of that row even with quoted line breaks.
+            for line in handle:
+                position += len(line)
+                yield line.decode("utf-8", errors="replace")
+
+        reader = csv.DictReader(lines(), delimiter=delimiter)
+        # Read the header row before jumping to the checkpoint.
+        if reader.fieldnames is not None and start_offset > position:
+            handle.seek(start_offset)
+            position = start_offset
+        for row in _clean_rows(reader):
+            yield position, row
 
 
 def parse_mapping(mapping_payload: str) -> Dict[str, str]:
@@ -69,79 +171,331 @@ def validate_mapping(mapping: Dict[str, str], headers: Iterable[str]) -> Dict[st
     return resolved
 
 
-def enqueue_import(
-    job: CandidateImportJob,
-    repository: CandidateImportRepository,
-    rows: List[Dict[str, str]],
-    application_repo: ApplicationRepository,
+def validate_duplicate_mode(mode: str) -> str:
+    normalized = (mode or "").strip().lower()
+    if normalized not in DUPLICATE_MODES:
+        raise ValueError(f"Unsupported duplicate mode '{mode}'. Expected one of: {', '.join(DUPLICATE_MODES)}.")
+    return normalized
+
+
+def process_import_task(
+    payload: Dict[str, object],
+    repository: CandidateImportStore,
+    application_repo: ApplicationStore,
     coordinator: ScoringCoordinator,
-) -> None:
-    repository.update(job)
-    _process_import(job, repository, rows, application_repo, coordinator)
+    settings: Optional[ImportSettings] = None,
+) -> Optional[CandidateImportJob]:
+    # Runs one slice of an import from its last checkpoint. Returns the job while
+    # rows remain (status "processing"), so the caller can queue the next slice.
+    settings = settings or ImportSettings()
+    source = Path(str(payload["source"]))
+    job = repository.get(
+        owner_id=str(payload["owner_id"]),
+        job_id=str(payload["job_id"]),
+        import_id=str(payload["import_id"]),
+        # Slices and failures only touch the counters; row results stay in their log.
+        include_results=False,
+    )
+    if job is None or job.status in ("completed", "failed"):
+        source.unlink(missing_ok=True)
+        return None
+    if job.status == "queued":
+        # Counting reads the whole upload, so it happens here rather than in the request.
+        try:
+            job = replace(job, total_rows=count_csv_rows(source))
+        except _DATA_ERRORS as exc:
+            repository.update(replace(job, status="failed", error_message=str(exc), updated_at=datetime.utcnow()))
+            source.unlink(missing_ok=True)
+            return None
+    job = _process_import(
+        job,
+        repository,
+        iter_csv_records(source, job.source_offset),
+        application_repo,
+        coordinator,
+        settings,
+        max_rows=settings.task_rows,
+    )
+    if job.status != "processing":
+        source.unlink(missing_ok=True)
+        return None
+    return job
+
+
+def fail_import_task(payload: Dict[str, object], repository: CandidateImportStore, error: str) -> None:
+    # The task is out of attempts; record that rather than leave the job "processing".
+    job = repository.get(
+        owner_id=str(payload["owner_id"]),
+        job_id=str(payload["job_id"]),
+        import_id=str(payload["import_id"]),
+        include_results=False,
+    )
+    if job is not None and job.status not in ("completed", "failed"):
+        repository.update(replace(job, status="failed", error_message=error, updated_at=datetime.utcnow()))
+    Path(str(payload["source"])).unlink(missing_ok=True)
+
+
+def import_settings_from_env() -> ImportSettings:
+    return ImportSettings(
+        checkpoint_every_rows=int(os.getenv("HIRERANK_IMPORT_CHECKPOINT_ROWS", "500")),
+        checkpoint_interval_ms=int(os.getenv("HIRERANK_IMPORT_CHECKPOINT_MS", "1000")),
+        chunk_size=int(os.getenv("HIRERANK_IMPORT_CHUNK_ROWS", "500")),
+        workers=int(os.getenv("HIRERANK_IMPORT_WORKERS", "1")),
+        executor=os.getenv("HIRERANK_IMPORT_EXECUTOR", "thread").strip().lower(),
+        task_rows=int(os.getenv("HIRERANK_IMPORT_TASK_ROWS", "5000")),
+    )
 
 
 def _process_import(
     job: CandidateImportJob,
-    repository: CandidateImportRepository,
-    rows: List[Dict[str, str]],
-    application_repo: ApplicationRepository,
+    repository: CandidateImportStore,
+    records: Iterable[Tuple[int, Dict[str, str]]],
+    application_repo: ApplicationStore,
     coordinator: ScoringCoordinator,
-) -> None:
-    updated_job = replace(job, status="processing", updated_at=datetime.utcnow())
+    settings: ImportSettings,
+    max_rows: Optional[int] = None,
+) -> CandidateImportJob:
+    updated_job = replace(job, status="processing", results=[], error_message=None, updated_at=datetime.utcnow())
     repository.update(updated_job)
+    records = iter(records)
+
+    # Applications, scores and row results are buffered in a unit of work and
+    # flushed together, one batched write per store, every
+    # checkpoint_every_rows rows or checkpoint_interval_ms.
+    unit_of_work = UnitOfWork(applications=application_repo, scores=coordinator.result_repo, imports=repository)
+    pending: List[CandidateImportResult] = []
+    # Emails of rows buffered since the last commit, which the index cannot see yet.
+    uncommitted_emails: Dict[str, Tuple[str, str]] = {}
+    last_checkpoint = time.monotonic()
+
+    def checkpoint() -> None:
+        nonlocal last_checkpoint
+        unit_of_work.append_import_results(updated_job.import_id, list(pending))
+        pending.clear()
+        updated_job.updated_at = datetime.utcnow()
+        unit_of_work.update_import(updated_job)
+        unit_of_work.commit()
+        uncommitted_emails.clear()
+        last_checkpoint = time.monotonic()
 
+    executor = _import_executor(settings)
     try:
-        for index, row in enumerate(rows, start=1):
-            result = _process_row(updated_job, row, index, application_repo, coordinator)
-            updated_job.results.append(result)
-            updated_job.processed_rows += 1
-            if result.status == "success":
-                updated_job.success_count += 1
-            else:
-                updated_job.failure_count += 1
-            updated_job.updated_at = datetime.utcnow()
-            repository.update(updated_job)
-    except Exception as exc:
+        # Chunks are prepared (map, validate, build analyses) on the executor
+        # one chunk ahead of the single writer that persists them in order.
+        prepared_chunks = _prepare_chunks(
+            updated_job,
+            islice(records, max_rows) if max_rows is not None else records,
+            settings,
+            executor,
+        )
+        for end_offset, prepared in prepared_chunks:
+            prepared = _resolve_duplicates(prepared, updated_job, application_repo, uncommitted_emails)
+            _persist_chunk(prepared, unit_of_work, coordinator)
+            updated_job.source_offset = end_offset
+            for row in prepared:
+                pending.append(row.result)
+                updated_job.processed_rows += 1
+                if row.result.status == "success":
+                    updated_job.success_count += 1
+                elif row.result.status == "skipped":
+                    updated_job.skipped_count += 1
+                else:
+                    updated_job.failure_count += 1
+            elapsed_ms = (time.monotonic() - last_checkpoint) * 1000
+            if len(pending) >= settings.checkpoint_every_rows or elapsed_ms >= settings.checkpoint_interval_ms:
+                checkpoint()
+    except _DATA_ERRORS as exc:
         updated_job.status = "failed"
         updated_job.error_message = str(exc)
-        updated_job.updated_at = datetime.utcnow()
-        repository.update(updated_job)
-        return
+        checkpoint()
+        return updated_job
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
 
-    updated_job.status = "completed"
-    updated_job.updated_at = datetime.utcnow()
-    repository.update(updated_job)
+    if max_rows is None or next(records, None) is None:
+        updated_job.status = "completed"
+    checkpoint()
+    return updated_job
+
+
+def _import_executor(settings: ImportSettings) -> Optional[Executor]:
+    if settings.workers <= 1:
+        return None
+    if settings.executor == "process":
+        return ProcessPoolExecutor(max_workers=settings.workers)
+    if settings.executor == "thread":
+        return ThreadPoolExecutor(max_workers=settings.workers, thread_name_prefix="hirerank-import")
+    raise ValueError(f"Unsupported import executor '{settings.executor}'. Expected 'thread' or 'process'.")
 
 
-def _process_row(
+def _prepare_chunks(
     job: CandidateImportJob,
+    records: Iterable[Tuple[int, Dict[str, str]]],
+    settings: ImportSettings,
+    executor: Optional[Executor],
+) -> Iterator[Tuple[int, List[_PreparedRow]]]:
+    # Yields (end offset of the chunk's last row, prepared rows).
+    chunk_size = max(settings.chunk_size, 1)
+    record_iter = iter(records)
+    first_row_number = job.processed_rows + 1
+
+    def next_chunk() -> Optional[List[Dict[str, str]]]:
+        nonlocal end_offset
+        chunk = list(islice(record_iter, chunk_size))
+        if not chunk:
+            return None
+        end_offset = chunk[-1][0]
+        return [row for _, row in chunk]
+
+    end_offset = job.source_offset
+    if executor is None:
+        while (chunk := next_chunk()) is not None:
+            yield end_offset, _prepare_rows(
+                chunk, first_row_number, job.import_id, job.mapping, job.job_id, job.owner_id
+            )
+            first_row_number += len(chunk)
+        return
+
+    def submit(chunk: List[Dict[str, str]], start: int) -> List[Future]:
+        # Split the chunk across the workers; results are reassembled in row order.
+        slice_size = -(-len(chunk) // settings.workers)
+        return [
+            executor.submit(
+                _prepare_rows,
+                chunk[offset : offset + slice_size],
+                start + offset,
+                job.import_id,
+                job.mapping,
+                job.job_id,
+                job.owner_id,
+            )
+            for offset in range(0, len(chunk), slice_size)
+        ]
+
+    chunk = next_chunk()
+    futures = submit(chunk, first_row_number) if chunk else []
+    while futures:
+        chunk_end = end_offset
+        first_row_number += len(chunk)
+        chunk = next_chunk()
+        next_futures = submit(chunk, first_row_number) if chunk else []
+        yield chunk_end, [row for future in futures for row in future.result()]
+        futures = next_futures
+
+
+def _prepare_rows(
+    rows: List[Dict[str, str]],
+    first_row_number: int,
+    import_id: str,
+    mapping: Dict[str, str],
+    job_id: str,
+    owner_id: str,
+) -> List[_PreparedRow]:
+    return [
+        _prepare_row(row, row_number, import_id, mapping, job_id, owner_id)
+        for row_number, row in enumerate(rows, start=first_row_number)
+    ]
+
+
+def _prepare_row(
     row: Dict[str, str],
     row_number: int,
-    application_repo: ApplicationRepository,
-    coordinator: ScoringCoordinator,
-) -> CandidateImportResult:
-    mapped = _map_row(row, job.mapping)
+    import_id: str,
+    mapping: Dict[str, str],
+    job_id: str,
+    owner_id: str,
+) -> _PreparedRow:
+    mapped = _map_row(row, mapping)
     errors = _validate_row(mapped)
     if errors:
-        return CandidateImportResult(row_number=row_number, status="failed", errors=errors)
+        return _PreparedRow(result=CandidateImportResult(row_number=row_number, status="failed", errors=errors))
 
-    candidate_id = str(uuid4())
+    candidate_id = _import_row_id(import_id, row_number, "candidate")
     status = mapped.get("status") or "new"
     if status not in VALID_STATUSES:
         status = "new"
     skills = _parse_skills(mapped.get("skills"))
     application = CandidateApplication(
-        application_id=str(uuid4()),
+        application_id=_import_row_id(import_id, row_number, "application"),
         candidate_id=candidate_id,
-        job_id=job.job_id,
-        owner_id=job.owner_id,
+        job_id=job_id,
+        owner_id=owner_id,
         status=status,
         skills=skills,
+        email=mapped.get("email"),
+    )
+    github_url = mapped.get("github_url")
+    analysis = CandidateAnalysisState(
+        candidate_id=candidate_id,
+        job_id=job_id,
+        resume_analysis=_build_resume_analysis(mapped, skills),
+        github_analysis=_build_github_analysis(github_url) if github_url else None,
+        github_url=github_url,
+    )
+    return _PreparedRow(
+        result=CandidateImportResult(row_number=row_number, status="success", candidate_id=candidate_id),
+        application=application,
+        analysis=analysis,
     )
-    application_repo.save(application)
-    _process_analysis(candidate_id, job.job_id, mapped, skills, coordinator)
 
-    return CandidateImportResult(row_number=row_number, status="success", candidate_id=candidate_id)
+
+def _resolve_duplicates(
+    prepared: List[_PreparedRow],
+    job: CandidateImportJob,
+    application_repo: ApplicationStore,
+    uncommitted_emails: Dict[str, Tuple[str, str]],
+) -> List[_PreparedRow]:
+    # One email index lookup per chunk. A match is a duplicate unless it is this
+    # row's own earlier write (same deterministic id), replayed after a crash.
+    emails = {
+        normalize_email(row.application.email)
+        for row in prepared
+        if row.application is not None and row.application.email
+    }
+    existing = application_repo.match_emails(job.owner_id, job.job_id, emails - uncommitted_emails.keys())
+    resolved: List[_PreparedRow] = []
+    for row in prepared:
+        application = row.application
+        if application is None or not application.email:
+            resolved.append(row)
+            continue
+        email = normalize_email(application.email)
+        match = uncommitted_emails.get(email) or existing.get(email)
+        if match is None or match[0] == application.application_id:
+            uncommitted_emails[email] = (application.application_id, application.candidate_id)
+            resolved.append(row)
+            continue
+        application_id, candidate_id = match
+        if job.duplicate_mode == "skip":
+            resolved.append(_PreparedRow(result=replace(row.result, status="skipped", candidate_id=candidate_id)))
+            continue
+        # Update in place: reuse the existing ids so the application is replaced and rescored.
+        resolved.append(
+            _PreparedRow(
+                result=replace(row.result, candidate_id=candidate_id),
+                application=replace(application, application_id=application_id, candidate_id=candidate_id),
+                analysis=replace(row.analysis, candidate_id=candidate_id),
+            )
+        )
+    return resolved
+
+
+def _persist_chunk(
+    prepared: List[_PreparedRow],
+    unit_of_work: UnitOfWork,
+    coordinator: ScoringCoordinator,
+) -> None:
+    # Score first: if that raises, nothing from this chunk has been buffered yet.
+    coordinator.on_analyses_completed(
+        [row.analysis for row in prepared if row.analysis is not None],
+        unit_of_work=unit_of_work,
+    )
+    unit_of_work.save_applications([row.application for row in prepared if row.application is not None])
+
+
+def _import_row_id(import_id: str, row_number: int, kind: str) -> str:
+    return str(uuid5(_IMPORT_ROW_NAMESPACE, f"{import_id}:{row_number}:{kind}"))
 
 
 def _map_row(row: Dict[str, str], mapping: Dict[str, str]) -> Dict[str, str]:
@@ -165,22 +519,6 @@ def _validate_row(mapped: Dict[str, str]) -> List[str]:
     return errors
 
 
-def _process_analysis(
-    candidate_id: str,
-    job_id: str,
-    mapped: Dict[str, str],
-    skills: List[str],
-    coordinator: ScoringCoordinator,
-) -> None:
-    resume_analysis = _build_resume_analysis(mapped, skills)
-    coordinator.on_resume_parsed(candidate_id, job_id, resume_analysis, mapped.get("github_url"))
-
-    github_url = mapped.get("github_url")
-    if github_url:
-        github_analysis = _build_github_analysis(github_url)
-        coordinator.on_github_analysis_completed(candidate_id, job_id, github_analysis)
-
-
 def _build_resume_analysis(mapped: Dict[str, str], skills: List[str]) -> ResumeAnalysis:
     required_total = max(len(skills), 1)
     required_matched = min(len(skills), required_total)
@@ -218,20 +556,28 @@ def _parse_float(value: Optional[str]) -> float:
     if not text:
         return 0.0
     try:
-        return float(text)
+        number = float(text)
     except ValueError:
         return 0.0
+    # "nan" and "inf" parse as floats but are not usable numbers.
+    return number if math.isfinite(number) else 0.0
+
+
+@contextmanager
+def _open_csv(path: Path) -> Iterator[csv.DictReader]:
+    with path.open("rb") as handle:
+        delimiter = sniff_delimiter(handle.read(_SNIFF_BYTES))
+    # Decode incrementally; newline="" lets the csv module handle quoted line breaks.
+    with path.open("r", encoding="utf-8", errors="replace", newline="") as stream:
+        yield csv.DictReader(stream, delimiter=delimiter)
+
+
+def _clean_headers(reader: csv.DictReader) -> List[str]:
+    return [header.strip() for header in (reader.fieldnames or []) if header is not None]
 
 
-def _parse_csv_bytes(data: bytes) -> Tuple[List[str], List[Dict[str, str]]]:
-    decoded = data.decode("utf-8", errors="replace")
-    stream = io.StringIO(decoded)
-    reader = csv.DictReader(stream)
-    headers = [header.strip() for header in (reader.fieldnames or []) if header is not None]
-    rows: List[Dict[str, str]] = []
+def _clean_rows(reader: csv.DictReader) -> Iterator[Dict[str, str]]:
     for row in reader:
         if not isinstance(row, dict):
             continue
-        cleaned = {key.strip(): str(value).strip() if value is not None else "" for key, value in row.items()}
-        rows.append(cleaned)
-    return headers, rows
+        yield {key.strip(): str(value).strip() if value is not None else "" for key, value in row.items()}
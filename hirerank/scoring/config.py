@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict
 
 
+def _check_weights(weights: Dict[str, float], label: str) -> None:
+    for name, value in weights.items():
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"{label} '{name}' must be a non-negative number.")
+
+
 @dataclass(frozen=True)
 class CategoryWeights:
     resume_skills: float = 0.25
@@ -13,6 +21,7 @@ class CategoryWeights:
     engineering_practices: float = 0.15
 
     def normalized(self) -> "CategoryWeights":
+        _check_weights(vars(self), "Category weight")
         total = (
             self.resume_skills
             + self.github_code_quality
@@ -48,6 +57,7 @@ class ResumeSubWeights:
     nice_to_have: float = 0.20
 
     def normalized(self) -> "ResumeSubWeights":
+        _check_weights(vars(self), "Resume sub-weight")
         total = self.required_skills + self.experience_fit + self.nice_to_have
         if total <= 0:
             raise ValueError("Total resume sub-weights must be greater than zero.")
@@ -64,11 +74,20 @@ class ScoringConfig:
     category_weights: CategoryWeights = field(default_factory=CategoryWeights)
     resume_subweights: ResumeSubWeights = field(default_factory=ResumeSubWeights)
     github_required: bool = False
+    version: int = 0
 
     def normalized(self) -> "ScoringConfig":
-        return ScoringConfig(
-            job_id=self.job_id,
-            category_weights=self.category_weights.normalized(),
-            resume_subweights=self.resume_subweights.normalized(),
-            github_required=self.github_required,
-        )
+        return _normalized_config(self)
+
+
+@lru_cache(maxsize=1024)
+def _normalized_config(config: ScoringConfig) -> ScoringConfig:
+    # Configs are frozen, so every event and batch for the same config version
+    # shares one normalized copy.
+    return ScoringConfig(
+        job_id=config.job_id,
+        category_weights=config.category_weights.normalized(),
+        resume_subweights=config.resume_subweights.normalized(),
+        github_required=config.github_required,
+        version=config.version,
+    )
@@ -1,10 +1,25 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+from array import array
+from collections.abc import Sequence as SequenceABC
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from hirerank.scoring.config import ScoringConfig
-from hirerank.scoring.models import ScoreBreakdown, ScoreComponent, ScoreResult
+import numpy as np
+
+from hirerank.scoring import explanations
+from hirerank.scoring.config import CategoryWeights, ScoringConfig
+from hirerank.scoring.matrix import component_matrix
+from hirerank.scoring.models import CATEGORY_ORDER, ScoreBatch, ScoreBreakdown, ScoreComponent, ScoreResult
+
+_Explanation = Tuple[str, Optional[Dict[str, object]]]
+# Explanation parameters as ScoreBreakdown packs them: (names, values).
+_PackedParams = Tuple[Tuple[str, ...], Tuple[object, ...]]
 
 
 @dataclass
@@ -33,6 +48,10 @@ class ProjectAnalysis:
     green_flags: List[str]
 
 
+_CATEGORY_ORDER = CATEGORY_ORDER
+_GITHUB_CATEGORIES = CATEGORY_ORDER[1:]
+
+
 def _clamp(score: float) -> float:
     return max(0.0, min(100.0, score))
 
@@ -51,12 +70,21 @@ def _normalize_available(weights: Dict[str, float], available: Iterable[str]) ->
     return {key: value / total for key, value in available_weights.items()}
 
 
-def _combine_explanations(lines: Iterable[str]) -> str:
-    return "\n".join(line for line in lines if line)
+def _resume_explanation(resume: ResumeAnalysis) -> _Explanation:
+    return (
+        explanations.RESUME_TEMPLATE,
+        {
+            "required_matched": resume.required_skills_matched,
+            "required_total": resume.required_skills_total,
+            "nice_matched": resume.nice_to_have_matched,
+            "nice_total": resume.nice_to_have_total,
+            "experience_years": resume.experience_years,
+            "required_experience_years": resume.required_experience_years,
+        },
+    )
 
 
-def _resume_score(resume: ResumeAnalysis, config: ScoringConfig) -> Tuple[float, str]:
-    subweights = config.resume_subweights.normalized()
+def _resume_score(resume: ResumeAnalysis, config: ScoringConfig) -> Tuple[float, _Explanation, Dict[str, float]]:
     required_ratio = _safe_ratio(resume.required_skills_matched, resume.required_skills_total)
     nice_ratio = _safe_ratio(resume.nice_to_have_matched, resume.nice_to_have_total)
 
@@ -68,29 +96,27 @@ def _resume_score(resume: ResumeAnalysis, config: ScoringConfig) -> Tuple[float,
     else:
         experience_score = _clamp((resume.experience_years / resume.required_experience_years) * 100)
 
-    total_score = (
-        required_score * subweights.required_skills
-        + experience_score * subweights.experience_fit
-        + nice_score * subweights.nice_to_have
-    )
+    subscores = {
+        "required_skills": required_score,
+        "experience_fit": experience_score,
+        "nice_to_have": nice_score,
+    }
+    return _combine_resume_subscores(subscores, config), _resume_explanation(resume), subscores
+
 
-    explanation = _combine_explanations(
-        [
-            f"Required skills match: {resume.required_skills_matched}/{resume.required_skills_total}.",
-            f"Experience fit: {resume.experience_years:.1f} yrs vs {resume.required_experience_years:.1f} yrs required.",
-            (
-                f"Nice-to-have skills match: {resume.nice_to_have_matched}/{resume.nice_to_have_total}."
-                if resume.nice_to_have_total > 0
-                else "Nice-to-have skills not specified."
-            ),
-        ]
+def _combine_resume_subscores(subscores: Dict[str, float], config: ScoringConfig) -> float:
+    subweights = config.resume_subweights.normalized()
+    total_score = (
+        subscores["required_skills"] * subweights.required_skills
+        + subscores["experience_fit"] * subweights.experience_fit
+        + subscores["nice_to_have"] * subweights.nice_to_have
     )
-    return _clamp(total_score), explanation
+    return _clamp(total_score)
 
 
-def _project_originality(projects: List[Dict[str, object]]) -> Tuple[Optional[float], str]:
+def _project_originality(projects: List[Dict[str, object]]) -> Tuple[Optional[float], _Explanation]:
     if not projects:
-        return None, "No GitHub projects available to assess originality."
+        return None, (explanations.ORIGINALITY_NO_PROJECTS_TEMPLATE, None)
 
     project_scores: List[float] = []
     tutorial_flags: List[str] = []
@@ -107,56 +133,46 @@ def _project_originality(projects: List[Dict[str, object]]) -> Tuple[Optional[fl
         green_flags.extend([str(item) for item in green])
 
     if not project_scores:
-        return None, "Originality score missing from GitHub analysis."
+        return None, (explanations.ORIGINALITY_UNSCORED_TEMPLATE, None)
 
     average_score = sum(project_scores) / len(project_scores)
-    explanation_lines = [f"Average originality across {len(project_scores)} projects: {average_score:.1f}." ]
+    params: Dict[str, object] = {"projects": len(project_scores), "average": average_score}
     if tutorial_flags:
-        explanation_lines.append(f"Tutorial indicators: {', '.join(sorted(set(tutorial_flags)))}.")
+        params["tutorial_indicators"] = sorted(set(tutorial_flags))
     if green_flags:
-        explanation_lines.append(f"Originality signals: {', '.join(sorted(set(green_flags)))}.")
+        params["green_flags"] = sorted(set(green_flags))
 
-    return _clamp(average_score), _combine_explanations(explanation_lines)
+    return _clamp(average_score), (explanations.ORIGINALITY_TEMPLATE, params)
 
 
-def _github_component_score(
-    github: GitHubAnalysis,
-) -> Tuple[float, float, float, List[str]]:
+def _github_component_score(github: GitHubAnalysis) -> Tuple[float, float, float]:
     code_quality = _clamp(github.code_quality_score)
     documentation = _clamp(github.documentation_score)
     engineering = _clamp(github.engineering_practices_score)
-    return code_quality, documentation, engineering, [
-        f"Code quality score: {code_quality:.1f}.",
-        f"Documentation quality score: {documentation:.1f}.",
-        f"Engineering practices score: {engineering:.1f}.",
-    ]
-
+    return code_quality, documentation, engineering
 
-def compute_score(
-    candidate_id: str,
-    job_id: str,
-    config: ScoringConfig,
-    resume: Optional[ResumeAnalysis] = None,
-    github: Optional[GitHubAnalysis] = None,
-) -> ScoreResult:
-    normalized_config = config.normalized()
-    weights = normalized_config.category_weights
 
+def _build_components(
+    weights: CategoryWeights,
+    resume_part: Optional[Tuple[float, _Explanation, Dict[str, float]]],
+    github_part: Optional[Tuple[float, float, float]],
+    originality_part: Optional[Tuple[Optional[float], _Explanation]],
+) -> List[ScoreComponent]:
     components: List[ScoreComponent] = []
-    available_categories: List[str] = []
 
-    if resume:
-        resume_score, resume_explanation = _resume_score(resume, normalized_config)
+    if resume_part:
+        resume_score, (resume_template, resume_params), resume_subscores = resume_part
         components.append(
             ScoreComponent(
                 category="resume_skills",
                 score=resume_score,
                 weight=weights.resume_skills,
                 weighted_score=0.0,
-                explanation=resume_explanation,
+                template=resume_template,
+                params=resume_params,
+                subscores=resume_subscores,
             )
         )
-        available_categories.append("resume_skills")
     else:
         components.append(
             ScoreComponent(
@@ -164,13 +180,13 @@ def compute_score(
                 score=None,
                 weight=weights.resume_skills,
                 weighted_score=0.0,
-                explanation="Resume analysis missing; resume/skills score not calculated.",
+                template=explanations.RESUME_MISSING_TEMPLATE,
             )
         )
 
-    if github:
-        code_quality, documentation, engineering, explanations = _github_component_score(github)
-        originality_score, originality_explanation = _project_originality(github.projects)
+    if github_part and originality_part:
+        code_quality, documentation, engineering = github_part
+        originality_score, (originality_template, originality_params) = originality_part
         components.extend(
             [
                 ScoreComponent(
@@ -178,39 +194,32 @@ def compute_score(
                     score=code_quality,
                     weight=weights.github_code_quality,
                     weighted_score=0.0,
-                    explanation=explanations[0],
+                    template=explanations.CODE_QUALITY_TEMPLATE,
                 ),
                 ScoreComponent(
                     category="documentation_quality",
                     score=documentation,
                     weight=weights.documentation_quality,
                     weighted_score=0.0,
-                    explanation=explanations[1],
+                    template=explanations.DOCUMENTATION_TEMPLATE,
                 ),
                 ScoreComponent(
                     category="engineering_practices",
                     score=engineering,
                     weight=weights.engineering_practices,
                     weighted_score=0.0,
-                    explanation=explanations[2],
+                    template=explanations.ENGINEERING_TEMPLATE,
                 ),
                 ScoreComponent(
                     category="project_originality",
                     score=originality_score,
                     weight=weights.project_originality,
                     weighted_score=0.0,
-                    explanation=originality_explanation,
+                    template=originality_template,
+                    params=originality_params,
                 ),
             ]
         )
-        available_categories.extend(
-            [
-                "github_code_quality",
-                "documentation_quality",
-                "engineering_practices",
-                "project_originality",
-            ]
-        )
     else:
         components.extend(
             [
@@ -219,64 +228,513 @@ def compute_score(
                     score=None,
                     weight=weights.github_code_quality,
                     weighted_score=0.0,
-                    explanation="GitHub analysis missing; code quality not scored.",
+                    template=explanations.CODE_QUALITY_MISSING_TEMPLATE,
                 ),
                 ScoreComponent(
                     category="project_originality",
                     score=None,
                     weight=weights.project_originality,
                     weighted_score=0.0,
-                    explanation="GitHub analysis missing; originality not scored.",
+                    template=explanations.ORIGINALITY_MISSING_TEMPLATE,
                 ),
                 ScoreComponent(
                     category="documentation_quality",
                     score=None,
                     weight=weights.documentation_quality,
                     weighted_score=0.0,
-                    explanation="GitHub analysis missing; documentation not scored.",
+                    template=explanations.DOCUMENTATION_MISSING_TEMPLATE,
                 ),
                 ScoreComponent(
                     category="engineering_practices",
                     score=None,
                     weight=weights.engineering_practices,
                     weighted_score=0.0,
-                    explanation="GitHub analysis missing; engineering practices not scored.",
+                    template=explanations.ENGINEERING_MISSING_TEMPLATE,
                 ),
             ]
         )
+    return components
 
-    normalized_weights = _normalize_available(
-        {
-            "resume_skills": weights.resume_skills,
-            "github_code_quality": weights.github_code_quality,
-            "project_originality": weights.project_originality,
-            "documentation_quality": weights.documentation_quality,
-            "engineering_practices": weights.engineering_practices,
-        },
-        available_categories,
+
+def _digest(value: object) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=1024)
+def _config_digest(config: ScoringConfig) -> str:
+    # Only the normalized weights change scores; job id and version do not.
+    normalized_config = config.normalized()
+    return _digest([asdict(normalized_config.category_weights), asdict(normalized_config.resume_subweights)])
+
+
+# Inputs hash as packed little-endian doubles (a presence flag, then the fields
+# of each analysis), followed by the project fields originality reads, so a
+# batch hashes straight from its columns without building dicts or JSON per row.
+_INPUT_WIDTH = 11
+_NO_RESUME = (0.0,) * 7
+_NO_GITHUB = (0.0,) * 4
+
+
+def _input_values(resume: Optional[ResumeAnalysis], github: Optional[GitHubAnalysis]) -> Tuple[float, ...]:
+    resume_values = (
+        (
+            1.0,
+            resume.required_skills_matched,
+            resume.required_skills_total,
+            resume.nice_to_have_matched,
+            resume.nice_to_have_total,
+            resume.experience_years,
+            resume.required_experience_years,
+        )
+        if resume
+        else _NO_RESUME
+    )
+    github_values = (
+        (1.0, github.code_quality_score, github.documentation_score, github.engineering_practices_score)
+        if github
+        else _NO_GITHUB
+    )
+    return resume_values + github_values
+
+
+@dataclass
+class _ProjectColumns:
+    # Every row's projects flattened into the fields originality reads; row i
+    # owns the projects from starts[i] to starts[i] + counts[i].
+    counts: List[int]
+    starts: List[int]
+    # The originality score, or None when it is not a number.
+    originality: List[Optional[float]]
+    tutorial: List[bool]
+    indicators: List[object]
+    green_flags: List[object]
+
+    def scores(self, row: int) -> List[float]:
+        start = self.starts[row]
+        return [value for value in self.originality[start : start + self.counts[row]] if value is not None]
+
+    def explanation_params(self, row: int) -> _PackedParams:
+        # The parameters _project_originality explains a scored row with.
+        start = self.starts[row]
+        end = start + self.counts[row]
+        project_scores = self.scores(row)
+        tutorial_items = (
+            found for is_tutorial, found in zip(self.tutorial[start:end], self.indicators[start:end]) if is_tutorial
+        )
+        tutorial_flags = sorted(set(map(str, chain.from_iterable(found or () for found in tutorial_items))))
+        green_flags = sorted(set(map(str, chain.from_iterable(flags or () for flags in self.green_flags[start:end]))))
+        values: Tuple[object, ...] = (len(project_scores), sum(project_scores) / len(project_scores))
+        if tutorial_flags:
+            values += (tutorial_flags,)
+        if green_flags:
+            values += (green_flags,)
+        return _ORIGINALITY_PARAM_KEYS[(bool(tutorial_flags), bool(green_flags))], values
+
+
+_ORIGINALITY_PARAM_KEYS = {
+    (False, False): ("projects", "average"),
+    (True, False): ("projects", "average", "tutorial_indicators"),
+    (False, True): ("projects", "average", "green_flags"),
+    (True, True): ("projects", "average", "tutorial_indicators", "green_flags"),
+}
+
+
+def _project_columns(project_lists: Sequence[Sequence[Dict[str, object]]]) -> _ProjectColumns:
+    counts = [len(projects) for projects in project_lists]
+    flat = [project for projects in project_lists for project in projects]
+    return _ProjectColumns(
+        counts=counts,
+        starts=np.cumsum([0] + counts[:-1], dtype=np.int64).tolist() if counts else [],
+        originality=[
+            float(value) if isinstance(value, (int, float)) else None
+            for value in (project.get("originality_score") for project in flat)
+        ],
+        tutorial=[bool(project.get("is_tutorial")) for project in flat],
+        indicators=[project.get("tutorial_indicators") for project in flat],
+        green_flags=[project.get("green_flags") for project in flat],
+    )
+
+
+def _inputs_digests(inputs: np.ndarray, projects: _ProjectColumns) -> List[str]:
+    # inputs holds one _input_values row per candidate. A row is hashed as its
+    # raw bytes plus, when it has projects, each project's (has a score,
+    # originality, is_tutorial) as doubles and its indicator and flag lists.
+    inputs = np.ascontiguousarray(inputs, dtype="<f8")
+    numbers = np.empty((len(projects.originality), 3), dtype="<f8")
+    numbers[:, 0] = [value is not None for value in projects.originality]
+    numbers[:, 1] = [0.0 if value is None else value for value in projects.originality]
+    numbers[:, 2] = projects.tutorial
+    input_bytes = inputs.tobytes()
+    project_bytes = numbers.tobytes()
+    width = inputs.shape[1] * 8
+    digests: List[str] = []
+    for index, (start, count) in enumerate(zip(projects.starts, projects.counts)):
+        row = input_bytes[index * width : (index + 1) * width]
+        if count:
+            end = start + count
+            row += project_bytes[start * 24 : end * 24]
+            row += f"{projects.indicators[start:end]!r}\x1f{projects.green_flags[start:end]!r}".encode("utf-8")
+        digests.append(hashlib.blake2b(row, digest_size=16).hexdigest())
+    return digests
+
+
+def _inputs_digest(resume: Optional[ResumeAnalysis], github: Optional[GitHubAnalysis]) -> str:
+    inputs = np.array([_input_values(resume, github)], dtype=float)
+    return _inputs_digests(inputs, _project_columns([github.projects if github else ()]))[0]
+
+
+def score_fingerprint(
+    config: ScoringConfig,
+    resume: Optional[ResumeAnalysis] = None,
+    github: Optional[GitHubAnalysis] = None,
+) -> str:
+    # Inputs and config hash separately so rescore can swap the config half.
+    return f"{_inputs_digest(resume, github)}:{_config_digest(config)}"
+
+
+def score_fingerprints(
+    config: ScoringConfig,
+    resumes: Sequence[Optional[ResumeAnalysis]],
+    githubs: Sequence[Optional[GitHubAnalysis]],
+) -> List[str]:
+    # score_fingerprint for many candidates at once.
+    inputs = np.array([_input_values(resume, github) for resume, github in zip(resumes, githubs)], dtype=float)
+    config_digest = _config_digest(config)
+    return [
+        f"{digest}:{config_digest}"
+        for digest in _inputs_digests(
+            inputs.reshape(-1, _INPUT_WIDTH),
+            _project_columns([github.projects if github else () for github in githubs]),
+        )
+    ]
+
+
+def _rescored_fingerprint(fingerprint: Optional[str], config_digest: str) -> Optional[str]:
+    if not fingerprint or ":" not in fingerprint:
+        return None
+    return f"{fingerprint.split(':', 1)[0]}:{config_digest}"
+
+
+def compute_score(
+    candidate_id: str,
+    job_id: str,
+    config: ScoringConfig,
+    resume: Optional[ResumeAnalysis] = None,
+    github: Optional[GitHubAnalysis] = None,
+) -> ScoreResult:
+    normalized_config = config.normalized()
+    weights = normalized_config.category_weights
+
+    available_categories: List[str] = []
+    resume_part = None
+    github_part = None
+    originality_part = None
+    if resume:
+        resume_part = _resume_score(resume, normalized_config)
+        available_categories.append("resume_skills")
+    if github:
+        github_part = _github_component_score(github)
+        originality_part = _project_originality(github.projects)
+        available_categories.extend(_GITHUB_CATEGORIES)
+
+    components = _build_components(weights, resume_part, github_part, originality_part)
+    total_score = _apply_weights(components, weights, available_categories)
+
+    return ScoreResult(
+        candidate_id=candidate_id,
+        job_id=job_id,
+        total_score=total_score,
+        breakdown=ScoreBreakdown.from_components(components),
+        config_version=config.version,
+        fingerprint=score_fingerprint(config, resume, github),
     )
 
+
+def rescore(result: ScoreResult, config: ScoringConfig) -> ScoreResult:
+    return rescore_batch([result], config)[0]
+
+
+def rescore_batch(results: Sequence[ScoreResult], config: ScoringConfig) -> ScoreBatch:
+    # Totals are a linear combination of the stored component scores, so a
+    # weight change re-weights the stored breakdowns as one component matrix,
+    # the same one the what-if simulation uses, instead of re-running analysis.
+    if not results:
+        return ScoreBatch()
+    matrix = component_matrix(results)
+    breakdowns, totals = matrix.reweighted_breakdowns(config, [result.breakdown for result in results])
+    config_digest = _config_digest(config)
+    return ScoreBatch(
+        candidate_ids=matrix.candidate_ids,
+        job_ids=[result.job_id for result in results],
+        total_scores=totals.tolist(),
+        breakdowns=breakdowns,
+        created_at=[datetime.utcnow()] * len(results),
+        config_versions=[config.version] * len(results),
+        fingerprints=[_rescored_fingerprint(result.fingerprint, config_digest) for result in results],
+    )
+
+
+def _apply_weights(
+    components: List[ScoreComponent],
+    weights: CategoryWeights,
+    available_categories: List[str],
+) -> float:
+    normalized_weights = _normalize_available(_weights_by_category(weights), available_categories)
+    # Sum in canonical category order so stored (key-sorted) breakdowns total identically.
+    by_category = {component.category: component for component in components}
     total_score = 0.0
-    for component in components:
-        if component.score is None:
+    for category in _CATEGORY_ORDER:
+        component = by_category.get(category)
+        if component is None or component.score is None:
             continue
         normalized_weight = normalized_weights.get(component.category, 0.0)
         component.weighted_score = component.score * normalized_weight
         total_score += component.weighted_score
 
-    total_score = _clamp(total_score)
+    return _clamp(total_score)
+
+
+# A batch row lists every category in CATEGORY_ORDER when GitHub analysis
+# exists, otherwise in the order _build_components lists the missing ones.
+_GITHUB_MISSING_ORDER = (
+    "resume_skills",
+    "github_code_quality",
+    "project_originality",
+    "documentation_quality",
+    "engineering_practices",
+)
+_GITHUB_MISSING_COLUMNS = [
+    _CATEGORY_ORDER.index(category) * 3 + offset for category in _GITHUB_MISSING_ORDER for offset in range(3)
+]
+_RESUME_PARAM_KEYS = (
+    "required_matched",
+    "required_total",
+    "nice_matched",
+    "nice_total",
+    "experience_years",
+    "required_experience_years",
+)
+_RESUME_SUBSCORE_KEYS = ("required_skills", "experience_fit", "nice_to_have")
+_NO_RESUME_FIELDS = (0,) * 6
+_NO_GITHUB_FIELDS = (0.0,) * 3
+_NO_SUBSCORES = (None,) * 5
+
+
+def compute_scores_batch(
+    config: ScoringConfig,
+    resumes: Sequence[Optional[ResumeAnalysis]],
+    githubs: Sequence[Optional[GitHubAnalysis]],
+    candidate_ids: Sequence[str],
+) -> ScoreBatch:
+    # Scores stay in columns end to end: no ScoreComponents or ScoreResults are
+    # built here, and stores persist the batch straight from its columns.
+    count = len(candidate_ids)
+    if len(resumes) != count or len(githubs) != count:
+        raise ValueError("resumes, githubs and candidate_ids must have the same length.")
+    if count == 0:
+        return ScoreBatch()
 
-    explanation = _combine_explanations(
-        [
-            "Candidate scoring summary:",
-            *[f"- {component.category.replace('_', ' ').title()}: {component.explanation}" for component in components],
-        ]
+    normalized_config = config.normalized()
+    weights = normalized_config.category_weights
+    # _resume_score normalizes the (already normalized) sub-weights again; match it exactly.
+    subweights = normalized_config.resume_subweights.normalized()
+
+    has_resume_list = [resume is not None for resume in resumes]
+    has_github_list = [github is not None for github in githubs]
+    has_resume = np.array(has_resume_list, dtype=bool)
+    has_github = np.array(has_github_list, dtype=bool)
+
+    # Raw resume fields per row double as the explanation parameters. Rows
+    # without an analysis hold zeros and are masked out below.
+    resume_fields = [
+        (
+            r.required_skills_matched,
+            r.required_skills_total,
+            r.nice_to_have_matched,
+            r.nice_to_have_total,
+            r.experience_years,
+            r.required_experience_years,
+        )
+        if r
+        else _NO_RESUME_FIELDS
+        for r in resumes
+    ]
+    github_fields = [
+        (g.code_quality_score, g.documentation_score, g.engineering_practices_score) if g else _NO_GITHUB_FIELDS
+        for g in githubs
+    ]
+    resume_matrix = np.array(resume_fields, dtype=float).reshape(count, 6)
+    github_matrix = np.array(github_fields, dtype=float).reshape(count, 3)
+    projects = _project_columns([github.projects if github else () for github in githubs])
+
+    config_digest = _config_digest(config)
+    inputs = np.column_stack([has_resume, resume_matrix, has_github, github_matrix])
+    fingerprints = [f"{digest}:{config_digest}" for digest in _inputs_digests(inputs, projects)]
+
+    required_matched, required_total, nice_matched, nice_total, experience, required_experience = resume_matrix.T
+    required_score = _clamp_array(_ratio_array(required_matched, required_total) * 100)
+    nice_score = np.where(~(nice_total <= 0), _clamp_array(_ratio_array(nice_matched, nice_total) * 100), 50.0)
+    experience_score = np.where(
+        required_experience <= 0,
+        100.0,
+        _clamp_array(_ratio_array(experience, required_experience) * 100),
+    )
+    resume_score = _clamp_array(
+        required_score * subweights.required_skills
+        + experience_score * subweights.experience_fit
+        + nice_score * subweights.nice_to_have
+    )
+    resume_score[~has_resume] = np.nan
+
+    github_scores = _clamp_array(github_matrix)
+    github_scores[~has_github] = np.nan
+    code_quality, documentation, engineering = github_scores.T
+    originality, originality_templates = _originality_columns(has_github_list, projects)
+
+    # Re-weight over available categories, summing in the same order as the scalar path.
+    category_weights = _weights_by_category(weights)
+    available_total = np.zeros(count)
+    available_total += np.where(has_resume, category_weights["resume_skills"], 0.0)
+    for category in _GITHUB_CATEGORIES:
+        available_total += np.where(has_github, category_weights[category], 0.0)
+    safe_total = np.where(available_total == 0, 1.0, available_total)
+
+    scores = {
+        "resume_skills": resume_score,
+        "github_code_quality": code_quality,
+        "documentation_quality": documentation,
+        "engineering_practices": engineering,
+        "project_originality": originality,
+    }
+    # (score, weight, weighted_score) per category in CATEGORY_ORDER, NaN for missing scores.
+    values = np.empty((count, 3 * len(_CATEGORY_ORDER)))
+    total = np.zeros(count)
+    for position, category in enumerate(_CATEGORY_ORDER):
+        normalized_weight = np.where(available_total == 0, 0.0, category_weights[category] / safe_total)
+        category_scores = scores[category]
+        weighted = np.where(np.isnan(category_scores), 0.0, category_scores * normalized_weight)
+        values[:, 3 * position] = category_scores
+        values[:, 3 * position + 1] = category_weights[category]
+        values[:, 3 * position + 2] = weighted
+        total += weighted
+    values[~has_github] = values[~has_github][:, _GITHUB_MISSING_COLUMNS]
+
+    layouts = {key: _layout(*key) for key in set(zip(has_resume_list, originality_templates))}
+    return ScoreBatch(
+        candidate_ids=list(candidate_ids),
+        job_ids=[config.job_id] * count,
+        total_scores=_clamp_array(total).tolist(),
+        breakdowns=_BatchBreakdowns(
+            layouts=[layouts[key] for key in zip(has_resume_list, originality_templates)],
+            values=values,
+            resume_params=[fields if present else None for present, fields in zip(has_resume_list, resume_fields)],
+            resume_subscores=np.column_stack([required_score, experience_score, nice_score]),
+            projects=projects,
+        ),
+        created_at=[datetime.utcnow()] * count,
+        config_versions=[config.version] * count,
+        fingerprints=fingerprints,
     )
 
-    return ScoreResult(
-        candidate_id=candidate_id,
-        job_id=job_id,
-        total_score=total_score,
-        breakdown=ScoreBreakdown(components=components),
-        explanation=explanation,
+
+def _layout(resume_present: bool, originality_template: Optional[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    # (categories, templates) of a batch row; None stands for missing GitHub analysis.
+    resume_template = explanations.RESUME_TEMPLATE if resume_present else explanations.RESUME_MISSING_TEMPLATE
+    if originality_template is None:
+        return _GITHUB_MISSING_ORDER, (
+            resume_template,
+            explanations.CODE_QUALITY_MISSING_TEMPLATE,
+            explanations.ORIGINALITY_MISSING_TEMPLATE,
+            explanations.DOCUMENTATION_MISSING_TEMPLATE,
+            explanations.ENGINEERING_MISSING_TEMPLATE,
+        )
+    return _CATEGORY_ORDER, (
+        resume_template,
+        explanations.CODE_QUALITY_TEMPLATE,
+        explanations.DOCUMENTATION_TEMPLATE,
+        explanations.ENGINEERING_TEMPLATE,
+        originality_template,
     )
+
+
+@dataclass
+class _BatchBreakdowns(SequenceABC):
+    # The breakdowns of one compute_scores_batch call, kept as the matrices they
+    # were computed in; each ScoreBreakdown is packed only when it is read.
+    layouts: List[Tuple[Tuple[str, ...], Tuple[str, ...]]]
+    values: np.ndarray
+    resume_params: List[Optional[Tuple[object, ...]]]
+    resume_subscores: np.ndarray
+    projects: _ProjectColumns
+
+    def __len__(self) -> int:
+        return len(self.layouts)
+
+    def __getitem__(self, index: int) -> ScoreBreakdown:
+        if isinstance(index, slice):
+            return [self[row] for row in range(len(self))[index]]
+        categories, templates = self.layouts[index]
+        originality_params = None
+        if templates[-1] == explanations.ORIGINALITY_TEMPLATE:
+            originality_params = self.projects.explanation_params(index)
+        resume_params = self.resume_params[index]
+        if resume_params is None:
+            params = (None, None, None, None, originality_params)
+            subscores = _NO_SUBSCORES
+        else:
+            params = ((_RESUME_PARAM_KEYS, resume_params), None, None, None, originality_params)
+            resume_subscores = (_RESUME_SUBSCORE_KEYS, tuple(self.resume_subscores[index].tolist()))
+            subscores = (resume_subscores, None, None, None, None)
+        return ScoreBreakdown(
+            categories=categories,
+            values=array("d", self.values[index].tobytes()),
+            templates=templates,
+            params=params,
+            subscores=subscores,
+        )
+
+
+def _originality_columns(
+    has_github: Sequence[bool], projects: _ProjectColumns
+) -> Tuple[np.ndarray, List[Optional[str]]]:
+    # _project_originality's clamped score (NaN when unscored) and template
+    # (None without GitHub analysis) per row.
+    scores: List[float] = []
+    templates: List[Optional[str]] = []
+    for row, present in enumerate(has_github):
+        if not present:
+            scores.append(np.nan)
+            templates.append(None)
+        elif not projects.counts[row]:
+            scores.append(np.nan)
+            templates.append(explanations.ORIGINALITY_NO_PROJECTS_TEMPLATE)
+        else:
+            project_scores = projects.scores(row)
+            if project_scores:
+                scores.append(_clamp(sum(project_scores) / len(project_scores)))
+                templates.append(explanations.ORIGINALITY_TEMPLATE)
+            else:
+                scores.append(np.nan)
+                templates.append(explanations.ORIGINALITY_UNSCORED_TEMPLATE)
+    return np.array(scores, dtype=float), templates
+
+
+def _weights_by_category(weights: CategoryWeights) -> Dict[str, float]:
+    return {
+        "resume_skills": weights.resume_skills,
+        "github_code_quality": weights.github_code_quality,
+        "project_originality": weights.project_originality,
+        "documentation_quality": weights.documentation_quality,
+        "engineering_practices": weights.engineering_practices,
+    }
+
+
+def _clamp_array(scores: np.ndarray) -> np.ndarray:
+    # _clamp maps NaN to 100 (min() keeps its first argument), so do the same here.
+    return np.clip(np.nan_to_num(scores, nan=100.0), 0.0, 100.0)
+
+
+def _ratio_array(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # Like _safe_ratio, only non-positive denominators count as missing; NaN divides through.
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=~(denominator <= 0))
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional
+
+from hirerank.scoring.models import CATEGORY_ORDER, ScoreComponent, ScoreResult
+
+RESUME_TEMPLATE = "resume"
+RESUME_MISSING_TEMPLATE = "resume_missing"
+CODE_QUALITY_TEMPLATE = "code_quality"
+DOCUMENTATION_TEMPLATE = "documentation"
+ENGINEERING_TEMPLATE = "engineering"
+ORIGINALITY_TEMPLATE = "originality"
+ORIGINALITY_NO_PROJECTS_TEMPLATE = "originality_no_projects"
+ORIGINALITY_UNSCORED_TEMPLATE = "originality_unscored"
+CODE_QUALITY_MISSING_TEMPLATE = "code_quality_missing"
+ORIGINALITY_MISSING_TEMPLATE = "originality_missing"
+DOCUMENTATION_MISSING_TEMPLATE = "documentation_missing"
+ENGINEERING_MISSING_TEMPLATE = "engineering_missing"
+TEXT_TEMPLATE = "text"
+
+_Params = Dict[str, object]
+
+_STATIC_TEMPLATES = {
+    RESUME_MISSING_TEMPLATE: "Resume analysis missing; resume/skills score not calculated.",
+    ORIGINALITY_NO_PROJECTS_TEMPLATE: "No GitHub projects available to assess originality.",
+    ORIGINALITY_UNSCORED_TEMPLATE: "Originality score missing from GitHub analysis.",
+    CODE_QUALITY_MISSING_TEMPLATE: "GitHub analysis missing; code quality not scored.",
+    ORIGINALITY_MISSING_TEMPLATE: "GitHub analysis missing; originality not scored.",
+    DOCUMENTATION_MISSING_TEMPLATE: "GitHub analysis missing; documentation not scored.",
+    ENGINEERING_MISSING_TEMPLATE: "GitHub analysis missing; engineering practices not scored.",
+}
+
+
+def _resume_lines(component: ScoreComponent, params: _Params) -> List[str]:
+    return [
+        f"Required skills match: {params['required_matched']}/{params['required_total']}.",
+        f"Experience fit: {params['experience_years']:.1f} yrs vs {params['required_experience_years']:.1f} yrs required.",
+        (
+            f"Nice-to-have skills match: {params['nice_matched']}/{params['nice_total']}."
+            if params["nice_total"] > 0
+            else "Nice-to-have skills not specified."
+        ),
+    ]
+
+
+def _originality_lines(component: ScoreComponent, params: _Params) -> List[str]:
+    lines = [f"Average originality across {params['projects']} projects: {params['average']:.1f}."]
+    if params.get("tutorial_indicators"):
+        lines.append(f"Tutorial indicators: {', '.join(params['tutorial_indicators'])}.")
+    if params.get("green_flags"):
+        lines.append(f"Originality signals: {', '.join(params['green_flags'])}.")
+    return lines
+
+
+def _score_line(label: str) -> Callable[[ScoreComponent, _Params], List[str]]:
+    def render(component: ScoreComponent, params: _Params) -> List[str]:
+        return [f"{label} score: {component.score:.1f}."]
+
+    return render
+
+
+def _text_lines(component: ScoreComponent, params: _Params) -> List[str]:
+    return [line for line in str(params.get("text", "")).split("\n") if line]
+
+
+_TEMPLATES: Dict[str, Callable[[ScoreComponent, _Params], List[str]]] = {
+    RESUME_TEMPLATE: _resume_lines,
+    ORIGINALITY_TEMPLATE: _originality_lines,
+    CODE_QUALITY_TEMPLATE: _score_line("Code quality"),
+    DOCUMENTATION_TEMPLATE: _score_line("Documentation quality"),
+    ENGINEERING_TEMPLATE: _score_line("Engineering practices"),
+    TEXT_TEMPLATE: _text_lines,
+}
+
+
+def component_lines(component: ScoreComponent) -> List[str]:
+    static = _STATIC_TEMPLATES.get(component.template)
+    if static is not None:
+        return [static]
+    render = _TEMPLATES.get(component.template)
+    if render is None:
+        raise ValueError(f"Unknown explanation template '{component.template}'.")
+    return render(component, component.params or {})
+
+
+def render_component(component: ScoreComponent) -> str:
+    return "\n".join(component_lines(component))
+
+
+@lru_cache(maxsize=None)
+def _category_title(category: str) -> str:
+    return category.replace("_", " ").title()
+
+
+_CATEGORY_RANK = {category: rank for rank, category in enumerate(CATEGORY_ORDER)}
+# Without GitHub analysis the engine lists originality right after code quality.
+_GITHUB_MISSING_RANK = {
+    category: rank
+    for rank, category in enumerate(
+        ("resume_skills", "github_code_quality", "project_originality", "documentation_quality", "engineering_practices")
+    )
+}
+
+
+def _in_emitted_order(components: List[ScoreComponent]) -> List[ScoreComponent]:
+    # Stored breakdowns come back key-sorted; render in the order the engine built
+    # them so a loaded result reads exactly like the fresh one.
+    github_missing = any(component.template == CODE_QUALITY_MISSING_TEMPLATE for component in components)
+    rank = _GITHUB_MISSING_RANK if github_missing else _CATEGORY_RANK
+    return sorted(components, key=lambda component: rank.get(component.category, len(rank)))
+
+
+def explanation_lines(result: ScoreResult) -> Iterator[str]:
+    # Lazy so a summary only renders the components it shows.
+    yield "Candidate scoring summary:"
+    for component in _in_emitted_order(result.breakdown.components):
+        lines = component_lines(component)
+        yield f"- {_category_title(component.category)}: {lines[0] if lines else ''}"
+        yield from lines[1:]
+
+
+def render_explanation(result: ScoreResult) -> str:
+    return "\n".join(explanation_lines(result))
+
+
+def summarize_explanation(result: Optional[ScoreResult], max_lines: int = 2) -> str:
+    if result is None:
+        return "Score pending."
+    lines = (line.strip() for line in explanation_lines(result))
+    summary = "\n".join(islice((line for line in lines if line), max_lines))
+    return summary or "Score explanation pending."
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.models import CATEGORY_ORDER, ScoreBreakdown, ScoreResult
+
+RESUME_SUBSCORES = ("required_skills", "experience_fit", "nice_to_have")
+_COLUMNS = {category: column for column, category in enumerate(CATEGORY_ORDER)}
+
+
+@dataclass
+class ComponentMatrix:
+    candidate_ids: List[str]
+    # (n, 5) category scores in CATEGORY_ORDER; NaN where a category has no score.
+    scores: np.ndarray
+    # (n, 5) whether a category's weight counts for the candidate.
+    available: np.ndarray
+    # (n, 3) resume sub-scores; NaN rows fall back to the stored resume score.
+    resume_subscores: np.ndarray
+
+    def weigh(self, config: ScoringConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # (scores, weights, weighted scores, totals) under config, with the
+        # scalar engine's arithmetic and summation order so totals match it exactly.
+        normalized_config = config.normalized()
+        weights = normalized_config.category_weights
+        # The engine normalizes the (already normalized) sub-weights again.
+        subweights = normalized_config.resume_subweights.normalized()
+
+        scores = self.scores.copy()
+        has_subscores = ~np.isnan(self.resume_subscores).any(axis=1)
+        required, experience, nice = self.resume_subscores.T
+        resume = _clamp(
+            required * subweights.required_skills
+            + experience * subweights.experience_fit
+            + nice * subweights.nice_to_have
+        )
+        scores[:, 0] = np.where(has_subscores, resume, scores[:, 0])
+
+        weight_vector = np.array([getattr(weights, category) for category in CATEGORY_ORDER])
+        available_total = np.zeros(len(scores))
+        for column in range(len(CATEGORY_ORDER)):
+            available_total += np.where(self.available[:, column], weight_vector[column], 0.0)
+        safe_total = np.where(available_total == 0, 1.0, available_total)
+
+        weighted = np.zeros_like(scores)
+        totals = np.zeros(len(scores))
+        for column in range(len(CATEGORY_ORDER)):
+            normalized_weight = np.where(
+                self.available[:, column] & (available_total != 0), weight_vector[column] / safe_total, 0.0
+            )
+            weighted[:, column] = np.where(np.isnan(scores[:, column]), 0.0, scores[:, column] * normalized_weight)
+            totals += weighted[:, column]
+        return scores, weight_vector, weighted, _clamp(totals)
+
+    def totals(self, config: ScoringConfig) -> np.ndarray:
+        return self.weigh(config)[3]
+
+    def reweighted_breakdowns(
+        self, config: ScoringConfig, breakdowns: Sequence[ScoreBreakdown]
+    ) -> Tuple[List[ScoreBreakdown], np.ndarray]:
+        # Each stored breakdown with its scores, weights and weighted scores
+        # recomputed under config, plus the new totals. Categories, templates
+        # and parameters carry over; rows must be in the matrix's order.
+        scores, weight_vector, weighted, totals = self.weigh(config)
+        reweighted: List[ScoreBreakdown] = list(breakdowns)
+        for categories, rows in _rows_by_layout(breakdowns).items():
+            values = _values_matrix(breakdowns, rows, len(categories))
+            for position, category in enumerate(categories):
+                column = _COLUMNS.get(category)
+                if column is None:
+                    # The engine gives categories it does not know no weight.
+                    values[:, 3 * position + 1 : 3 * position + 3] = 0.0
+                    continue
+                values[:, 3 * position] = scores[rows, column]
+                values[:, 3 * position + 1] = weight_vector[column]
+                values[:, 3 * position + 2] = weighted[rows, column]
+            for row, packed in zip(rows, values):
+                stored = breakdowns[row]
+                reweighted[row] = ScoreBreakdown(
+                    categories=stored.categories,
+                    values=array("d", packed.tobytes()),
+                    templates=stored.templates,
+                    params=stored.params,
+                    subscores=stored.subscores,
+                )
+        return reweighted, totals
+
+
+def component_matrix(results: Sequence[ScoreResult]) -> ComponentMatrix:
+    # Reads scores straight from each breakdown's packed values, grouping rows
+    # by their category layout instead of building components per row.
+    count = len(results)
+    breakdowns = [result.breakdown for result in results]
+    scores = np.full((count, len(CATEGORY_ORDER)), np.nan)
+    resume_subscores = np.full((count, len(RESUME_SUBSCORES)), np.nan)
+
+    for categories, rows in _rows_by_layout(breakdowns).items():
+        values = _values_matrix(breakdowns, rows, len(categories))
+        for position, category in enumerate(categories):
+            if category in _COLUMNS:
+                scores[rows, _COLUMNS[category]] = values[:, 3 * position]
+        if "resume_skills" not in categories:
+            continue
+        position = categories.index("resume_skills")
+        for row in rows:
+            subscores = breakdowns[row].subscores
+            packed = subscores[position] if position < len(subscores) else None
+            if packed:
+                by_key = dict(zip(*packed))
+                resume_subscores[row] = [by_key.get(key, np.nan) for key in RESUME_SUBSCORES]
+
+    available = np.zeros((count, len(CATEGORY_ORDER)), dtype=bool)
+    available[:, 0] = ~np.isnan(scores[:, 0])
+    # Code quality is always scored when GitHub analysis exists; the whole
+    # GitHub group counts towards the weight total even without originality.
+    available[:, 1:] = ~np.isnan(scores[:, 1:2])
+    # Rows without a resume score keep their sub-scores out of the total.
+    resume_subscores[~available[:, 0]] = np.nan
+
+    return ComponentMatrix(
+        candidate_ids=[result.candidate_id for result in results],
+        scores=scores,
+        available=available,
+        resume_subscores=resume_subscores,
+    )
+
+
+def _rows_by_layout(breakdowns: Sequence[ScoreBreakdown]) -> Dict[Tuple[str, ...], List[int]]:
+    rows: Dict[Tuple[str, ...], List[int]] = {}
+    for row, breakdown in enumerate(breakdowns):
+        if breakdown.categories:
+            rows.setdefault(breakdown.categories, []).append(row)
+    return rows
+
+
+def _values_matrix(breakdowns: Sequence[ScoreBreakdown], rows: List[int], width: int) -> np.ndarray:
+    # One row of (score, weight, weighted_score) triples per breakdown.
+    packed = b"".join([breakdowns[row].values.tobytes() for row in rows])
+    return np.frombuffer(packed, dtype=float).reshape(len(rows), 3 * width).copy()
+
+
+def _clamp(scores: np.ndarray) -> np.ndarray:
+    # The engine's _clamp maps NaN to 100 (min() keeps its first argument).
+    return np.clip(np.nan_to_num(scores, nan=100.0), 0.0, 100.0)
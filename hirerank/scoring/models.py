@@ -1,43 +1,151 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import math
+from array import array
+from collections.abc import Sequence as SequenceABC
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+# The order the engine scores and sums categories in; explanations follow it too.
+CATEGORY_ORDER: Tuple[str, ...] = (
+    "resume_skills",
+    "github_code_quality",
+    "documentation_quality",
+    "engineering_practices",
+    "project_originality",
+)
 
-@dataclass
+# Breakdowns repeat the same few category, template and parameter-name
+# sequences, so every result shares one tuple per distinct sequence.
+_SHARED_SEQUENCES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+# A mapping packed as (shared key tuple, value tuple); far smaller than a dict.
+_PackedMapping = Tuple[Tuple[str, ...], Tuple[object, ...]]
+
+
+def _shared(values: Iterable[str]) -> Tuple[str, ...]:
+    values = tuple(values)
+    return _SHARED_SEQUENCES.setdefault(values, values)
+
+
+def _pack(mapping: Optional[Dict[str, object]]) -> Optional[_PackedMapping]:
+    if mapping is None:
+        return None
+    return _shared(mapping), tuple(mapping.values())
+
+
+def _unpack(packed: Optional[_PackedMapping]) -> Optional[Dict[str, object]]:
+    if packed is None:
+        return None
+    keys, values = packed
+    return dict(zip(keys, values))
+
+
+@dataclass(slots=True)
 class ScoreComponent:
     category: str
     score: Optional[float]
     weight: float
     weighted_score: float
-    explanation: str
+    # Explanations are stored as a template id plus its parameters and rendered
+    # on demand by hirerank.scoring.explanations.
+    template: str
+    params: Optional[Dict[str, object]] = None
+    subscores: Optional[Dict[str, float]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScoreBreakdown:
-    components: List[ScoreComponent] = field(default_factory=list)
+    # Packed column-wise: one float array holds (score, weight, weighted_score)
+    # per category, with NaN marking a missing score, so a result costs a few
+    # objects instead of one object, three floats and two dicts per component.
+    # Build one with from_columns or from_components.
+    categories: Tuple[str, ...] = ()
+    values: array = field(default_factory=lambda: array("d"))
+    templates: Tuple[str, ...] = ()
+    params: Tuple[Optional[_PackedMapping], ...] = ()
+    subscores: Tuple[Optional[_PackedMapping], ...] = ()
 
-    def as_dict(self) -> Dict[str, Dict[str, float | str | None]]:
-        return {
-            component.category: {
-                "score": component.score,
-                "weight": component.weight,
-                "weighted_score": component.weighted_score,
-                "explanation": component.explanation,
+    @classmethod
+    def from_columns(
+        cls,
+        categories: Iterable[str],
+        values: Iterable[float],
+        templates: Iterable[str],
+        params: Iterable[Optional[Dict[str, object]]],
+        subscores: Iterable[Optional[Dict[str, float]]],
+    ) -> ScoreBreakdown:
+        return cls(
+            categories=_shared(categories),
+            values=array("d", list(values)),
+            templates=_shared(templates),
+            params=tuple(_pack(mapping or None) for mapping in params),
+            subscores=tuple(_pack(mapping) for mapping in subscores),
+        )
+
+    @classmethod
+    def from_components(cls, components: Iterable[ScoreComponent]) -> ScoreBreakdown:
+        components = list(components)
+        values: List[float] = []
+        for component in components:
+            values.append(math.nan if component.score is None else component.score)
+            values.append(component.weight)
+            values.append(component.weighted_score)
+        return cls.from_columns(
+            [component.category for component in components],
+            values,
+            [component.template for component in components],
+            [component.params for component in components],
+            [component.subscores for component in components],
+        )
+
+    @property
+    def components(self) -> List[ScoreComponent]:
+        # Fresh views; changing them does not write back to the breakdown.
+        return [
+            ScoreComponent(
+                category=category,
+                score=self._score(index),
+                weight=self.values[index * 3 + 1],
+                weighted_score=self.values[index * 3 + 2],
+                template=self.templates[index],
+                params=_unpack(self.params[index]),
+                subscores=_unpack(self.subscores[index]),
+            )
+            for index, category in enumerate(self.categories)
+        ]
+
+    def as_dict(self) -> Dict[str, Dict[str, object]]:
+        breakdown: Dict[str, Dict[str, object]] = {}
+        for index, category in enumerate(self.categories):
+            details: Dict[str, object] = {
+                "score": self._score(index),
+                "weight": self.values[index * 3 + 1],
+                "weighted_score": self.values[index * 3 + 2],
+                "template": self.templates[index],
             }
-            for component in self.components
-        }
+            if self.params[index] is not None:
+                details["params"] = _unpack(self.params[index])
+            if self.subscores[index] is not None:
+                details["subscores"] = _unpack(self.subscores[index])
+            breakdown[category] = details
+        return breakdown
 
+    def _score(self, index: int) -> Optional[float]:
+        score = self.values[index * 3]
+        return None if math.isnan(score) else score
 
-@dataclass
+
+@dataclass(slots=True)
 class ScoreResult:
     candidate_id: str
     job_id: str
     total_score: float
     breakdown: ScoreBreakdown
-    explanation: str
     created_at: datetime = field(default_factory=datetime.utcnow)
+    config_version: Optional[int] = None
+    fingerprint: Optional[str] = None
 
     def as_dict(self) -> Dict[str, object]:
         return {
@@ -45,6 +153,102 @@ class ScoreResult:
             "job_id": self.job_id,
             "total_score": self.total_score,
             "breakdown": self.breakdown.as_dict(),
-            "explanation": self.explanation,
             "created_at": self.created_at.isoformat(),
+            "config_version": self.config_version,
+            "fingerprint": self.fingerprint,
         }
+
+
+@dataclass(slots=True)
+class ScoreBatch(SequenceABC):
+    # Many results held column-wise, one sequence per ScoreResult field.
+    # Indexing or iterating builds ScoreResults on demand, and stores persist a
+    # batch straight from its columns through payloads(). compute_scores_batch
+    # fills breakdowns with a lazy sequence that packs each one when read.
+    candidate_ids: List[str] = field(default_factory=list)
+    job_ids: List[str] = field(default_factory=list)
+    total_scores: List[float] = field(default_factory=list)
+    breakdowns: Sequence[ScoreBreakdown] = field(default_factory=list)
+    created_at: List[datetime] = field(default_factory=list)
+    config_versions: List[Optional[int]] = field(default_factory=list)
+    fingerprints: List[Optional[str]] = field(default_factory=list)
+
+    @classmethod
+    def of(cls, results: Iterable[ScoreResult]) -> ScoreBatch:
+        if isinstance(results, ScoreBatch):
+            return results
+        batch = cls()
+        batch.extend(results)
+        return batch
+
+    @classmethod
+    def concat(cls, groups: Iterable[Iterable[ScoreResult]]) -> ScoreBatch:
+        batches = [cls.of(group) for group in groups]
+        if len(batches) == 1:
+            return batches[0]
+        batch = cls()
+        for other in batches:
+            batch.extend(other)
+        return batch
+
+    def extend(self, results: Iterable[ScoreResult]) -> None:
+        if not isinstance(self.breakdowns, list):
+            self.breakdowns = list(self.breakdowns)
+        if isinstance(results, ScoreBatch):
+            for name in _BATCH_COLUMNS:
+                getattr(self, name).extend(getattr(results, name))
+            return
+        for result in results:
+            self.candidate_ids.append(result.candidate_id)
+            self.job_ids.append(result.job_id)
+            self.total_scores.append(result.total_score)
+            self.breakdowns.append(result.breakdown)
+            self.created_at.append(result.created_at)
+            self.config_versions.append(result.config_version)
+            self.fingerprints.append(result.fingerprint)
+
+    def __len__(self) -> int:
+        return len(self.candidate_ids)
+
+    def __getitem__(self, index: int) -> ScoreResult:
+        if isinstance(index, slice):
+            return ScoreBatch(*(list(getattr(self, name)[index]) for name in _BATCH_COLUMNS))
+        return ScoreResult(
+            candidate_id=self.candidate_ids[index],
+            job_id=self.job_ids[index],
+            total_score=self.total_scores[index],
+            breakdown=self.breakdowns[index],
+            created_at=self.created_at[index],
+            config_version=self.config_versions[index],
+            fingerprint=self.fingerprints[index],
+        )
+
+    def __iter__(self) -> Iterator[ScoreResult]:
+        return (self[index] for index in range(len(self)))
+
+    def payloads(self) -> Iterator[Dict[str, object]]:
+        # ScoreResult.as_dict for every row, without building the results.
+        created_at: Optional[datetime] = None
+        created_at_text = ""
+        for index, candidate_id in enumerate(self.candidate_ids):
+            if self.created_at[index] is not created_at:
+                # Rows scored together share one timestamp; format it once.
+                created_at = self.created_at[index]
+                created_at_text = created_at.isoformat()
+            yield {
+                "candidate_id": candidate_id,
+                "job_id": self.job_ids[index],
+                "total_score": self.total_scores[index],
+                "breakdown": self.breakdowns[index].as_dict(),
+                "created_at": created_at_text,
+                "config_version": self.config_versions[index],
+                "fingerprint": self.fingerprints[index],
+            }
+
+
+_BATCH_COLUMNS = tuple(column.name for column in fields(ScoreBatch))
+
+# Field projections for score reads. candidate_id and job_id are always set;
+# fields left out keep cheap placeholders (empty breakdown, datetime.min).
+SCORE_TOTALS: FrozenSet[str] = frozenset({"total_score"})
+SCORE_BREAKDOWNS: FrozenSet[str] = frozenset({"total_score", "breakdown"})
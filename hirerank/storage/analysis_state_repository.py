@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from hirerank.background_jobs.models import CandidateAnalysisState
+from hirerank.storage.files import read_json, shard_filename, write_json_atomic
+from hirerank.storage.serialization import analysis_state_from_payload, analysis_state_to_payload
+
+
+class AnalysisStateRepository:
+    def __init__(self, storage_dir: Path) -> None:
+        self.storage_dir = storage_dir
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, job_id: str, candidate_id: str) -> Optional[CandidateAnalysisState]:
+        payload = read_json(self._state_path(job_id, candidate_id), None)
+        return analysis_state_from_payload(payload) if isinstance(payload, dict) else None
+
+    def save_many(self, states: Iterable[CandidateAnalysisState]) -> None:
+        for state in states:
+            write_json_atomic(self._state_path(state.job_id, state.candidate_id), analysis_state_to_payload(state))
+
+    def delete_many(self, keys: Iterable[Tuple[str, str]]) -> None:
+        for job_id, candidate_id in keys:
+            self._state_path(job_id, candidate_id).unlink(missing_ok=True)
+
+    def delete_expired(self, before: datetime) -> int:
+        deleted = 0
+        for path in self.storage_dir.glob("*.json"):
+            try:
+                payload = read_json(path, None)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(payload, dict):
+                continue
+            if analysis_state_from_payload(payload).updated_at < before:
+                path.unlink(missing_ok=True)
+                deleted += 1
+        return deleted
+
+    def _state_path(self, job_id: str, candidate_id: str) -> Path:
+        return self.storage_dir / shard_filename(f"{job_id}:{candidate_id}")
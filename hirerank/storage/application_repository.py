@@ -1,56 +1,315 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
-from datetime import datetime
+import os
+import threading
+from functools import reduce
+from itertools import islice
+from operator import or_
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
 
+from hirerank.dashboard.insights import normalize_email, normalize_skill
 from hirerank.dashboard.models import CandidateApplication
+from hirerank.storage.files import file_lock
+from hirerank.storage.serialization import application_from_payload, application_to_payload
+
+_JobKey = Tuple[str, str]
+
+
+def _clear_bit(postings: Dict[str, int], term: str, position: int) -> None:
+    bits = postings.get(term, 0) & ~(1 << position)
+    if bits:
+        postings[term] = bits
+    else:
+        postings.pop(term, None)
 
 
 class ApplicationRepository:
-    def __init__(self, storage_path: Path) -> None:
+    def __init__(
+        self,
+        storage_path: Path,
+        compaction_min_records: int = 1000,
+        compaction_stale_ratio: float = 0.5,
+    ) -> None:
         self.storage_path = storage_path
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self.compaction_min_records = compaction_min_records
+        self.compaction_stale_ratio = compaction_stale_ratio
+        self._lock = threading.RLock()
+        self._offsets: Dict[_JobKey, Dict[str, int]] = {}
+        self._candidates: Dict[_JobKey, Dict[str, str]] = {}
+        # Per job id: the owners with applications for it.
+        self._owners: Dict[str, Set[str]] = {}
+        # Inverted index: per job, bitmaps over application positions (first-save order).
+        self._positions: Dict[_JobKey, List[Tuple[str, str]]] = {}
+        self._terms: Dict[_JobKey, Dict[str, Tuple[int, str, FrozenSet[str], str]]] = {}
+        self._skill_bits: Dict[_JobKey, Dict[str, int]] = {}
+        self._status_bits: Dict[_JobKey, Dict[str, int]] = {}
+        # Per job: normalized email -> (application_id, candidate_id).
+        self._emails: Dict[_JobKey, Dict[str, Tuple[str, str]]] = {}
+        self._record_count = 0
+        self._live_count = 0
+        self._indexed_size = 0
+        self._indexed_inode: Optional[int] = None
+        self._reader: Optional[BinaryIO] = None
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._migrate_legacy()
 
     def save(self, application: CandidateApplication) -> None:
-        data = self._load()
-        payload = asdict(application)
-        payload["created_at"] = application.created_at.isoformat()
-        data.append(payload)
-        self._write(data)
+        self.save_many([application])
+
+    def save_many(self, applications: Iterable[CandidateApplication]) -> None:
+        data = "".join(
+            json.dumps(application_to_payload(application), sort_keys=True) + "\n" for application in applications
+        )
+        if not data:
+            return
+        # Compaction in another process must not replace the log between our append and its copy.
+        with self._lock, file_lock(self.storage_path):
+            with self.storage_path.open("ab") as handle:
+                handle.write(data.encode("utf-8"))
+            self._sync_index()
+        self._maybe_compact()
 
     def list_by_job(self, owner_id: str, job_id: str) -> List[CandidateApplication]:
-        data = self._load()
-        applications: List[CandidateApplication] = []
-        for payload in data:
-            if not isinstance(payload, dict):
-                continue
-            if str(payload.get("owner_id")) != owner_id:
-                continue
-            if str(payload.get("job_id")) != job_id:
-                continue
-            created_at = payload.get("created_at")
-            applications.append(
-                CandidateApplication(
-                    application_id=str(payload.get("application_id", "")),
-                    candidate_id=str(payload.get("candidate_id", "")),
-                    job_id=str(payload.get("job_id", "")),
-                    owner_id=str(payload.get("owner_id", "")),
-                    status=str(payload.get("status", "")),
-                    skills=list(payload.get("skills") or []),
-                    created_at=datetime.fromisoformat(created_at) if created_at else datetime.utcnow(),
-                )
-            )
+        with self._lock:
+            self._sync_index()
+            offsets = list(self._offsets.get((owner_id, job_id), {}).values())
+            if not offsets:
+                return []
+            applications = [self._read_at(offset) for offset in offsets]
         return applications
 
-    def _load(self) -> List[object]:
-        if not self.storage_path.exists():
-            return []
-        with self.storage_path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+    def get(self, owner_id: str, job_id: str, application_id: str) -> Optional[CandidateApplication]:
+        with self._lock:
+            self._sync_index()
+            offset = self._offsets.get((owner_id, job_id), {}).get(application_id)
+            return self._read_at(offset) if offset is not None else None
+
+    def list_jobs(self) -> List[_JobKey]:
+        with self._lock:
+            self._sync_index()
+            return [key for key, offsets in self._offsets.items() if offsets]
+
+    def job_owners(self, job_id: str) -> Set[str]:
+        with self._lock:
+            self._sync_index()
+            return set(self._owners.get(job_id, ()))
+
+    def get_by_candidates(
+        self,
+        owner_id: str,
+        job_id: str,
+        candidate_ids: Iterable[str],
+    ) -> Dict[str, CandidateApplication]:
+        key = (owner_id, job_id)
+        with self._lock:
+            self._sync_index()
+            candidates = self._candidates.get(key, {})
+            offsets = self._offsets.get(key, {})
+            wanted = {
+                candidate_id: offsets[candidates[candidate_id]]
+                for candidate_id in candidate_ids
+                if candidate_id in candidates
+            }
+            return {candidate_id: self._read_at(offset) for candidate_id, offset in wanted.items()}
+
+    def match_candidates(
+        self,
+        owner_id: str,
+        job_id: str,
+        skills: Iterable[str] = (),
+        status: Optional[str] = None,
+        match_all: bool = False,
+    ) -> Dict[str, int]:
+        key = (owner_id, job_id)
+        wanted = {normalize_skill(skill) for skill in skills if skill.strip()}
+        with self._lock:
+            self._sync_index()
+            positions = self._positions.get(key, [])
+            bits = (1 << len(positions)) - 1
+            if wanted:
+                skill_bits = self._skill_bits.get(key, {})
+                postings = [skill_bits.get(skill, 0) for skill in wanted]
+                if match_all:
+                    for posting in postings:
+                        bits &= posting
+                else:
+                    bits &= reduce(or_, postings, 0)
+            if status:
+                bits &= self._status_bits.get(key, {}).get(status.strip().lower(), 0)
+            # Walk the set bits via the binary string, lowest position first.
+            return {
+                positions[position][1]: position
+                for position, bit in enumerate(reversed(bin(bits)[2:]))
+                if bit == "1"
+            }
+
+    def match_emails(self, owner_id: str, job_id: str, emails: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+        with self._lock:
+            self._sync_index()
+            index = self._emails.get((owner_id, job_id), {})
+            wanted = {normalize_email(email) for email in emails}
+            return {email: index[email] for email in wanted if email in index}
+
+    def iter_by_job(
+        self,
+        owner_id: str,
+        job_id: str,
+        after: Optional[int] = None,
+        batch_size: int = 256,
+    ) -> Iterator[Tuple[int, CandidateApplication]]:
+        # Positions follow first-save order, which updates and compaction preserve.
+        position = 0 if after is None else after + 1
+        while True:
+            with self._lock:
+                self._sync_index()
+                offsets = islice(self._offsets.get((owner_id, job_id), {}).values(), position, position + batch_size)
+                batch = [self._read_at(offset) for offset in offsets]
+            for application in batch:
+                yield position, application
+                position += 1
+            if len(batch) < batch_size:
+                return
+
+    def compact(self) -> None:
+        # Appends from other processes wait on the file lock instead of landing in the replaced file.
+        with self._lock, file_lock(self.storage_path):
+            self._sync_index()
+            if self._record_count == self._live_count:
+                return
+            # Write each job's records together, in first-save order.
+            offsets = [offset for job in self._offsets.values() for offset in job.values()]
+            temp_path = self.storage_path.with_name(self.storage_path.name + ".compact")
+            with self.storage_path.open("rb") as source, temp_path.open("wb") as target:
+                for offset in offsets:
+                    source.seek(offset)
+                    target.write(source.readline())
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_path, self.storage_path)
+            self._reset_index()
+            self._sync_index()
+
+    def _read_at(self, offset: int) -> CandidateApplication:
+        self._reader.seek(offset)
+        return application_from_payload(json.loads(self._reader.readline()))
+
+    def _maybe_compact(self) -> None:
+        stale = self._record_count - self._live_count
+        if stale < self.compaction_min_records:
+            return
+        if stale < self._record_count * self.compaction_stale_ratio:
+            return
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compaction_thread.start()
+
+    def _sync_index(self) -> None:
+        try:
+            stat = self.storage_path.stat()
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if self._reader is None or stat.st_ino != self._indexed_inode or stat.st_size < self._indexed_size:
+            # New or compacted log. Index and read it through one open handle: if another
+            # process compacts again, the handle keeps the inode these offsets point into.
+            self._reset_index()
+            self._reader = self.storage_path.open("rb")
+            self._indexed_inode = os.fstat(self._reader.fileno()).st_ino
+        if os.fstat(self._reader.fileno()).st_size == self._indexed_size:
+            return
+
+        self._reader.seek(self._indexed_size)
+        offset = self._indexed_size
+        for line in self._reader:
+            if not line.endswith(b"\n"):
+                # A writer is mid-append; pick the record up on the next sync.
+                break
+            self._index_record(line, offset)
+            offset += len(line)
+        self._indexed_size = offset
+
+    def _index_record(self, line: bytes, offset: int) -> None:
+        if not line.strip():
+            return
+        payload = json.loads(line)
+        if not isinstance(payload, dict):
+            return
+        key = (str(payload.get("owner_id")), str(payload.get("job_id")))
+        job_offsets = self._offsets.setdefault(key, {})
+        self._owners.setdefault(key[1], set()).add(key[0])
+        application_id = str(payload.get("application_id", ""))
+        if application_id not in job_offsets:
+            self._live_count += 1
+        job_offsets[application_id] = offset
+        candidate_id = str(payload.get("candidate_id", ""))
+        self._candidates.setdefault(key, {})[candidate_id] = application_id
+        self._record_count += 1
+        self._index_terms(key, application_id, candidate_id, payload)
+
+    def _index_terms(self, key: _JobKey, application_id: str, candidate_id: str, payload: dict) -> None:
+        positions = self._positions.setdefault(key, [])
+        terms = self._terms.setdefault(key, {})
+        skill_bits = self._skill_bits.setdefault(key, {})
+        status_bits = self._status_bits.setdefault(key, {})
+        emails = self._emails.setdefault(key, {})
+
+        previous = terms.get(application_id)
+        if previous is None:
+            position = len(positions)
+            positions.append((application_id, candidate_id))
+        else:
+            position, previous_status, previous_skills, previous_email = previous
+            positions[position] = (application_id, candidate_id)
+            _clear_bit(status_bits, previous_status, position)
+            for skill in previous_skills:
+                _clear_bit(skill_bits, skill, position)
+            indexed = emails.get(previous_email)
+            if indexed is not None and indexed[0] == application_id:
+                del emails[previous_email]
+
+        status = str(payload.get("status", "")).strip().lower()
+        skills = frozenset(normalize_skill(str(skill)) for skill in payload.get("skills") or []) - {""}
+        email = normalize_email(str(payload.get("email") or ""))
+        bit = 1 << position
+        status_bits[status] = status_bits.get(status, 0) | bit
+        for skill in skills:
+            skill_bits[skill] = skill_bits.get(skill, 0) | bit
+        if email:
+            emails[email] = (application_id, candidate_id)
+        terms[application_id] = (position, status, skills, email)
+
+    def _reset_index(self) -> None:
+        self._offsets = {}
+        self._candidates = {}
+        self._owners = {}
+        self._positions = {}
+        self._terms = {}
+        self._skill_bits = {}
+        self._status_bits = {}
+        self._emails = {}
+        self._record_count = 0
+        self._live_count = 0
+        self._indexed_size = 0
+        self._indexed_inode = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
 
-    def _write(self, data: List[object]) -> None:
-        with self.storage_path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, sort_keys=True)
+    def _migrate_legacy(self) -> None:
+        legacy_path = self.storage_path.with_suffix(".json")
+        if legacy_path == self.storage_path or self.storage_path.exists() or not legacy_path.exists():
+            return
+        # Processes starting together may all get here; the first to take the lock migrates.
+        with file_lock(self.storage_path):
+            if self.storage_path.exists():
+                return
+            with legacy_path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+            with self.storage_path.open("w", encoding="utf-8") as handle:
+                for payload in data:
+                    if isinstance(payload, dict):
+                        handle.write(json.dumps(payload, sort_keys=True) + "\n")
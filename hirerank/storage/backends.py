@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from hirerank.dashboard.insights import InsightsTracker, InsightsTrackingApplicationStore, InsightsTrackingScoreStore
+from hirerank.storage.analysis_state_repository import AnalysisStateRepository
+from hirerank.storage.application_repository import ApplicationRepository
+from hirerank.storage.import_repository import CandidateImportRepository
+from hirerank.storage.insights_repository import JobInsightsRepository
+from hirerank.storage.protocols import (
+    AnalysisStatePersistence,
+    ApplicationStore,
+    CandidateImportStore,
+    ScoreStore,
+    ScoringConfigStore,
+    TaskQueue,
+)
+from hirerank.storage.scoring_config_repository import ScoringConfigRepository
+from hirerank.storage.scoring_repository import ScoringRepository
+from hirerank.storage.sqlite import (
+    SqliteAnalysisStateRepository,
+    SqliteApplicationRepository,
+    SqliteCandidateImportRepository,
+    SqliteDatabase,
+    SqliteJobInsightsRepository,
+    SqliteScoringConfigRepository,
+    SqliteScoringRepository,
+    SqliteTaskQueue,
+)
+
+STORAGE_BACKENDS = ("json", "sqlite")
+
+
+@dataclass
+class Repositories:
+    applications: ApplicationStore
+    scores: ScoreStore
+    scoring_configs: ScoringConfigStore
+    imports: CandidateImportStore
+    insights: InsightsTracker
+    analysis_states: AnalysisStatePersistence
+    tasks: TaskQueue
+
+
+def open_repositories(storage_dir: Path, backend: str = "json") -> Repositories:
+    if backend == "json":
+        applications = ApplicationRepository(storage_dir / "applications.jsonl")
+        scores = ScoringRepository(storage_dir / "scores")
+        insights = JobInsightsRepository(storage_dir / "insights")
+        scoring_configs = ScoringConfigRepository(storage_dir / "scoring_configs.json")
+        imports = CandidateImportRepository(storage_dir / "candidate_imports.json")
+        analysis_states = AnalysisStateRepository(storage_dir / "analysis_states")
+        # Leases need atomic claim-and-update, so the task queue is SQLite-backed on every backend.
+        tasks = SqliteTaskQueue(SqliteDatabase(storage_dir / "tasks.sqlite3"))
+    elif backend == "sqlite":
+        database = SqliteDatabase(storage_dir / "hirerank.sqlite3")
+        applications = SqliteApplicationRepository(database)
+        scores = SqliteScoringRepository(database)
+        insights = SqliteJobInsightsRepository(database)
+        scoring_configs = SqliteScoringConfigRepository(database)
+        imports = SqliteCandidateImportRepository(database)
+        analysis_states = SqliteAnalysisStateRepository(database)
+        tasks = SqliteTaskQueue(database)
+    else:
+        raise ValueError(
+            f"Unsupported storage backend '{backend}'. Expected one of: {', '.join(STORAGE_BACKENDS)}."
+        )
+
+    # Route application and score writes through the tracker so job insights stay current.
+    tracker = InsightsTracker(insights, applications, scores)
+    return Repositories(
+        applications=InsightsTrackingApplicationStore(applications, tracker),
+        scores=InsightsTrackingScoreStore(scores, tracker),
+        scoring_configs=scoring_configs,
+        imports=imports,
+        insights=tracker,
+        analysis_states=analysis_states,
+        tasks=tasks,
+    )
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def shard_filename(key: str, suffix: str = ".json") -> str:
+    # Keep shard names readable but collision-free for arbitrary job ids.
+    readable = _UNSAFE_CHARS.sub("_", key)[:48]
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return f"{readable}-{digest}{suffix}"
+
+
+def read_json(path: Path, default: object) -> object:
+    if not path.exists():
+        return default
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def write_json_atomic(path: Path, data: object) -> None:
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with temp_path.open("w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    # Serializes read-modify-write cycles on path across processes (and across
+    # threads, since each holder opens its own descriptor). The lock lives in a
+    # sidecar file because atomic writes replace path's inode.
+    with path.with_name(f"{path.name}.lock").open("a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
@@ -1,37 +1,58 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
-from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
 from hirerank.imports.models import CandidateImportJob, CandidateImportResult
+from hirerank.storage.files import file_lock, shard_filename, write_json_atomic
+from hirerank.storage.serialization import (
+    import_job_from_payload,
+    import_job_to_payload,
+    import_result_from_payload,
+    import_result_to_payload,
+)
 
 
 class CandidateImportRepository:
     def __init__(self, storage_path: Path) -> None:
         self.storage_path = storage_path
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self.results_dir = self.storage_path.parent / f"{self.storage_path.stem}_results"
+        self.results_dir.mkdir(parents=True, exist_ok=True)
 
     def create(self, job: CandidateImportJob) -> None:
-        data = self._load()
-        data.append(self._to_payload(job))
-        self._write(data)
+        with file_lock(self.storage_path):
+            data = self._load()
+            data.append(self._to_payload(job))
+            write_json_atomic(self.storage_path, data)
 
     def update(self, job: CandidateImportJob) -> None:
-        data = self._load()
-        updated = False
-        for idx, payload in enumerate(data):
-            if isinstance(payload, dict) and payload.get("import_id") == job.import_id:
-                data[idx] = self._to_payload(job)
-                updated = True
-                break
-        if not updated:
-            data.append(self._to_payload(job))
-        self._write(data)
+        self.save_many([job])
 
-    def get(self, owner_id: str, job_id: str, import_id: str) -> Optional[CandidateImportJob]:
+    def save_many(self, jobs: Iterable[CandidateImportJob]) -> None:
+        pending = {job.import_id: job for job in jobs}
+        if not pending:
+            return
+        # The API and worker processes both update this file, so hold the lock across the rewrite.
+        with file_lock(self.storage_path):
+            data = self._load()
+            for idx, payload in enumerate(data):
+                if isinstance(payload, dict) and payload.get("import_id") in pending:
+                    data[idx] = self._to_payload(pending.pop(payload["import_id"]))
+            data.extend(self._to_payload(job) for job in pending.values())
+            write_json_atomic(self.storage_path, data)
+
+    def append_results(self, import_id: str, results: Iterable[CandidateImportResult]) -> None:
+        lines = [json.dumps(import_result_to_payload(result), sort_keys=True) + "\n" for result in results]
+        if not lines:
+            return
+        with self._results_path(import_id).open("a", encoding="utf-8") as handle:
+            handle.writelines(lines)
+
+    def get(
+        self, owner_id: str, job_id: str, import_id: str, include_results: bool = True
+    ) -> Optional[CandidateImportJob]:
         data = self._load()
         for payload in data:
             if not isinstance(payload, dict):
@@ -42,6 +63,8 @@ class CandidateImportRepository:
                 continue
             if str(payload.get("job_id")) != job_id:
                 continue
+            if not include_results:
+                return import_job_from_payload(payload)
             return self._from_payload(payload)
         return None
 
@@ -58,51 +81,37 @@ class CandidateImportRepository:
             jobs.append(self._from_payload(payload))
         return jobs
 
-    def _from_payload(self, payload: dict) -> CandidateImportJob:
-        results_data = payload.get("results") or []
-        results: List[CandidateImportResult] = []
-        for result in results_data:
-            if not isinstance(result, dict):
-                continue
-            results.append(
-                CandidateImportResult(
-                    row_number=int(result.get("row_number", 0)),
-                    status=str(result.get("status", "")),
-                    candidate_id=result.get("candidate_id"),
-                    errors=list(result.get("errors") or []),
-                )
-            )
-        created_at = payload.get("created_at")
-        updated_at = payload.get("updated_at")
-        return CandidateImportJob(
-            import_id=str(payload.get("import_id", "")),
-            owner_id=str(payload.get("owner_id", "")),
-            job_id=str(payload.get("job_id", "")),
-            status=str(payload.get("status", "")),
-            headers=list(payload.get("headers") or []),
-            mapping=dict(payload.get("mapping") or {}),
-            total_rows=int(payload.get("total_rows", 0)),
-            processed_rows=int(payload.get("processed_rows", 0)),
-            success_count=int(payload.get("success_count", 0)),
-            failure_count=int(payload.get("failure_count", 0)),
-            results=results,
-            error_message=payload.get("error_message"),
-            created_at=datetime.fromisoformat(created_at) if created_at else datetime.utcnow(),
-            updated_at=datetime.fromisoformat(updated_at) if updated_at else datetime.utcnow(),
-        )
-
     def _to_payload(self, job: CandidateImportJob) -> dict:
-        payload = asdict(job)
-        payload["created_at"] = job.created_at.isoformat()
-        payload["updated_at"] = job.updated_at.isoformat()
+        # Per-row results live in the side log; the job record only carries counters.
+        payload = import_job_to_payload(job)
+        payload.pop("results", None)
         return payload
 
+    def _from_payload(self, payload: dict) -> CandidateImportJob:
+        job = import_job_from_payload(payload)
+        results = self._load_results(job.import_id)
+        if results:
+            job.results = results
+        return job
+
+    def _load_results(self, import_id: str) -> List[CandidateImportResult]:
+        results_path = self._results_path(import_id)
+        if not results_path.exists():
+            return []
+        by_row: Dict[int, CandidateImportResult] = {}
+        with results_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                result = import_result_from_payload(json.loads(line))
+                by_row[result.row_number] = result
+        return [by_row[row_number] for row_number in sorted(by_row)]
+
+    def _results_path(self, import_id: str) -> Path:
+        return self.results_dir / shard_filename(import_id, suffix=".jsonl")
+
     def _load(self) -> List[object]:
         if not self.storage_path.exists():
             return []
         with self.storage_path.open("r", encoding="utf-8") as handle:
             return json.load(handle)
-
-    def _write(self, data: List[object]) -> None:
-        with self.storage_path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, sort_keys=True)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional
+
+from hirerank.dashboard.models import JobInsightsAggregate
+from hirerank.storage.files import file_lock, read_json, shard_filename, write_json_atomic
+from hirerank.storage.serialization import job_insights_aggregate_from_payload, job_insights_aggregate_to_payload
+
+
+class JobInsightsRepository:
+    def __init__(self, storage_dir: Path) -> None:
+        self.storage_dir = storage_dir
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def get(self, owner_id: str, job_id: str) -> Optional[JobInsightsAggregate]:
+        payload = self._load(job_id).get(owner_id)
+        return job_insights_aggregate_from_payload(payload) if isinstance(payload, dict) else None
+
+    def save(self, aggregate: JobInsightsAggregate) -> None:
+        with self._lock:
+            data = self._load(aggregate.job_id)
+            data[aggregate.owner_id] = job_insights_aggregate_to_payload(aggregate)
+            write_json_atomic(self._shard_path(aggregate.job_id), data)
+
+    def owners_for_job(self, job_id: str) -> List[str]:
+        return list(self._load(job_id))
+
+    @contextmanager
+    def locked(self, job_ids: Collection[str]) -> Iterator[None]:
+        # One lock per job shard, taken in sorted order so concurrent batches cannot deadlock.
+        with ExitStack() as stack:
+            for job_id in sorted(set(job_ids)):
+                stack.enter_context(file_lock(self._shard_path(job_id)))
+            yield
+
+    def _load(self, job_id: str) -> Dict[str, object]:
+        data = read_json(self._shard_path(job_id), {})
+        return data if isinstance(data, dict) else {}
+
+    def _shard_path(self, job_id: str) -> Path:
+        return self.storage_dir / shard_filename(job_id)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Collection, ContextManager, Dict, Iterable, Iterator, List, Optional, Protocol, Set, Tuple
+
+from hirerank.background_jobs.models import CandidateAnalysisState, QueuedTask
+from hirerank.dashboard.models import CandidateApplication, JobInsightsAggregate
+from hirerank.imports.models import CandidateImportJob, CandidateImportResult
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.models import ScoreResult
+
+
+class ApplicationStore(Protocol):
+    def save(self, application: CandidateApplication) -> None: ...
+
+    def save_many(self, applications: Iterable[CandidateApplication]) -> None: ...
+
+    def list_by_job(self, owner_id: str, job_id: str) -> List[CandidateApplication]: ...
+
+    def get(self, owner_id: str, job_id: str, application_id: str) -> Optional[CandidateApplication]: ...
+
+    def list_jobs(self) -> List[Tuple[str, str]]: ...
+
+    def job_owners(self, job_id: str) -> Set[str]: ...
+
+    def get_by_candidates(
+        self, owner_id: str, job_id: str, candidate_ids: Iterable[str]
+    ) -> Dict[str, CandidateApplication]: ...
+
+    def iter_by_job(
+        self, owner_id: str, job_id: str, after: Optional[int] = None
+    ) -> Iterator[Tuple[int, CandidateApplication]]: ...
+
+    def match_emails(self, owner_id: str, job_id: str, emails: Iterable[str]) -> Dict[str, Tuple[str, str]]: ...
+
+    def match_candidates(
+        self,
+        owner_id: str,
+        job_id: str,
+        skills: Iterable[str] = (),
+        status: Optional[str] = None,
+        match_all: bool = False,
+    ) -> Dict[str, int]: ...
+
+
+class ScoreStore(Protocol):
+    def save(self, result: ScoreResult) -> None: ...
+
+    def save_many(self, results: Iterable[ScoreResult]) -> None: ...
+
+    def list_by_job(self, job_id: str, fields: Optional[Collection[str]] = None) -> Dict[str, ScoreResult]: ...
+
+    def get_many(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, ScoreResult]: ...
+
+    def get_totals(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, float]: ...
+
+    def get_fingerprints(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, str]: ...
+
+    def scored_candidate_ids(self, job_id: str, candidate_ids: Iterable[str]) -> Set[str]: ...
+
+    def iter_ranked(self, job_id: str, after: Optional[Tuple[float, str]] = None) -> Iterator[Tuple[str, float]]: ...
+
+    def job_revision(self, job_id: str) -> Optional[str]: ...
+
+
+class ScoringConfigStore(Protocol):
+    def save(self, config: ScoringConfig) -> ScoringConfig: ...
+
+    def save_many(self, configs: Iterable[ScoringConfig]) -> List[ScoringConfig]: ...
+
+    def get(self, job_id: str) -> ScoringConfig: ...
+
+
+class JobInsightsStore(Protocol):
+    def get(self, owner_id: str, job_id: str) -> Optional[JobInsightsAggregate]: ...
+
+    def save(self, aggregate: JobInsightsAggregate) -> None: ...
+
+    def owners_for_job(self, job_id: str) -> List[str]: ...
+
+    def locked(self, job_ids: Collection[str]) -> ContextManager[None]: ...
+
+
+class AnalysisStatePersistence(Protocol):
+    def get(self, job_id: str, candidate_id: str) -> Optional[CandidateAnalysisState]: ...
+
+    def save_many(self, states: Iterable[CandidateAnalysisState]) -> None: ...
+
+    def delete_many(self, keys: Iterable[Tuple[str, str]]) -> None: ...
+
+    def delete_expired(self, before: datetime) -> int: ...
+
+
+class CandidateImportStore(Protocol):
+    def create(self, job: CandidateImportJob) -> None: ...
+
+    def update(self, job: CandidateImportJob) -> None: ...
+
+    def save_many(self, jobs: Iterable[CandidateImportJob]) -> None: ...
+
+    def append_results(self, import_id: str, results: Iterable[CandidateImportResult]) -> None: ...
+
+    def get(
+        self, owner_id: str, job_id: str, import_id: str, include_results: bool = True
+    ) -> Optional[CandidateImportJob]: ...
+
+    def list_by_job(self, owner_id: str, job_id: str) -> List[CandidateImportJob]: ...
+
+
+class TaskQueue(Protocol):
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, object],
+        max_attempts: int = 5,
+        fair_key: Optional[str] = None,
+        cost: float = 1.0,
+        weight: float = 1.0,
+        ref: Optional[str] = None,
+    ) -> QueuedTask: ...
+
+    def claim(
+        self, worker_id: str, visibility_timeout: timedelta, max_leases_per_key: Optional[int] = None
+    ) -> Optional[QueuedTask]: ...
+
+    def extend(self, task_id: str, worker_id: str, visibility_timeout: timedelta) -> bool: ...
+
+    def complete(self, task_id: str, worker_id: str) -> None: ...
+
+    def requeue(self, task_id: str, worker_id: str, cost: float) -> bool: ...
+
+    def fail(self, task_id: str, worker_id: str, error: str, retry_delay: timedelta) -> None: ...
+
+    def queue_position(self, ref: str) -> Optional[int]: ...
@@ -1,60 +1,65 @@
 from __future__ import annotations
 
-import json
+import threading
+from dataclasses import replace
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
 
-from hirerank.scoring.config import CategoryWeights, ResumeSubWeights, ScoringConfig
+from hirerank.scoring.config import ScoringConfig
+from hirerank.storage.files import file_lock, read_json, write_json_atomic
+from hirerank.storage.serialization import scoring_config_from_payload, scoring_config_to_payload
 
 
 class ScoringConfigRepository:
     def __init__(self, storage_path: Path) -> None:
         self.storage_path = storage_path
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        # Parsed configs for the file revision they were read from; a save here or
+        # in another process changes the revision and forces a reload.
+        self._revision: Optional[str] = None
+        self._configs: Dict[str, ScoringConfig] = {}
 
-    def save(self, config: ScoringConfig) -> None:
-        data = self._load()
-        data[config.job_id] = {
-            "job_id": config.job_id,
-            "github_required": config.github_required,
-            "category_weights": config.category_weights.as_percentages(),
-            "resume_subweights": {
-                "required_skills": config.resume_subweights.required_skills,
-                "experience_fit": config.resume_subweights.experience_fit,
-                "nice_to_have": config.resume_subweights.nice_to_have,
-            },
-        }
-        self._write(data)
+    def save(self, config: ScoringConfig) -> ScoringConfig:
+        return self.save_many([config])[0]
+
+    def save_many(self, configs: Iterable[ScoringConfig]) -> List[ScoringConfig]:
+        # Versions are read-modify-write, so API processes saving at once take the file lock.
+        with self._lock, file_lock(self.storage_path):
+            data = self._load()
+            saved: List[ScoringConfig] = []
+            for config in configs:
+                previous = data.get(config.job_id) or {}
+                saved.append(replace(config, version=int(previous.get("version", 0)) + 1))
+                data[config.job_id] = scoring_config_to_payload(saved[-1])
+            if saved:
+                write_json_atomic(self.storage_path, data)
+                self._revision = None
+            return saved
 
     def get(self, job_id: str) -> ScoringConfig:
-        data = self._load()
-        config_data = data.get(job_id)
-        if not config_data:
-            return ScoringConfig(job_id=job_id)
-        weights = config_data.get("category_weights", {})
-        return ScoringConfig(
-            job_id=job_id,
-            github_required=config_data.get("github_required", False),
-            category_weights=CategoryWeights(
-                resume_skills=weights.get("resume_skills", 25) / 100,
-                github_code_quality=weights.get("github_code_quality", 30) / 100,
-                project_originality=weights.get("project_originality", 20) / 100,
-                documentation_quality=weights.get("documentation_quality", 10) / 100,
-                engineering_practices=weights.get("engineering_practices", 15) / 100,
-            ),
-            resume_subweights=ResumeSubWeights(
-                required_skills=config_data.get("resume_subweights", {}).get("required_skills", 0.6),
-                experience_fit=config_data.get("resume_subweights", {}).get("experience_fit", 0.2),
-                nice_to_have=config_data.get("resume_subweights", {}).get("nice_to_have", 0.2),
-            ),
-        )
+        config = self._cached_configs().get(job_id)
+        return config if config is not None else ScoringConfig(job_id=job_id)
+
+    def _cached_configs(self) -> Dict[str, ScoringConfig]:
+        revision = self._file_revision()
+        with self._lock:
+            if revision is not None and revision == self._revision:
+                return self._configs
+            self._configs = {
+                job_id: scoring_config_from_payload(job_id, config_data)
+                for job_id, config_data in self._load().items()
+                if config_data
+            }
+            self._revision = revision
+            return self._configs
+
+    def _file_revision(self) -> Optional[str]:
+        try:
+            stat = self.storage_path.stat()
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}:{stat.st_ino}"
 
     def _load(self) -> Dict[str, object]:
-        if not self.storage_path.exists():
-            return {}
-        with self.storage_path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
-
-    def _write(self, data: Dict[str, object]) -> None:
-        with self.storage_path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, sort_keys=True)
+        return read_json(self.storage_path, {})
@@ -1,71 +1,313 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict
+from typing import BinaryIO, Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from hirerank.scoring.models import ScoreBreakdown, ScoreComponent, ScoreResult
+from hirerank.scoring.models import ScoreResult
+from hirerank.storage.files import file_lock, read_json, shard_filename, write_json_atomic
+from hirerank.storage.serialization import score_fields, score_result_from_payload, score_results_to_payloads
+
+_RankKey = Tuple[float, str]
+# iter_ranked copies this many ranking entries per lock hold.
+_RANK_CHUNK = 512
+
+
+class _JobShard:
+    # A job's scores, indexed from its append-only log: each line is a
+    # candidate's payload as of the write that appended it, so the last line
+    # per candidate wins. Updated in place under the repository lock.
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.data: Dict[str, dict] = {}
+        # Where each candidate's latest line starts, so compaction copies bytes.
+        self.offsets: Dict[str, int] = {}
+        self.ranking: List[_RankKey] = []
+        self.record_count = 0
+        self.size = 0
+        self.inode: Optional[int] = None
+        self.reader: Optional[BinaryIO] = None
+
+    def sync(self) -> None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self.reset()
+            return
+        if self.reader is None or stat.st_ino != self.inode or stat.st_size < self.size:
+            # New or compacted log. Read it through one open handle: if another
+            # process compacts again, the handle keeps the inode our offset points into.
+            self.reset()
+            self.reader = self.path.open("rb")
+            self.inode = os.fstat(self.reader.fileno()).st_ino
+        if os.fstat(self.reader.fileno()).st_size == self.size:
+            return
+
+        self.reader.seek(self.size)
+        offset = self.size
+        payloads: List[dict] = []
+        offsets: List[int] = []
+        for line in self.reader:
+            if not line.endswith(b"\n"):
+                # A writer is mid-append; pick the record up on the next sync.
+                break
+            payload = json.loads(line) if line.strip() else None
+            if isinstance(payload, dict) and payload.get("candidate_id"):
+                payloads.append(payload)
+                offsets.append(offset)
+            offset += len(line)
+        self.size = offset
+        self.apply(payloads, offsets)
+
+    def append(self, payloads: List[dict]) -> None:
+        # Callers hold the shard's file lock and have synced, so the log ends
+        # where our index does and the new lines need not be read back.
+        lines = [_encode(payload) for payload in payloads]
+        with self.path.open("ab") as handle:
+            handle.write(b"".join(lines))
+        if self.reader is None:
+            self.reader = self.path.open("rb")
+            self.inode = os.fstat(self.reader.fileno()).st_ino
+        offsets: List[int] = []
+        for line in lines:
+            offsets.append(self.size)
+            self.size += len(line)
+        self.apply(payloads, offsets)
+
+    def apply(self, payloads: List[dict], offsets: List[int]) -> None:
+        self.record_count += len(payloads)
+        # Re-sorting beats shifting the ranking once per result when many change.
+        rebuild = len(payloads) > len(self.ranking) // 16
+        for payload, offset in zip(payloads, offsets):
+            candidate_id = str(payload["candidate_id"])
+            previous = self.data.get(candidate_id)
+            self.data[candidate_id] = payload
+            self.offsets[candidate_id] = offset
+            if rebuild:
+                continue
+            if previous is not None:
+                previous_key = _rank_key(candidate_id, previous)
+                index = bisect_left(self.ranking, previous_key)
+                if index < len(self.ranking) and self.ranking[index] == previous_key:
+                    del self.ranking[index]
+            insort(self.ranking, _rank_key(candidate_id, payload))
+        if rebuild:
+            self.ranking = sorted(_rank_key(candidate_id, payload) for candidate_id, payload in self.data.items())
+
+    def compact(self) -> None:
+        # Rewrites the log with each candidate's latest line, in first-save
+        # order. Callers hold the file lock and have synced.
+        temp_path = self.path.with_name(self.path.name + ".compact")
+        offsets: Dict[str, int] = {}
+        with temp_path.open("wb") as target:
+            for candidate_id, offset in self.offsets.items():
+                self.reader.seek(offset)
+                offsets[candidate_id] = target.tell()
+                target.write(self.reader.readline())
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(temp_path, self.path)
+        self.close()
+        self.reader = self.path.open("rb")
+        stat = os.fstat(self.reader.fileno())
+        self.inode = stat.st_ino
+        self.size = stat.st_size
+        self.offsets = offsets
+        self.record_count = len(offsets)
+
+    def reset(self) -> None:
+        self.close()
+        self.data = {}
+        self.offsets = {}
+        self.ranking = []
+        self.record_count = 0
+        self.size = 0
+        self.inode = None
+
+    def close(self) -> None:
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+
+def _encode(payload: dict) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _write_log(path: Path, payloads: Iterable[dict]) -> None:
+    temp_path = path.with_name(path.name + ".compact")
+    with temp_path.open("wb") as handle:
+        handle.write(b"".join(_encode(payload) for payload in payloads))
+    os.replace(temp_path, path)
+
+
+def _rank_key(candidate_id: str, payload: object) -> _RankKey:
+    total = payload.get("total_score", 0.0) if isinstance(payload, dict) else 0.0
+    return (-float(total), candidate_id)
 
 
 class ScoringRepository:
-    def __init__(self, storage_path: Path) -> None:
-        self.storage_path = storage_path
-        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+    def __init__(
+        self,
+        storage_dir: Path,
+        max_cached_jobs: int = 64,
+        compaction_min_records: int = 1000,
+        compaction_stale_ratio: float = 0.5,
+    ) -> None:
+        self.storage_dir = storage_dir
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.storage_dir / "manifest.json"
+        self.max_cached_jobs = max_cached_jobs
+        self.compaction_min_records = compaction_min_records
+        self.compaction_stale_ratio = compaction_stale_ratio
+        self._lock = threading.RLock()
+        self._shards: "OrderedDict[str, _JobShard]" = OrderedDict()
+        self._migrate_legacy()
 
     def save(self, result: ScoreResult) -> None:
-        data = self._load()
-        job_key = f"{result.job_id}:{result.candidate_id}"
-        data[job_key] = result.as_dict()
-        self._write(data)
+        self.save_many([result])
+
+    def save_many(self, results: Iterable[ScoreResult]) -> None:
+        by_job: Dict[str, List[dict]] = {}
+        for payload in score_results_to_payloads(results):
+            by_job.setdefault(payload["job_id"], []).append(payload)
+        with self._lock:
+            for job_id, payloads in by_job.items():
+                shard_path = self._shard_path(job_id)
+                if not shard_path.exists():
+                    self._register_shard(job_id)
+                # Other worker processes append to the same log; holding its lock
+                # keeps their lines and a compaction from interleaving with ours.
+                with file_lock(shard_path):
+                    shard = self._load_shard(job_id)
+                    shard.append(payloads)
+                    if self._needs_compaction(shard):
+                        shard.compact()
 
-    def list_by_job(self, job_id: str) -> Dict[str, ScoreResult]:
-        data = self._load()
+    def compact(self, job_id: str) -> None:
+        with self._lock, file_lock(self._shard_path(job_id)):
+            shard = self._load_shard(job_id)
+            if shard.record_count != len(shard.data):
+                shard.compact()
+
+    def list_by_job(self, job_id: str, fields: Optional[Collection[str]] = None) -> Dict[str, ScoreResult]:
+        projection = score_fields(fields)
+        with self._lock:
+            payloads = list(self._load_shard(job_id).data.values())
         results: Dict[str, ScoreResult] = {}
-        prefix = f"{job_id}:"
-        for key, payload in data.items():
-            if not key.startswith(prefix):
-                continue
-            if not isinstance(payload, dict):
+        for payload in payloads:
+            result = score_result_from_payload(payload, job_id, projection)
+            if not result.candidate_id:
                 continue
-            candidate_id = str(payload.get("candidate_id", "")).strip()
-            if not candidate_id:
-                continue
-            breakdown_payload = payload.get("breakdown") or {}
-            components = []
-            if isinstance(breakdown_payload, dict):
-                for category, details in breakdown_payload.items():
-                    if not isinstance(details, dict):
-                        continue
-                    score_value = details.get("score")
-                    score = float(score_value) if isinstance(score_value, (int, float)) else None
-                    components.append(
-                        ScoreComponent(
-                            category=str(category),
-                            score=score,
-                            weight=float(details.get("weight", 0.0)),
-                            weighted_score=float(details.get("weighted_score", 0.0)),
-                            explanation=str(details.get("explanation", "")),
-                        )
-                    )
-            results[candidate_id] = ScoreResult(
-                candidate_id=candidate_id,
-                job_id=str(payload.get("job_id", job_id)),
-                total_score=float(payload.get("total_score", 0.0)),
-                breakdown=ScoreBreakdown(components=components),
-                explanation=str(payload.get("explanation", "")),
-                created_at=datetime.fromisoformat(payload.get("created_at"))
-                if payload.get("created_at")
-                else datetime.utcnow(),
-            )
+            results[result.candidate_id] = result
         return results
 
-    def _load(self) -> Dict[str, object]:
-        if not self.storage_path.exists():
-            return {}
-        with self.storage_path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+    def get_many(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, ScoreResult]:
+        payloads = self._payloads(job_id, candidate_ids)
+        return {candidate_id: score_result_from_payload(payload, job_id) for candidate_id, payload in payloads.items()}
+
+    def get_totals(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, float]:
+        payloads = self._payloads(job_id, candidate_ids)
+        return {candidate_id: float(payload.get("total_score", 0.0)) for candidate_id, payload in payloads.items()}
+
+    def get_fingerprints(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, str]:
+        payloads = self._payloads(job_id, candidate_ids)
+        return {
+            candidate_id: str(payload["fingerprint"])
+            for candidate_id, payload in payloads.items()
+            if payload.get("fingerprint")
+        }
+
+    def scored_candidate_ids(self, job_id: str, candidate_ids: Iterable[str]) -> Set[str]:
+        return set(self._payloads(job_id, candidate_ids))
+
+    def iter_ranked(self, job_id: str, after: Optional[Tuple[float, str]] = None) -> Iterator[Tuple[str, float]]:
+        # Each chunk resumes after the last key handed out, so writes between
+        # chunks neither repeat nor skip candidates whose score did not change.
+        key = (-after[0], after[1]) if after else None
+        while True:
+            with self._lock:
+                ranking = self._load_shard(job_id).ranking
+                start = bisect_right(ranking, key) if key else 0
+                chunk = ranking[start : start + _RANK_CHUNK]
+            for negative_total, candidate_id in chunk:
+                yield candidate_id, -negative_total
+            if len(chunk) < _RANK_CHUNK:
+                return
+            key = chunk[-1]
+
+    def job_revision(self, job_id: str) -> Optional[str]:
+        try:
+            stat = self._shard_path(job_id).stat()
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}:{stat.st_ino}"
+
+    def list_job_ids(self) -> List[str]:
+        return sorted(read_json(self.manifest_path, {}))
+
+    def _needs_compaction(self, shard: _JobShard) -> bool:
+        stale = shard.record_count - len(shard.data)
+        return stale >= self.compaction_min_records and stale >= shard.record_count * self.compaction_stale_ratio
+
+    def _payloads(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, dict]:
+        with self._lock:
+            data = self._load_shard(job_id).data
+            return {candidate_id: data[candidate_id] for candidate_id in candidate_ids if candidate_id in data}
+
+    def _load_shard(self, job_id: str) -> _JobShard:
+        # Reads only what other processes appended since the last load.
+        with self._lock:
+            shard = self._shards.get(job_id)
+            if shard is None:
+                shard = self._shards[job_id] = _JobShard(self._shard_path(job_id))
+                while len(self._shards) > self.max_cached_jobs:
+                    self._shards.popitem(last=False)[1].close()
+            self._shards.move_to_end(job_id)
+            shard.sync()
+            return shard
+
+    def _shard_path(self, job_id: str) -> Path:
+        return self.storage_dir / shard_filename(job_id, ".jsonl")
+
+    def _register_shard(self, job_id: str) -> None:
+        with file_lock(self.manifest_path):
+            manifest = read_json(self.manifest_path, {})
+            manifest[job_id] = shard_filename(job_id, ".jsonl")
+            write_json_atomic(self.manifest_path, manifest)
 
-    def _write(self, data: Dict[str, object]) -> None:
-        with self.storage_path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, sort_keys=True)
+    def _migrate_legacy(self) -> None:
+        # Earlier layouts kept one scores.json keyed by "job_id:candidate_id",
+        # then one JSON object per job. Both become per-job logs.
+        legacy_path = self.storage_dir.with_suffix(".json")
+        with file_lock(self.manifest_path):
+            manifest = read_json(self.manifest_path, None)
+            shards: Dict[str, Dict[str, dict]] = {}
+            if manifest is None:
+                if not legacy_path.is_file():
+                    return
+                for key, payload in read_json(legacy_path, {}).items():
+                    if isinstance(payload, dict):
+                        job_id = str(payload.get("job_id") or key.split(":", 1)[0])
+                        candidate_id = str(payload.get("candidate_id") or key.split(":", 1)[-1])
+                        shards.setdefault(job_id, {})[candidate_id] = payload
+            else:
+                for job_id, filename in manifest.items():
+                    if filename.endswith(".json"):
+                        data = read_json(self.storage_dir / filename, {})
+                        shards[job_id] = {key: payload for key, payload in data.items() if isinstance(payload, dict)}
+                if not shards:
+                    return
+            for job_id, data in shards.items():
+                payloads = (dict(payload, candidate_id=candidate_id) for candidate_id, payload in data.items())
+                _write_log(self._shard_path(job_id), payloads)
+            manifest = dict(manifest or {})
+            replaced = [filename for job_id, filename in manifest.items() if job_id in shards]
+            manifest.update({job_id: shard_filename(job_id, ".jsonl") for job_id in shards})
+            write_json_atomic(self.manifest_path, manifest)
+            for filename in replaced:
+                (self.storage_dir / filename).unlink(missing_ok=True)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, fields
+from datetime import datetime
+from sys import intern
+from typing import Collection, Dict, FrozenSet, Iterable, Iterator, List, Optional
+
+from hirerank.background_jobs.models import CandidateAnalysisState
+from hirerank.dashboard.models import CandidateApplication, JobInsightsAggregate
+from hirerank.imports.models import CandidateImportJob, CandidateImportResult
+from hirerank.scoring.config import CategoryWeights, ResumeSubWeights, ScoringConfig
+from hirerank.scoring.engine import GitHubAnalysis, ResumeAnalysis
+from hirerank.scoring.explanations import TEXT_TEMPLATE
+from hirerank.scoring.models import ScoreBatch, ScoreBreakdown, ScoreResult
+
+
+def _parse_datetime(value: object) -> datetime:
+    return datetime.fromisoformat(str(value)) if value else datetime.utcnow()
+
+
+def application_to_payload(application: CandidateApplication) -> dict:
+    payload = asdict(application)
+    payload["created_at"] = application.created_at.isoformat()
+    return payload
+
+
+def application_from_payload(payload: dict) -> CandidateApplication:
+    return CandidateApplication(
+        application_id=str(payload.get("application_id", "")),
+        candidate_id=str(payload.get("candidate_id", "")),
+        job_id=intern(str(payload.get("job_id", ""))),
+        owner_id=intern(str(payload.get("owner_id", ""))),
+        status=intern(str(payload.get("status", ""))),
+        skills=list(payload.get("skills") or []),
+        email=payload.get("email"),
+        created_at=_parse_datetime(payload.get("created_at")),
+    )
+
+
+def score_result_to_payload(result: ScoreResult) -> dict:
+    return result.as_dict()
+
+
+def score_results_to_payloads(results: Iterable[ScoreResult]) -> Iterator[dict]:
+    return ScoreBatch.of(results).payloads()
+
+
+_SCORE_RESULT_FIELDS = frozenset(field.name for field in fields(ScoreResult))
+
+
+def score_fields(projection: Optional[Collection[str]] = None) -> FrozenSet[str]:
+    if projection is None:
+        return _SCORE_RESULT_FIELDS
+    unknown = set(projection) - _SCORE_RESULT_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown score fields: {', '.join(sorted(unknown))}.")
+    return frozenset(projection)
+
+
+def score_result_from_payload(
+    payload: dict,
+    job_id: str,
+    projection: FrozenSet[str] = _SCORE_RESULT_FIELDS,
+) -> ScoreResult:
+    # Fields outside the projection are neither parsed nor built.
+    return ScoreResult(
+        candidate_id=str(payload.get("candidate_id", "")).strip(),
+        job_id=intern(str(payload.get("job_id", job_id))),
+        total_score=float(payload.get("total_score", 0.0)) if "total_score" in projection else 0.0,
+        breakdown=_breakdown_from_payload(payload.get("breakdown")) if "breakdown" in projection else ScoreBreakdown(),
+        created_at=_parse_datetime(payload.get("created_at")) if "created_at" in projection else datetime.min,
+        config_version=payload.get("config_version") if "config_version" in projection else None,
+        fingerprint=payload.get("fingerprint") if "fingerprint" in projection else None,
+    )
+
+
+def _breakdown_from_payload(breakdown_payload: object) -> ScoreBreakdown:
+    # Category, template and id strings repeat across every result of a job;
+    # interning them keeps large jobs from holding one copy per component.
+    categories: List[str] = []
+    values: List[float] = []
+    templates: List[str] = []
+    params_list: List[Optional[Dict[str, object]]] = []
+    subscores_list: List[Optional[Dict[str, float]]] = []
+    if isinstance(breakdown_payload, dict):
+        for category, details in breakdown_payload.items():
+            if not isinstance(details, dict):
+                continue
+            score_value = details.get("score")
+            subscores = details.get("subscores")
+            params = details.get("params")
+            template = details.get("template")
+            if template is None:
+                # Scores written before templated explanations carry the rendered text.
+                template = TEXT_TEMPLATE
+                params = {"text": str(details.get("explanation", ""))}
+            categories.append(intern(str(category)))
+            values.append(float(score_value) if isinstance(score_value, (int, float)) else math.nan)
+            values.append(float(details.get("weight", 0.0)))
+            values.append(float(details.get("weighted_score", 0.0)))
+            templates.append(intern(str(template)))
+            params_list.append(params if isinstance(params, dict) else None)
+            subscores_list.append(
+                {intern(str(key)): float(value) for key, value in subscores.items()}
+                if isinstance(subscores, dict)
+                else None
+            )
+    return ScoreBreakdown.from_columns(categories, values, templates, params_list, subscores_list)
+
+
+def scoring_config_to_payload(config: ScoringConfig) -> dict:
+    return {
+        "job_id": config.job_id,
+        "version": config.version,
+        "github_required": config.github_required,
+        "category_weights": config.category_weights.as_percentages(),
+        "resume_subweights": {
+            "required_skills": config.resume_subweights.required_skills,
+            "experience_fit": config.resume_subweights.experience_fit,
+            "nice_to_have": config.resume_subweights.nice_to_have,
+        },
+    }
+
+
+def scoring_config_from_payload(job_id: str, config_data: Dict[str, object]) -> ScoringConfig:
+    weights = config_data.get("category_weights", {})
+    subweights = config_data.get("resume_subweights", {})
+    return ScoringConfig(
+        job_id=job_id,
+        github_required=config_data.get("github_required", False),
+        version=int(config_data.get("version", 0)),
+        category_weights=CategoryWeights(
+            resume_skills=weights.get("resume_skills", 25) / 100,
+            github_code_quality=weights.get("github_code_quality", 30) / 100,
+            project_originality=weights.get("project_originality", 20) / 100,
+            documentation_quality=weights.get("documentation_quality", 10) / 100,
+            engineering_practices=weights.get("engineering_practices", 15) / 100,
+        ),
+        resume_subweights=ResumeSubWeights(
+            required_skills=subweights.get("required_skills", 0.6),
+            experience_fit=subweights.get("experience_fit", 0.2),
+            nice_to_have=subweights.get("nice_to_have", 0.2),
+        ),
+    )
+
+
+def import_job_to_payload(job: CandidateImportJob) -> dict:
+    payload = asdict(job)
+    payload["created_at"] = job.created_at.isoformat()
+    payload["updated_at"] = job.updated_at.isoformat()
+    return payload
+
+
+def import_job_from_payload(payload: dict) -> CandidateImportJob:
+    results: List[CandidateImportResult] = []
+    for result in payload.get("results") or []:
+        if not isinstance(result, dict):
+            continue
+        results.append(import_result_from_payload(result))
+    return CandidateImportJob(
+        import_id=str(payload.get("import_id", "")),
+        owner_id=str(payload.get("owner_id", "")),
+        job_id=str(payload.get("job_id", "")),
+        status=str(payload.get("status", "")),
+        headers=list(payload.get("headers") or []),
+        mapping=dict(payload.get("mapping") or {}),
+        total_rows=int(payload.get("total_rows", 0)),
+        processed_rows=int(payload.get("processed_rows", 0)),
+        success_count=int(payload.get("success_count", 0)),
+        failure_count=int(payload.get("failure_count", 0)),
+        results=results,
+        skipped_count=int(payload.get("skipped_count", 0)),
+        duplicate_mode=str(payload.get("duplicate_mode", "skip")),
+        error_message=payload.get("error_message"),
+        source_offset=int(payload.get("source_offset", 0)),
+        created_at=_parse_datetime(payload.get("created_at")),
+        updated_at=_parse_datetime(payload.get("updated_at")),
+    )
+
+
+def import_result_to_payload(result: CandidateImportResult) -> dict:
+    return asdict(result)
+
+
+def import_result_from_payload(payload: dict) -> CandidateImportResult:
+    return CandidateImportResult(
+        row_number=int(payload.get("row_number", 0)),
+        status=str(payload.get("status", "")),
+        candidate_id=payload.get("candidate_id"),
+        errors=list(payload.get("errors") or []),
+    )
+
+
+def job_insights_aggregate_to_payload(aggregate: JobInsightsAggregate) -> dict:
+    return asdict(aggregate)
+
+
+def job_insights_aggregate_from_payload(payload: dict) -> JobInsightsAggregate:
+    return JobInsightsAggregate(
+        owner_id=str(payload.get("owner_id", "")),
+        job_id=str(payload.get("job_id", "")),
+        total_applications=int(payload.get("total_applications", 0)),
+        scored_applications=int(payload.get("scored_applications", 0)),
+        bucket_counts=[int(count) for count in payload.get("bucket_counts") or []],
+        skill_counts={str(key): int(count) for key, count in (payload.get("skill_counts") or {}).items()},
+        skill_names={str(key): str(name) for key, name in (payload.get("skill_names") or {}).items()},
+    )
+
+
+def analysis_state_to_payload(state: CandidateAnalysisState) -> dict:
+    payload = asdict(state)
+    payload["updated_at"] = state.updated_at.isoformat()
+    return payload
+
+
+def analysis_state_from_payload(payload: dict) -> CandidateAnalysisState:
+    resume = payload.get("resume_analysis")
+    github = payload.get("github_analysis")
+    return CandidateAnalysisState(
+        candidate_id=str(payload.get("candidate_id", "")),
+        job_id=str(payload.get("job_id", "")),
+        resume_analysis=ResumeAnalysis(
+            required_skills_matched=int(resume.get("required_skills_matched", 0)),
+            required_skills_total=int(resume.get("required_skills_total", 0)),
+            nice_to_have_matched=int(resume.get("nice_to_have_matched", 0)),
+            nice_to_have_total=int(resume.get("nice_to_have_total", 0)),
+            experience_years=float(resume.get("experience_years", 0.0)),
+            required_experience_years=float(resume.get("required_experience_years", 0.0)),
+        )
+        if isinstance(resume, dict)
+        else None,
+        github_analysis=GitHubAnalysis(
+            code_quality_score=float(github.get("code_quality_score", 0.0)),
+            documentation_score=float(github.get("documentation_score", 0.0)),
+            engineering_practices_score=float(github.get("engineering_practices_score", 0.0)),
+            projects=list(github.get("projects") or []),
+        )
+        if isinstance(github, dict)
+        else None,
+        github_url=payload.get("github_url"),
+        updated_at=_parse_datetime(payload.get("updated_at")),
+    )
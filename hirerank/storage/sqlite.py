@@ -0,0 +1,857 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Collection, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from hirerank.background_jobs.models import CandidateAnalysisState, QueuedTask
+from hirerank.dashboard.insights import normalize_email, normalize_skill
+from hirerank.dashboard.models import CandidateApplication, JobInsightsAggregate
+from hirerank.imports.models import CandidateImportJob, CandidateImportResult
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.models import SCORE_TOTALS, ScoreResult
+from hirerank.storage.files import file_lock
+from hirerank.storage.serialization import (
+    analysis_state_from_payload,
+    analysis_state_to_payload,
+    application_from_payload,
+    application_to_payload,
+    import_job_from_payload,
+    import_job_to_payload,
+    import_result_from_payload,
+    import_result_to_payload,
+    job_insights_aggregate_from_payload,
+    job_insights_aggregate_to_payload,
+    score_fields,
+    score_result_from_payload,
+    score_results_to_payloads,
+    scoring_config_from_payload,
+    scoring_config_to_payload,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    application_id TEXT PRIMARY KEY,
+    owner_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_applications_owner_job ON applications (owner_id, job_id);
+CREATE INDEX IF NOT EXISTS idx_applications_owner_job_candidate ON applications (owner_id, job_id, candidate_id);
+CREATE INDEX IF NOT EXISTS idx_applications_job_owner ON applications (job_id, owner_id);
+
+CREATE TABLE IF NOT EXISTS application_terms (
+    owner_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    application_id TEXT NOT NULL,
+    PRIMARY KEY (owner_id, job_id, field, value, application_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_application_terms_application ON application_terms (application_id);
+
+CREATE TABLE IF NOT EXISTS scores (
+    job_id TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    total_score REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (job_id, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scores_rank ON scores (job_id, total_score DESC, candidate_id);
+
+CREATE TABLE IF NOT EXISTS score_job_revisions (
+    job_id TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS scoring_configs (
+    job_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS job_insights (
+    job_id TEXT NOT NULL,
+    owner_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (job_id, owner_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS analysis_states (
+    job_id TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (job_id, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_analysis_states_updated_at ON analysis_states (updated_at);
+
+CREATE TABLE IF NOT EXISTS candidate_imports (
+    import_id TEXT PRIMARY KEY,
+    owner_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_candidate_imports_owner_job ON candidate_imports (owner_id, job_id);
+
+CREATE TABLE IF NOT EXISTS candidate_import_results (
+    import_id TEXT NOT NULL,
+    row_number INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (import_id, row_number)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    max_attempts INTEGER NOT NULL,
+    available_at TEXT NOT NULL,
+    lease_owner TEXT,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    fair_key TEXT,
+    ref TEXT,
+    weight REAL NOT NULL DEFAULT 1,
+    start_tag REAL NOT NULL DEFAULT 0,
+    finish_tag REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_available ON tasks (status, available_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_fair ON tasks (status, finish_tag);
+CREATE INDEX IF NOT EXISTS idx_tasks_fair_key ON tasks (fair_key, status);
+CREATE INDEX IF NOT EXISTS idx_tasks_ref ON tasks (ref);
+"""
+
+# Stay well below SQLite's default limit on bound parameters.
+_IN_CHUNK_SIZE = 500
+
+
+def _chunks(values: Iterable[str]) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) >= _IN_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class SqliteDatabase:
+    def __init__(self, database_path: Path, busy_timeout_ms: int = 5000) -> None:
+        self.database_path = database_path
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        with self.connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared across threads, so keep one per thread.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=self.busy_timeout_ms / 1000)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.connection = connection
+        return connection
+
+
+def _application_terms(application: CandidateApplication) -> List[Tuple[str, str, str, str, str]]:
+    key = (application.owner_id, application.job_id)
+    terms = {("status", application.status.strip().lower())}
+    terms.update(("skill", normalize_skill(skill)) for skill in application.skills if skill.strip())
+    if application.email and application.email.strip():
+        terms.add(("email", normalize_email(application.email)))
+    return [(*key, field, value, application.application_id) for field, value in sorted(terms)]
+
+
+class SqliteApplicationRepository:
+    def __init__(self, database: SqliteDatabase) -> None:
+        self.database = database
+
+    def save(self, application: CandidateApplication) -> None:
+        self.save_many([application])
+
+    def save_many(self, applications: Iterable[CandidateApplication]) -> None:
+        applications = list(applications)
+        if not applications:
+            return
+        with self.database.connection() as connection:
+            # Update in place rather than INSERT OR REPLACE: replacing deletes the row and
+            # assigns a new rowid, which would move the application to the end of
+            # first-save order and invalidate positions and cursors handed out for it.
+            connection.executemany(
+                "INSERT INTO applications (application_id, owner_id, job_id, candidate_id, payload)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (application_id) DO UPDATE SET owner_id = excluded.owner_id,"
+                " job_id = excluded.job_id, candidate_id = excluded.candidate_id, payload = excluded.payload",
+                [
+                    (
+                        application.application_id,
+                        application.owner_id,
+                        application.job_id,
+                        application.candidate_id,
+                        json.dumps(application_to_payload(application), sort_keys=True),
+                    )
+                    for application in applications
+                ],
+            )
+            connection.executemany(
+                "DELETE FROM application_terms WHERE application_id = ?",
+                [(application.application_id,) for application in applications],
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO application_terms (owner_id, job_id, field, value, application_id)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [term for application in applications for term in _application_terms(application)],
+            )
+
+    def list_by_job(self, owner_id: str, job_id: str) -> List[CandidateApplication]:
+        rows = self.database.connection().execute(
+            "SELECT payload FROM applications WHERE owner_id = ? AND job_id = ? ORDER BY rowid",
+            (owner_id, job_id),
+        )
+        return [application_from_payload(json.loads(payload)) for (payload,) in rows]
+
+    def get(self, owner_id: str, job_id: str, application_id: str) -> Optional[CandidateApplication]:
+        row = self.database.connection().execute(
+            "SELECT payload FROM applications WHERE application_id = ? AND owner_id = ? AND job_id = ?",
+            (application_id, owner_id, job_id),
+        ).fetchone()
+        return application_from_payload(json.loads(row[0])) if row else None
+
+    def list_jobs(self) -> List[Tuple[str, str]]:
+        rows = self.database.connection().execute("SELECT DISTINCT owner_id, job_id FROM applications")
+        return [(owner_id, job_id) for owner_id, job_id in rows]
+
+    def job_owners(self, job_id: str) -> Set[str]:
+        rows = self.database.connection().execute(
+            "SELECT DISTINCT owner_id FROM applications WHERE job_id = ?",
+            (job_id,),
+        )
+        return {owner_id for (owner_id,) in rows}
+
+    def get_by_candidates(
+        self,
+        owner_id: str,
+        job_id: str,
+        candidate_ids: Iterable[str],
+    ) -> Dict[str, CandidateApplication]:
+        applications: Dict[str, CandidateApplication] = {}
+        connection = self.database.connection()
+        for chunk in _chunks(candidate_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = connection.execute(
+                "SELECT candidate_id, payload FROM applications"
+                f" WHERE owner_id = ? AND job_id = ? AND candidate_id IN ({placeholders}) ORDER BY rowid",
+                (owner_id, job_id, *chunk),
+            )
+            for candidate_id, payload in rows:
+                applications[candidate_id] = application_from_payload(json.loads(payload))
+        return applications
+
+    def match_candidates(
+        self,
+        owner_id: str,
+        job_id: str,
+        skills: Iterable[str] = (),
+        status: Optional[str] = None,
+        match_all: bool = False,
+    ) -> Dict[str, int]:
+        wanted = sorted({normalize_skill(skill) for skill in skills if skill.strip()})
+        query = "SELECT candidate_id, rowid FROM applications WHERE owner_id = ? AND job_id = ?"
+        params: List[object] = [owner_id, job_id]
+        if wanted:
+            placeholders = ", ".join("?" for _ in wanted)
+            query += (
+                " AND application_id IN (SELECT application_id FROM application_terms"
+                f" WHERE owner_id = ? AND job_id = ? AND field = 'skill' AND value IN ({placeholders})"
+            )
+            params += [owner_id, job_id, *wanted]
+            if match_all:
+                query += " GROUP BY application_id HAVING COUNT(*) = ?"
+                params.append(len(wanted))
+            query += ")"
+        if status:
+            query += (
+                " AND application_id IN (SELECT application_id FROM application_terms"
+                " WHERE owner_id = ? AND job_id = ? AND field = 'status' AND value = ?)"
+            )
+            params += [owner_id, job_id, status.strip().lower()]
+        rows = self.database.connection().execute(query + " ORDER BY rowid", params)
+        return {candidate_id: position for candidate_id, position in rows}
+
+    def match_emails(self, owner_id: str, job_id: str, emails: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+        matches: Dict[str, Tuple[str, str]] = {}
+        connection = self.database.connection()
+        for chunk in _chunks({normalize_email(email) for email in emails}):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = connection.execute(
+                "SELECT t.value, a.application_id, a.candidate_id FROM application_terms AS t"
+                " JOIN applications AS a ON a.application_id = t.application_id"
+                f" WHERE t.owner_id = ? AND t.job_id = ? AND t.field = 'email' AND t.value IN ({placeholders})"
+                " ORDER BY a.rowid",
+                (owner_id, job_id, *chunk),
+            )
+            # Later writes win, as in the JSON index.
+            for email, application_id, candidate_id in rows:
+                matches[email] = (application_id, candidate_id)
+        return matches
+
+    def iter_by_job(
+        self,
+        owner_id: str,
+        job_id: str,
+        after: Optional[int] = None,
+        batch_size: int = 256,
+    ) -> Iterator[Tuple[int, CandidateApplication]]:
+        position = -1 if after is None else after
+        while True:
+            rows = self.database.connection().execute(
+                "SELECT rowid, payload FROM applications WHERE owner_id = ? AND job_id = ? AND rowid > ?"
+                " ORDER BY rowid LIMIT ?",
+                (owner_id, job_id, position, batch_size),
+            ).fetchall()
+            for position, payload in rows:
+                yield position, application_from_payload(json.loads(payload))
+            if len(rows) < batch_size:
+                return
+
+
+class SqliteScoringRepository:
+    def __init__(self, database: SqliteDatabase) -> None:
+        self.database = database
+
+    def save(self, result: ScoreResult) -> None:
+        self.save_many([result])
+
+    def save_many(self, results: Iterable[ScoreResult]) -> None:
+        rows = [
+            (payload["job_id"], payload["candidate_id"], payload["total_score"], json.dumps(payload, sort_keys=True))
+            for payload in score_results_to_payloads(results)
+        ]
+        if not rows:
+            return
+        with self.database.connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO scores (job_id, candidate_id, total_score, payload) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            connection.executemany(
+                "INSERT INTO score_job_revisions (job_id, revision) VALUES (?, 1)"
+                " ON CONFLICT (job_id) DO UPDATE SET revision = revision + 1",
+                [(job_id,) for job_id in {row[0] for row in rows}],
+            )
+
+    def job_revision(self, job_id: str) -> Optional[str]:
+        row = self.database.connection().execute(
+            "SELECT revision FROM score_job_revisions WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        return str(row[0]) if row else None
+
+    def list_by_job(self, job_id: str, fields: Optional[Collection[str]] = None) -> Dict[str, ScoreResult]:
+        projection = score_fields(fields)
+        connection = self.database.connection()
+        results: Dict[str, ScoreResult] = {}
+        if projection <= SCORE_TOTALS:
+            # Totals have their own column, so the payload is never read.
+            rows = connection.execute("SELECT candidate_id, total_score FROM scores WHERE job_id = ?", (job_id,))
+            for candidate_id, total in rows:
+                payload = {"candidate_id": candidate_id, "job_id": job_id, "total_score": total}
+                results[candidate_id] = score_result_from_payload(payload, job_id, projection)
+            return results
+        rows = connection.execute("SELECT candidate_id, payload FROM scores WHERE job_id = ?", (job_id,))
+        for candidate_id, payload in rows:
+            results[candidate_id] = score_result_from_payload(json.loads(payload), job_id, projection)
+        return results
+
+    def get_many(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, ScoreResult]:
+        results: Dict[str, ScoreResult] = {}
+        connection = self.database.connection()
+        for chunk in _chunks(candidate_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = connection.execute(
+                f"SELECT candidate_id, payload FROM scores WHERE job_id = ? AND candidate_id IN ({placeholders})",
+                (job_id, *chunk),
+            )
+            for candidate_id, payload in rows:
+                results[candidate_id] = score_result_from_payload(json.loads(payload), job_id)
+        return results
+
+    def get_totals(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        connection = self.database.connection()
+        for chunk in _chunks(candidate_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = connection.execute(
+                f"SELECT candidate_id, total_score FROM scores WHERE job_id = ? AND candidate_id IN ({placeholders})",
+                (job_id, *chunk),
+            )
+            totals.update((candidate_id, total) for candidate_id, total in rows)
+        return totals
+
+    def get_fingerprints(self, job_id: str, candidate_ids: Iterable[str]) -> Dict[str, str]:
+        fingerprints: Dict[str, str] = {}
+        connection = self.database.connection()
+        for chunk in _chunks(candidate_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = connection.execute(
+                f"SELECT candidate_id, json_extract(payload, '$.fingerprint') FROM scores"
+                f" WHERE job_id = ? AND candidate_id IN ({placeholders})",
+                (job_id, *chunk),
+            )
+            fingerprints.update((candidate_id, fingerprint) for candidate_id, fingerprint in rows if fingerprint)
+        return fingerprints
+
+    def scored_candidate_ids(self, job_id: str, candidate_ids: Iterable[str]) -> Set[str]:
+        scored: Set[str] = set()
+        connection = self.database.connection()
+        for chunk in _chunks(candidate_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = connection.execute(
+                f"SELECT candidate_id FROM scores WHERE job_id = ? AND candidate_id IN ({placeholders})",
+                (job_id, *chunk),
+            )
+            scored.update(candidate_id for (candidate_id,) in rows)
+        return scored
+
+    def iter_ranked(
+        self,
+        job_id: str,
+        after: Optional[Tuple[float, str]] = None,
+        batch_size: int = 256,
+    ) -> Iterator[Tuple[str, float]]:
+        while True:
+            if after is None:
+                rows = self.database.connection().execute(
+                    "SELECT candidate_id, total_score FROM scores WHERE job_id = ?"
+                    " ORDER BY total_score DESC, candidate_id LIMIT ?",
+                    (job_id, batch_size),
+                ).fetchall()
+            else:
+                total, candidate_id = after
+                rows = self.database.connection().execute(
+                    "SELECT candidate_id, total_score FROM scores"
+                    " WHERE job_id = ? AND (total_score < ? OR (total_score = ? AND candidate_id > ?))"
+                    " ORDER BY total_score DESC, candidate_id LIMIT ?",
+                    (job_id, total, total, candidate_id, batch_size),
+                ).fetchall()
+            for candidate_id, total in rows:
+                yield candidate_id, total
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][1], rows[-1][0])
+
+
+class SqliteScoringConfigRepository:
+    def __init__(self, database: SqliteDatabase) -> None:
+        self.database = database
+        # Parsed configs by job; reading the stored version is enough to tell
+        # whether another connection or process has saved a newer one.
+        self._lock = threading.Lock()
+        self._configs: Dict[str, ScoringConfig] = {}
+
+    def save(self, config: ScoringConfig) -> ScoringConfig:
+        return self.save_many([config])[0]
+
+    def save_many(self, configs: Iterable[ScoringConfig]) -> List[ScoringConfig]:
+        configs = list(configs)
+        saved: List[ScoringConfig] = []
+        if not configs:
+            return saved
+        with self.database.connection() as connection:
+            # Take the write lock up front so concurrent saves get distinct versions.
+            connection.execute("BEGIN IMMEDIATE")
+            for config in configs:
+                row = connection.execute(
+                    "SELECT payload FROM scoring_configs WHERE job_id = ?",
+                    (config.job_id,),
+                ).fetchone()
+                previous = json.loads(row[0]) if row else {}
+                saved.append(replace(config, version=int(previous.get("version", 0)) + 1))
+                connection.execute(
+                    "INSERT OR REPLACE INTO scoring_configs (job_id, payload) VALUES (?, ?)",
+                    (config.job_id, json.dumps(scoring_config_to_payload(saved[-1]), sort_keys=True)),
+                )
+        with self._lock:
+            for config in saved:
+                self._configs.pop(config.job_id, None)
+        return saved
+
+    def get(self, job_id: str) -> ScoringConfig:
+        connection = self.database.connection()
+        row = connection.execute(
+            "SELECT json_extract(payload, '$.version') FROM scoring_configs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return ScoringConfig(job_id=job_id)
+        cached = self._configs.get(job_id)
+        if cached is not None and cached.version == row[0]:
+            return cached
+        row = connection.execute(
+            "SELECT payload FROM scoring_configs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return ScoringConfig(job_id=job_id)
+        config = scoring_config_from_payload(job_id, json.loads(row[0]))
+        with self._lock:
+            self._configs[job_id] = config
+        return config
+
+
+class SqliteJobInsightsRepository:
+    def __init__(self, database: SqliteDatabase) -> None:
+        self.database = database
+
+    def get(self, owner_id: str, job_id: str) -> Optional[JobInsightsAggregate]:
+        row = self.database.connection().execute(
+            "SELECT payload FROM job_insights WHERE job_id = ? AND owner_id = ?",
+            (job_id, owner_id),
+        ).fetchone()
+        return job_insights_aggregate_from_payload(json.loads(row[0])) if row else None
+
+    def save(self, aggregate: JobInsightsAggregate) -> None:
+        with self.database.connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO job_insights (job_id, owner_id, payload) VALUES (?, ?, ?)",
+                (
+                    aggregate.job_id,
+                    aggregate.owner_id,
+                    json.dumps(job_insights_aggregate_to_payload(aggregate), sort_keys=True),
+                ),
+            )
+
+    def owners_for_job(self, job_id: str) -> List[str]:
+        rows = self.database.connection().execute(
+            "SELECT owner_id FROM job_insights WHERE job_id = ?",
+            (job_id,),
+        )
+        return [owner_id for (owner_id,) in rows]
+
+    def locked(self, job_ids: Collection[str]) -> ContextManager[None]:
+        # The tracker's reads and writes span several repositories, each committing on
+        # its own, so one lock for the database stands in for a transaction.
+        return file_lock(self.database.database_path.with_name(f"{self.database.database_path.name}.insights"))
+
+
+class SqliteAnalysisStateRepository:
+    def __init__(self, database: SqliteDatabase) -> None:
+        self.database = database
+
+    def get(self, job_id: str, candidate_id: str) -> Optional[CandidateAnalysisState]:
+        row = self.database.connection().execute(
+            "SELECT payload FROM analysis_states WHERE job_id = ? AND candidate_id = ?",
+            (job_id, candidate_id),
+        ).fetchone()
+        return analysis_state_from_payload(json.loads(row[0])) if row else None
+
+    def save_many(self, states: Iterable[CandidateAnalysisState]) -> None:
+        rows = [
+            (
+                state.job_id,
+                state.candidate_id,
+                state.updated_at.isoformat(),
+                json.dumps(analysis_state_to_payload(state), sort_keys=True),
+            )
+            for state in states
+        ]
+        if not rows:
+            return
+        with self.database.connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO analysis_states (job_id, candidate_id, updated_at, payload) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def delete_many(self, keys: Iterable[Tuple[str, str]]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        with self.database.connection() as connection:
+            connection.executemany("DELETE FROM analysis_states WHERE job_id = ? AND candidate_id = ?", keys)
+
+    def delete_expired(self, before: datetime) -> int:
+        with self.database.connection() as connection:
+            cursor = connection.execute("DELETE FROM analysis_states WHERE updated_at < ?", (before.isoformat(),))
+        return cursor.rowcount
+
+
+class SqliteCandidateImportRepository:
+    def __init__(self, database: SqliteDatabase) -> None:
+        self.database = database
+
+    def create(self, job: CandidateImportJob) -> None:
+        self.update(job)
+
+    def update(self, job: CandidateImportJob) -> None:
+        self.save_many([job])
+
+    def save_many(self, jobs: Iterable[CandidateImportJob]) -> None:
+        rows = []
+        for job in jobs:
+            payload = import_job_to_payload(job)
+            payload.pop("results", None)
+            rows.append((job.import_id, job.owner_id, job.job_id, json.dumps(payload, sort_keys=True)))
+        if not rows:
+            return
+        with self.database.connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO candidate_imports (import_id, owner_id, job_id, payload) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def append_results(self, import_id: str, results: Iterable[CandidateImportResult]) -> None:
+        rows = [
+            (import_id, result.row_number, json.dumps(import_result_to_payload(result), sort_keys=True))
+            for result in results
+        ]
+        if not rows:
+            return
+        with self.database.connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO candidate_import_results (import_id, row_number, payload) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def get(
+        self, owner_id: str, job_id: str, import_id: str, include_results: bool = True
+    ) -> Optional[CandidateImportJob]:
+        row = self.database.connection().execute(
+            "SELECT payload FROM candidate_imports WHERE import_id = ? AND owner_id = ? AND job_id = ?",
+            (import_id, owner_id, job_id),
+        ).fetchone()
+        if row is None:
+            return None
+        if not include_results:
+            return import_job_from_payload(json.loads(row[0]))
+        return self._from_payload(json.loads(row[0]))
+
+    def list_by_job(self, owner_id: str, job_id: str) -> List[CandidateImportJob]:
+        rows = self.database.connection().execute(
+            "SELECT payload FROM candidate_imports WHERE owner_id = ? AND job_id = ? ORDER BY rowid",
+            (owner_id, job_id),
+        )
+        return [self._from_payload(json.loads(payload)) for (payload,) in rows.fetchall()]
+
+    def _from_payload(self, payload: dict) -> CandidateImportJob:
+        job = import_job_from_payload(payload)
+        rows = self.database.connection().execute(
+            "SELECT payload FROM candidate_import_results WHERE import_id = ? ORDER BY row_number",
+            (job.import_id,),
+        )
+        job.results = [import_result_from_payload(json.loads(result)) for (result,) in rows]
+        return job
+
+
+_TASK_COLUMNS = "task_id, kind, payload, attempts, max_attempts, fair_key, ref, last_error, created_at"
+
+
+def _task_from_row(row: Tuple) -> QueuedTask:
+    task_id, kind, payload, attempts, max_attempts, fair_key, ref, last_error, created_at = row
+    return QueuedTask(
+        task_id=task_id,
+        kind=kind,
+        payload=json.loads(payload),
+        attempts=attempts,
+        max_attempts=max_attempts,
+        fair_key=fair_key,
+        ref=ref,
+        last_error=last_error,
+        created_at=datetime.fromisoformat(created_at),
+    )
+
+
+class SqliteTaskQueue:
+    # A lease table: claiming a task hides it until available_at, so a task whose
+    # worker dies becomes claimable again once its lease runs out.
+    #
+    # Tasks sharing a fair_key (the owner) are ordered by start-time fair queuing:
+    # a task starts at the later of the queue's virtual time and its key's last
+    # finish tag, finishes cost / weight later, and claims go by finish tag. A key
+    # with a long backlog therefore cannot starve a key that just enqueued work.
+    def __init__(self, database: SqliteDatabase) -> None:
+        self.database = database
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, object],
+        max_attempts: int = 5,
+        fair_key: Optional[str] = None,
+        cost: float = 1.0,
+        weight: float = 1.0,
+        ref: Optional[str] = None,
+    ) -> QueuedTask:
+        if weight <= 0:
+            raise ValueError("Task weight must be positive.")
+        task = QueuedTask(
+            task_id=str(uuid4()),
+            kind=kind,
+            payload=payload,
+            max_attempts=max_attempts,
+            fair_key=fair_key,
+            ref=ref,
+        )
+        with self.database.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            start_tag, finish_tag = self._fair_tags(connection, fair_key, cost, weight)
+            connection.execute(
+                "INSERT INTO tasks (task_id, kind, payload, status, attempts, max_attempts, available_at, created_at,"
+                " fair_key, ref, weight, start_tag, finish_tag) VALUES (?, ?, ?, 'queued', 0, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    task.task_id,
+                    task.kind,
+                    json.dumps(task.payload, sort_keys=True),
+                    task.max_attempts,
+                    task.created_at.isoformat(),
+                    task.created_at.isoformat(),
+                    fair_key,
+                    ref,
+                    weight,
+                    start_tag,
+                    finish_tag,
+                ),
+            )
+        return task
+
+    def claim(
+        self, worker_id: str, visibility_timeout: timedelta, max_leases_per_key: Optional[int] = None
+    ) -> Optional[QueuedTask]:
+        now = datetime.utcnow().isoformat()
+        # Keys already holding max_leases_per_key live leases are skipped until one finishes.
+        capped = ""
+        params: List[object] = [now]
+        if max_leases_per_key is not None:
+            capped = (
+                " AND (t.fair_key IS NULL OR (SELECT COUNT(*) FROM tasks AS l WHERE l.fair_key = t.fair_key"
+                " AND l.status = 'leased' AND l.available_at > ?) < ?)"
+            )
+            params.extend([now, max_leases_per_key])
+        with self.database.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            while True:
+                row = connection.execute(
+                    f"SELECT {_TASK_COLUMNS} FROM tasks AS t"
+                    f" WHERE t.status IN ('queued', 'leased') AND t.available_at <= ?{capped}"
+                    " ORDER BY t.finish_tag, t.rowid LIMIT 1",
+                    params,
+                ).fetchone()
+                if row is None:
+                    return None
+                task = _task_from_row(row)
+                # A task whose last lease expired is handed out once more, past
+                # max_attempts, so a worker can run its failure handler; if that
+                # lease also runs out, the task is marked failed here.
+                if task.attempts > task.max_attempts:
+                    connection.execute(
+                        "UPDATE tasks SET status = 'failed', lease_owner = NULL,"
+                        " last_error = COALESCE(last_error, 'Lease expired.') WHERE task_id = ?",
+                        (task.task_id,),
+                    )
+                    continue
+                connection.execute(
+                    "UPDATE tasks SET status = 'leased', attempts = attempts + 1, available_at = ?, lease_owner = ?"
+                    " WHERE task_id = ?",
+                    ((datetime.utcnow() + visibility_timeout).isoformat(), worker_id, task.task_id),
+                )
+                task.attempts += 1
+                return task
+
+    def extend(self, task_id: str, worker_id: str, visibility_timeout: timedelta) -> bool:
+        available_at = datetime.utcnow() + visibility_timeout
+        with self.database.connection() as connection:
+            cursor = connection.execute(
+                "UPDATE tasks SET available_at = ? WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                (available_at.isoformat(), task_id, worker_id),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, task_id: str, worker_id: str) -> None:
+        with self.database.connection() as connection:
+            connection.execute(
+                "DELETE FROM tasks WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                (task_id, worker_id),
+            )
+
+    def requeue(self, task_id: str, worker_id: str, cost: float) -> bool:
+        # Hand a leased task back for more work in one step, re-entering fair
+        # queuing after its own finish tag; attempts start over for the new slice.
+        with self.database.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT fair_key, weight FROM tasks WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                (task_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return False
+            fair_key, weight = row
+            start_tag, finish_tag = self._fair_tags(connection, fair_key, cost, weight, requeued_task_id=task_id)
+            connection.execute(
+                "UPDATE tasks SET status = 'queued', attempts = 0, available_at = ?, lease_owner = NULL,"
+                " last_error = NULL, start_tag = ?, finish_tag = ? WHERE task_id = ?",
+                (datetime.utcnow().isoformat(), start_tag, finish_tag, task_id),
+            )
+        return True
+
+    def fail(self, task_id: str, worker_id: str, error: str, retry_delay: timedelta) -> None:
+        available_at = datetime.utcnow() + retry_delay
+        with self.database.connection() as connection:
+            connection.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,"
+                " available_at = ?, lease_owner = NULL, last_error = ?"
+                " WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                (available_at.isoformat(), error, task_id, worker_id),
+            )
+
+    def queue_position(self, ref: str) -> Optional[int]:
+        # 0 while a worker holds the task, otherwise 1 + the queued tasks ordered ahead of it.
+        connection = self.database.connection()
+        row = connection.execute(
+            "SELECT status, finish_tag, rowid FROM tasks WHERE ref = ? AND status IN ('queued', 'leased')"
+            " ORDER BY status = 'leased' DESC, finish_tag LIMIT 1",
+            (ref,),
+        ).fetchone()
+        if row is None:
+            return None
+        status, finish_tag, rowid = row
+        if status == "leased":
+            return 0
+        (ahead,) = connection.execute(
+            "SELECT COUNT(*) FROM tasks WHERE status = 'queued' AND (finish_tag < ? OR (finish_tag = ? AND rowid < ?))",
+            (finish_tag, finish_tag, rowid),
+        ).fetchone()
+        return ahead + 1
+
+    def _fair_tags(
+        self,
+        connection: sqlite3.Connection,
+        fair_key: Optional[str],
+        cost: float,
+        weight: float,
+        requeued_task_id: Optional[str] = None,
+    ) -> Tuple[float, float]:
+        # Virtual time is the earliest start tag still waiting or running.
+        (virtual_time,) = connection.execute(
+            "SELECT COALESCE(MIN(start_tag), 0) FROM tasks WHERE status IN ('queued', 'leased') AND task_id IS NOT ?",
+            (requeued_task_id,),
+        ).fetchone()
+        start_tag = virtual_time
+        if fair_key is not None:
+            (last_finish,) = connection.execute(
+                "SELECT COALESCE(MAX(finish_tag), 0) FROM tasks WHERE fair_key = ? AND status IN ('queued', 'leased')",
+                (fair_key,),
+            ).fetchone()
+            start_tag = max(virtual_time, last_finish)
+        return start_tag, start_tag + max(cost, 0.0) / weight
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Type
+
+from hirerank.dashboard.models import CandidateApplication
+from hirerank.imports.models import CandidateImportJob, CandidateImportResult
+from hirerank.scoring.models import ScoreBatch, ScoreResult
+from hirerank.storage.protocols import ApplicationStore, CandidateImportStore, ScoreStore
+
+
+class UnitOfWork:
+    # Buffers writes and flushes each store with one batched call on commit.
+    # Reads still go to the stores and do not see uncommitted writes.
+    def __init__(
+        self,
+        applications: Optional[ApplicationStore] = None,
+        scores: Optional[ScoreStore] = None,
+        imports: Optional[CandidateImportStore] = None,
+    ) -> None:
+        self.applications = applications
+        self.scores = scores
+        self.imports = imports
+        self._applications: List[CandidateApplication] = []
+        # Score groups stay as handed in, so a columnar batch stays columnar.
+        self._scores: List[Sequence[ScoreResult]] = []
+        self._import_results: Dict[str, List[CandidateImportResult]] = {}
+        self._import_jobs: Dict[str, CandidateImportJob] = {}
+
+    def __enter__(self) -> UnitOfWork:
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc: Optional[BaseException], traceback: object) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def save_application(self, application: CandidateApplication) -> None:
+        self.save_applications([application])
+
+    def save_applications(self, applications: List[CandidateApplication]) -> None:
+        if self.applications is None:
+            raise ValueError("This unit of work has no application store.")
+        self._applications.extend(applications)
+
+    def save_score(self, result: ScoreResult) -> None:
+        self.save_scores([result])
+
+    def save_scores(self, results: Sequence[ScoreResult]) -> None:
+        if self.scores is None:
+            raise ValueError("This unit of work has no score store.")
+        if results:
+            self._scores.append(results)
+
+    def update_import(self, job: CandidateImportJob) -> None:
+        if self.imports is None:
+            raise ValueError("This unit of work has no import store.")
+        self._import_jobs[job.import_id] = job
+
+    def append_import_results(self, import_id: str, results: List[CandidateImportResult]) -> None:
+        if self.imports is None:
+            raise ValueError("This unit of work has no import store.")
+        self._import_results.setdefault(import_id, []).extend(results)
+
+    def commit(self) -> None:
+        # Import records go last so a checkpoint never points past the data it describes.
+        applications, self._applications = self._applications, []
+        scores, self._scores = self._scores, []
+        import_results, self._import_results = self._import_results, {}
+        import_jobs, self._import_jobs = self._import_jobs, {}
+        if applications:
+            self.applications.save_many(applications)
+        if scores:
+            self.scores.save_many(ScoreBatch.concat(scores))
+        for import_id, results in import_results.items():
+            self.imports.append_results(import_id, results)
+        if import_jobs:
+            self.imports.save_many(list(import_jobs.values()))
+
+    def rollback(self) -> None:
+        self._applications = []
+        self._scores = []
+        self._import_results = {}
+        self._import_jobs = {}
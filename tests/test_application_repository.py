@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+from pathlib import Path
+
+from hirerank.dashboard.models import CandidateApplication
+from hirerank.storage.application_repository import ApplicationRepository
+
+WRITERS = 3
+ROWS = 60
+
+
+def _application(writer: int, row: int, status: str) -> CandidateApplication:
+    return CandidateApplication(f"w{writer}-{row}", f"c{writer}-{row}", "job", "owner", status, ["python"])
+
+
+def _write(storage_path: Path, writer: int) -> None:
+    repository = ApplicationRepository(storage_path, compaction_min_records=10**9)
+    for row in range(ROWS):
+        repository.save(_application(writer, row, "new"))
+        # Rewrites leave stale records behind for the compactor to drop.
+        repository.save(_application(writer, row, "shortlisted"))
+
+
+def _compact_and_read(storage_path: Path, stop) -> None:
+    repository = ApplicationRepository(storage_path, compaction_min_records=10**9)
+    while not stop.is_set():
+        repository.compact()
+        for application in repository.list_by_job("owner", "job"):
+            assert application.application_id.startswith("w")
+        time.sleep(0.001)
+
+
+def test_compaction_in_another_process_keeps_concurrent_appends(tmp_path: Path) -> None:
+    storage_path = tmp_path / "applications.jsonl"
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    compactor = context.Process(target=_compact_and_read, args=(storage_path, stop))
+    writers = [context.Process(target=_write, args=(storage_path, writer)) for writer in range(WRITERS)]
+    compactor.start()
+    for process in writers:
+        process.start()
+    for process in writers:
+        process.join()
+    stop.set()
+    compactor.join()
+    assert [process.exitcode for process in writers] == [0] * WRITERS
+    assert compactor.exitcode == 0
+
+    applications = ApplicationRepository(storage_path).list_by_job("owner", "job")
+    assert sorted(application.application_id for application in applications) == sorted(
+        f"w{writer}-{row}" for writer in range(WRITERS) for row in range(ROWS)
+    )
+    assert {application.status for application in applications} == {"shortlisted"}
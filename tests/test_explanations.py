@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.engine import GitHubAnalysis, ResumeAnalysis, compute_score
+from hirerank.scoring.explanations import render_explanation, summarize_explanation
+from hirerank.storage.backends import open_repositories
+
+RESUME = ResumeAnalysis(2, 3, 1, 2, 4.0, 3.0)
+GITHUB = GitHubAnalysis(70.0, 60.0, 50.0, [{"originality_score": 80.0, "green_flags": ["tests"]}])
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+@pytest.mark.parametrize(
+    "resume, github",
+    [(RESUME, GITHUB), (RESUME, None), (None, GITHUB), (None, None), (RESUME, GitHubAnalysis(1.0, 2.0, 3.0, []))],
+)
+def test_stored_results_render_like_fresh_ones(
+    tmp_path: Path, backend: str, resume: Optional[ResumeAnalysis], github: Optional[GitHubAnalysis]
+) -> None:
+    fresh = compute_score("c1", "job", ScoringConfig(job_id="job"), resume, github)
+    scores = open_repositories(tmp_path, backend).scores
+    scores.save_many([fresh])
+    stored = scores.get_many("job", ["c1"])["c1"]
+
+    assert render_explanation(stored) == render_explanation(fresh)
+    assert summarize_explanation(stored) == summarize_explanation(fresh)
+    assert summarize_explanation(fresh).startswith("Candidate scoring summary:\n- Resume Skills:")
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from hirerank.dashboard import api
+
+OWNER = {"X-Owner-Id": "owner"}
+MAPPING = json.dumps({"name": "Name", "email": "Email"})
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setenv("HIRERANK_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setenv("HIRERANK_STORAGE_BACKEND", "json")
+    return TestClient(api.app, raise_server_exceptions=False)
+
+
+def _uploads(tmp_path: Path) -> list:
+    upload_dir = tmp_path / "import_uploads"
+    return sorted(path.name for path in upload_dir.iterdir()) if upload_dir.exists() else []
+
+
+def _post(client: TestClient, content: bytes, mapping: str = MAPPING):
+    return client.post(
+        "/dashboard/jobs/job/imports",
+        headers=OWNER,
+        files={"file": ("candidates.csv", content, "text/csv")},
+        data={"mapping": mapping},
+    )
+
+
+def test_queued_import_keeps_its_upload(client: TestClient, tmp_path: Path) -> None:
+    response = _post(client, b"Name,Email\nAda,ada@example.com\n")
+    assert response.status_code == 200
+    assert response.json()["queue_position"] == 1
+    assert _uploads(tmp_path) == [f"{response.json()['import_id']}.csv"]
+
+
+def test_rejected_mapping_removes_the_upload(client: TestClient, tmp_path: Path) -> None:
+    response = _post(client, b"Name,Email\nAda,ada@example.com\n", mapping=json.dumps({"name": "Missing"}))
+    assert response.status_code == 400
+    assert _uploads(tmp_path) == []
+
+
+def test_unreadable_headers_remove_the_upload(client: TestClient, tmp_path: Path) -> None:
+    # A header field past the csv module's size limit makes reading the headers raise.
+    response = _post(client, b"Name,Email," + b"x" * 200_000 + b"\n")
+    assert response.status_code == 400
+    assert _uploads(tmp_path) == []
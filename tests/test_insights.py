@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import multiprocessing
+import random
+from pathlib import Path
+
+import pytest
+
+from hirerank.dashboard.models import CandidateApplication
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.engine import ResumeAnalysis, compute_score
+from hirerank.storage.backends import open_repositories
+
+
+def _write(storage_dir: Path, backend: str, seed: int) -> None:
+    repositories = open_repositories(storage_dir, backend)
+    rng = random.Random(seed)
+    config = ScoringConfig(job_id="job")
+    for _ in range(30):
+        # A small id space so processes keep replacing each other's applications and scores.
+        index = rng.randrange(12)
+        repositories.applications.save(
+            CandidateApplication(
+                f"a{index}",
+                f"c{index}",
+                "job",
+                "owner",
+                rng.choice(["new", "shortlisted", "rejected"]),
+                rng.sample(["python", "go", "sql"], rng.randint(1, 2)),
+            )
+        )
+        resume = ResumeAnalysis(rng.randint(0, 4), 4, 0, 0, rng.uniform(0, 8), 3.0)
+        repositories.scores.save(compute_score(f"c{rng.randrange(12)}", "job", config, resume, None))
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_aggregates_stay_exact_with_writers_in_separate_processes(tmp_path: Path, backend: str) -> None:
+    repositories = open_repositories(tmp_path, backend)
+    repositories.applications.save(CandidateApplication("a0", "c0", "job", "owner", "new", ["python"]))
+
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_write, args=(tmp_path, backend, seed)) for seed in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    tracked = repositories.insights.get("owner", "job")
+    assert tracked == repositories.insights.rebuild("owner", "job")
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_reading_a_missing_aggregate_does_not_store_it(tmp_path: Path, backend: str) -> None:
+    repositories = open_repositories(tmp_path, backend)
+    # Saved past the tracker, as data written before aggregates existed would be.
+    repositories.applications.inner.save(CandidateApplication("a0", "c0", "job", "owner", "new", ["python"]))
+
+    assert repositories.insights.get("owner", "job").total_applications == 1
+    assert repositories.insights.store.get("owner", "job") is None
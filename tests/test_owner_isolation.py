@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from hirerank.dashboard import api
+from hirerank.dashboard.models import CandidateApplication
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.engine import ResumeAnalysis, compute_scores_batch
+
+OWNER = {"X-Owner-Id": "owner-a"}
+OTHER = {"X-Owner-Id": "owner-b"}
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def client(request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setenv("HIRERANK_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setenv("HIRERANK_STORAGE_BACKEND", request.param)
+    repositories = api._repositories()
+    repositories.applications.save_many(
+        [CandidateApplication(f"a{index}", f"c{index}", "job", "owner-a", "new", ["python"]) for index in range(3)]
+    )
+    candidate_ids = [f"c{index}" for index in range(3)]
+    resumes = [ResumeAnalysis(index, 3, 0, 0, 2.0, 2.0) for index in range(3)]
+    repositories.scores.save_many(
+        compute_scores_batch(ScoringConfig(job_id="job"), resumes, [None] * 3, candidate_ids)
+    )
+    return TestClient(api.app)
+
+
+def test_simulate_is_limited_to_the_job_owner(client: TestClient) -> None:
+    response = client.post("/dashboard/jobs/job/simulate", headers=OWNER, json={})
+    assert response.status_code == 200
+    assert response.json()["simulation"]["total_candidates"] == 3
+
+    response = client.post("/dashboard/jobs/job/simulate", headers=OTHER, json={})
+    assert response.status_code == 404
+
+
+def test_simulate_unknown_job_is_not_found(client: TestClient) -> None:
+    response = client.post("/dashboard/jobs/missing/simulate", headers=OWNER, json={})
+    assert response.status_code == 404
+
+
+def test_scoring_config_is_limited_to_the_job_owner(client: TestClient) -> None:
+    weights = {"resume_skills": 1, "github_code_quality": 0, "project_originality": 0}
+    response = client.put("/dashboard/jobs/job/scoring-config", headers=OTHER, json={"category_weights": weights})
+    assert response.status_code == 404
+    assert api._repositories().scoring_configs.get("job").version == 0
+
+    response = client.put("/dashboard/jobs/job/scoring-config", headers=OWNER, json={"category_weights": weights})
+    assert response.status_code == 200
+    assert api._repositories().scoring_configs.get("job").version == 1
+
+
+def test_scoring_config_can_be_set_before_a_job_has_applications(client: TestClient) -> None:
+    weights = {"resume_skills": 1}
+    response = client.put("/dashboard/jobs/new-job/scoring-config", headers=OTHER, json={"category_weights": weights})
+    assert response.status_code == 200
+    assert api._repositories().scoring_configs.get("new-job").version == 1
+
+    # Setting it up does not make the job visible to anyone.
+    response = client.post("/dashboard/jobs/new-job/simulate", headers=OTHER, json={})
+    assert response.status_code == 404
+
+
+def test_partial_weights_keep_the_other_weights(client: TestClient) -> None:
+    response = client.put(
+        "/dashboard/jobs/job/scoring-config", headers=OWNER, json={"category_weights": {"project_originality": 0}}
+    )
+    assert response.status_code == 200
+    assert response.json()["config"]["category_weights"] == {
+        "resume_skills": 31.25,
+        "github_code_quality": 37.5,
+        "project_originality": 0.0,
+        "documentation_quality": 12.5,
+        "engineering_practices": 18.75,
+    }
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"category_weights": {"resume_skills": -1, "github_code_quality": 2}},
+        {
+            "category_weights": {
+                "resume_skills": 0,
+                "github_code_quality": 0,
+                "project_originality": 0,
+                "documentation_quality": 0,
+                "engineering_practices": 0,
+            }
+        },
+        {"resume_subweights": {"required_skills": 2, "experience_fit": -1}},
+        {"resume_subweights": {"required_skills": 0, "experience_fit": 0, "nice_to_have": 0}},
+        {"category_weights": {"unknown": 1}},
+    ],
+)
+def test_scoring_config_rejects_invalid_weights(client: TestClient, body: dict) -> None:
+    response = client.put("/dashboard/jobs/job/scoring-config", headers=OWNER, json=body)
+    assert response.status_code == 400
+    assert api._repositories().scoring_configs.get("job").version == 0
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import random
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from hirerank.dashboard.models import CandidateApplication
+from hirerank.dashboard.service import list_candidates_for_job
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.engine import ResumeAnalysis, compute_scores_batch
+from hirerank.storage.backends import Repositories, open_repositories
+
+STATUSES = ["new", "shortlisted", "rejected"]
+
+
+def _populate(storage_dir: Path, backend: str) -> Repositories:
+    repositories = open_repositories(storage_dir, backend)
+    rng = random.Random(11)
+    applications = [
+        CandidateApplication(
+            f"a{index}", f"c{index}", "job", "owner", rng.choice(STATUSES), rng.sample(["py", "go", "js"], 2)
+        )
+        for index in range(120)
+    ]
+    repositories.applications.save_many(applications)
+    scored = [f"c{index}" for index in range(120) if index % 4]
+    resumes = [ResumeAnalysis(rng.randint(0, 3), 3, 0, 0, rng.uniform(0, 6), 3.0) for _ in scored]
+    config = ScoringConfig(job_id="job")
+    repositories.scores.save_many(compute_scores_batch(config, resumes, [None] * len(scored), scored))
+    # Status updates rewrite existing applications; their first-save position must not move.
+    repositories.applications.save_many(
+        replace(application, status=rng.choice(STATUSES)) for application in applications if rng.random() < 0.4
+    )
+    return repositories
+
+
+def _pages(repositories: Repositories, params: Dict[str, object], on_first_page=None) -> List[List[str]]:
+    pages: List[List[str]] = []
+    cursor: Optional[str] = None
+    while True:
+        page = list_candidates_for_job(
+            "owner", "job", repositories.applications, repositories.scores, cursor=cursor, **params
+        )
+        pages.append([entry.candidate_id for entry in page.candidates])
+        if len(pages) == 1 and on_first_page is not None:
+            on_first_page(repositories, page.candidates)
+        cursor = page.next_cursor
+        if not cursor:
+            return pages
+
+
+@pytest.fixture
+def backends(tmp_path: Path) -> Dict[str, Repositories]:
+    return {backend: _populate(tmp_path / backend, backend) for backend in ("json", "sqlite")}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"limit": 7},
+        {"limit": 13, "status": "shortlisted"},
+        {"limit": 10, "skills": ["py"]},
+        {"limit": 9, "skills": ["py", "go"], "skill_match": "all"},
+        {"limit": 11, "min_score": 40.0},
+    ],
+)
+def test_cursor_pages_match_across_backends_after_status_updates(backends: Dict[str, Repositories], params) -> None:
+    json_pages = _pages(backends["json"], params)
+    sqlite_pages = _pages(backends["sqlite"], params)
+    assert json_pages == sqlite_pages
+    listed = [candidate_id for page in json_pages for candidate_id in page]
+    assert len(listed) == len(set(listed))
+
+
+def test_updates_between_pages_do_not_repeat_candidates(backends: Dict[str, Repositories]) -> None:
+    def touch(repositories: Repositories, entries) -> None:
+        # Re-save everything already shown; neither backend may hand those out again.
+        repositories.applications.save_many(
+            replace(repositories.applications.get("owner", "job", f"a{entry.candidate_id[1:]}"), status="shortlisted")
+            for entry in entries
+        )
+
+    json_pages = _pages(backends["json"], {"limit": 25}, on_first_page=touch)
+    sqlite_pages = _pages(backends["sqlite"], {"limit": 25}, on_first_page=touch)
+    assert json_pages == sqlite_pages
+    listed = [candidate_id for page in json_pages for candidate_id in page]
+    assert sorted(listed) == sorted(f"c{index}" for index in range(120))
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import List, Optional
+
+import pytest
+
+from hirerank.scoring.config import CategoryWeights, ResumeSubWeights, ScoringConfig
+from hirerank.scoring.engine import (
+    GitHubAnalysis,
+    ResumeAnalysis,
+    compute_score,
+    compute_scores_batch,
+    rescore_batch,
+    score_fingerprint,
+    score_fingerprints,
+)
+from hirerank.scoring.matrix import component_matrix
+from hirerank.scoring.models import ScoreBatch
+
+NAN = float("nan")
+INF = float("inf")
+
+
+def _random_resume(rng: random.Random) -> Optional[ResumeAnalysis]:
+    if rng.random() < 0.2:
+        return None
+    return ResumeAnalysis(
+        required_skills_matched=rng.randint(0, 6),
+        required_skills_total=rng.randint(0, 6),
+        nice_to_have_matched=rng.randint(0, 4),
+        nice_to_have_total=rng.randint(0, 4),
+        experience_years=rng.uniform(0, 15),
+        required_experience_years=rng.choice([0.0, rng.uniform(0, 10)]),
+    )
+
+
+def _random_github(rng: random.Random) -> Optional[GitHubAnalysis]:
+    if rng.random() < 0.3:
+        return None
+    projects = [
+        {
+            "originality_score": rng.choice([None, rng.uniform(-10, 110)]),
+            "is_tutorial": rng.random() < 0.3,
+            "tutorial_indicators": rng.sample(["course", "fork", "template"], rng.randint(0, 2)),
+            "green_flags": rng.sample(["tests", "ci"], rng.randint(0, 2)),
+        }
+        for _ in range(rng.randint(0, 3))
+    ]
+    return GitHubAnalysis(
+        code_quality_score=rng.uniform(-10, 110),
+        documentation_score=rng.uniform(0, 100),
+        engineering_practices_score=rng.uniform(0, 100),
+        projects=projects,
+    )
+
+
+def _assert_same(scalar_results: List, batch_results: List) -> None:
+    for scalar, batch in zip(scalar_results, batch_results):
+        assert batch.total_score == pytest.approx(scalar.total_score)
+        assert math.isfinite(batch.total_score)
+        scalar_breakdown = scalar.breakdown.as_dict()
+        batch_breakdown = batch.breakdown.as_dict()
+        assert batch_breakdown.keys() == scalar_breakdown.keys()
+        for category, details in scalar_breakdown.items():
+            other = batch_breakdown[category]
+            if details["score"] is None:
+                assert other["score"] is None
+            else:
+                assert other["score"] == pytest.approx(details["score"])
+            assert other["weighted_score"] == pytest.approx(details["weighted_score"])
+            assert other["template"] == details["template"]
+            # repr so NaN parameters compare equal to themselves.
+            assert repr(other.get("params")) == repr(details.get("params"))
+            if "subscores" in details:
+                assert other["subscores"] == pytest.approx(details["subscores"])
+        assert batch.fingerprint == scalar.fingerprint
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        ScoringConfig(job_id="job"),
+        ScoringConfig(
+            job_id="job",
+            category_weights=CategoryWeights(resume_skills=3, github_code_quality=1, project_originality=0),
+            resume_subweights=ResumeSubWeights(required_skills=1, experience_fit=1, nice_to_have=0),
+        ),
+    ],
+)
+def test_batch_matches_scalar_on_random_inputs(config: ScoringConfig) -> None:
+    rng = random.Random(7)
+    resumes = [_random_resume(rng) for _ in range(300)]
+    githubs = [_random_github(rng) for _ in range(300)]
+    candidate_ids = [f"c{index}" for index in range(300)]
+
+    scalar = [
+        compute_score(candidate_id, config.job_id, config, resume, github)
+        for candidate_id, resume, github in zip(candidate_ids, resumes, githubs)
+    ]
+    _assert_same(scalar, compute_scores_batch(config, resumes, githubs, candidate_ids))
+
+
+@pytest.mark.parametrize(
+    "resume",
+    [
+        ResumeAnalysis(1, 1, 0, 0, NAN, 3.0),
+        ResumeAnalysis(1, 1, 0, 0, 4.0, NAN),
+        ResumeAnalysis(1, 1, NAN, NAN, 4.0, 3.0),
+        ResumeAnalysis(NAN, NAN, 0, 0, 4.0, 3.0),
+        ResumeAnalysis(2, 3, 1, 2, INF, 3.0),
+        ResumeAnalysis(2, 3, 1, 2, -INF, 3.0),
+    ],
+)
+def test_batch_matches_scalar_on_non_finite_inputs(resume: ResumeAnalysis) -> None:
+    config = ScoringConfig(job_id="job")
+    github = GitHubAnalysis(70.0, 60.0, 50.0, [{"originality_score": 80.0}])
+    scalar = [compute_score("c1", "job", config, resume, github), compute_score("c2", "job", config, resume, None)]
+    batch = compute_scores_batch(config, [resume, resume], [github, None], ["c1", "c2"])
+    _assert_same(scalar, batch)
+
+
+def test_nan_github_scores_clamp_like_scalar() -> None:
+    config = ScoringConfig(job_id="job")
+    github = GitHubAnalysis(NAN, 60.0, NAN, [])
+    scalar = compute_score("c1", "job", config, None, github)
+    batch = compute_scores_batch(config, [None], [github], ["c1"])
+    _assert_same([scalar], batch)
+
+
+def test_fingerprints_follow_every_scored_input() -> None:
+    config = ScoringConfig(job_id="job")
+    resume = ResumeAnalysis(2, 3, 1, 2, 4.0, 3.0)
+    project = {"originality_score": 80.0, "is_tutorial": True, "tutorial_indicators": ["course"], "green_flags": []}
+    variants = [
+        (resume, None),
+        (None, GitHubAnalysis(70.0, 60.0, 50.0, [])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [project])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [dict(project, originality_score=81.0)])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [dict(project, originality_score=NAN)])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [dict(project, originality_score=None)])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [dict(project, is_tutorial=False)])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [dict(project, tutorial_indicators=["fork"])])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [dict(project, green_flags=["tests"])])),
+        (resume, GitHubAnalysis(70.0, 60.0, 50.0, [project, project])),
+        (ResumeAnalysis(2, 3, 1, 2, 4.5, 3.0), None),
+    ]
+    fingerprints = score_fingerprints(config, [resume for resume, _ in variants], [github for _, github in variants])
+    assert fingerprints == [score_fingerprint(config, resume, github) for resume, github in variants]
+    assert len(set(fingerprints)) == len(variants)
+
+
+def test_batch_payloads_match_the_results_they_pack() -> None:
+    rng = random.Random(3)
+    config = ScoringConfig(job_id="job")
+    resumes = [_random_resume(rng) for _ in range(60)]
+    githubs = [_random_github(rng) for _ in range(60)]
+    batch = compute_scores_batch(config, resumes, githubs, [f"c{index}" for index in range(60)])
+    merged = ScoreBatch.concat([batch[:20], list(batch[20:])])
+
+    expected = [result.as_dict() for result in batch]
+    # repr so NaN parameters compare equal to themselves.
+    assert repr(list(batch.payloads())) == repr(expected)
+    assert repr(list(merged.payloads())) == repr(expected)
+
+
+def test_rescore_matches_scoring_under_the_new_config() -> None:
+    rng = random.Random(5)
+    resumes = [_random_resume(rng) for _ in range(200)]
+    githubs = [_random_github(rng) for _ in range(200)]
+    candidate_ids = [f"c{index}" for index in range(200)]
+    old = ScoringConfig(job_id="job")
+    new = ScoringConfig(
+        job_id="job",
+        category_weights=CategoryWeights(resume_skills=3, github_code_quality=1, project_originality=0),
+        resume_subweights=ResumeSubWeights(required_skills=1, experience_fit=1, nice_to_have=0),
+        version=2,
+    )
+    stored = compute_scores_batch(old, resumes, githubs, candidate_ids)
+    fresh = [
+        compute_score(candidate_id, "job", new, resume, github)
+        for candidate_id, resume, github in zip(candidate_ids, resumes, githubs)
+    ]
+
+    rescored = rescore_batch(list(stored), new)
+    assert rescored.total_scores == [result.total_score for result in fresh]
+    # repr so NaN parameters compare equal to themselves.
+    assert repr([result.breakdown.as_dict() for result in rescored]) == repr(
+        [result.breakdown.as_dict() for result in fresh]
+    )
+    assert rescored.fingerprints == [result.fingerprint for result in fresh]
+    assert rescored.config_versions == [2] * len(fresh)
+    assert component_matrix(stored).totals(new).tolist() == rescored.total_scores
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from hirerank.scoring.config import ScoringConfig
+from hirerank.scoring.engine import ResumeAnalysis, compute_score
+from hirerank.storage.files import shard_filename
+from hirerank.storage.scoring_repository import ScoringRepository
+
+CONFIG = ScoringConfig(job_id="job")
+
+
+def _save_round(repository: ScoringRepository, matched: int) -> None:
+    repository.save_many(
+        compute_score(f"c{index}", "job", CONFIG, ResumeAnalysis((index + matched) % 5, 4, 0, 0, 2.0, 2.0))
+        for index in range(10)
+    )
+
+
+def test_compaction_keeps_the_latest_score_per_candidate(tmp_path: Path) -> None:
+    writer = ScoringRepository(tmp_path, compaction_min_records=15)
+    reader = ScoringRepository(tmp_path)
+    _save_round(writer, 0)
+    assert len(reader.list_by_job("job")) == 10
+
+    _save_round(writer, 1)
+    _save_round(writer, 2)
+    log_path = tmp_path / shard_filename("job", ".jsonl")
+    # 30 lines with 20 stale passes both thresholds, so the log is back to one line per candidate.
+    assert len(log_path.read_bytes().splitlines()) == 10
+
+    expected = {candidate_id: result.total_score for candidate_id, result in writer.list_by_job("job").items()}
+    assert {candidate_id: result.total_score for candidate_id, result in reader.list_by_job("job").items()} == expected
+    assert list(reader.iter_ranked("job")) == sorted(expected.items(), key=lambda item: (-item[1], item[0]))
+
+    _save_round(writer, 3)
+    assert reader.get_totals("job", ["c0"]) == writer.get_totals("job", ["c0"])
+
+
+def test_json_shards_become_logs(tmp_path: Path) -> None:
+    result = compute_score("c1", "job", CONFIG, ResumeAnalysis(2, 4, 0, 0, 2.0, 2.0))
+    (tmp_path / "manifest.json").write_text(json.dumps({"job": shard_filename("job")}), encoding="utf-8")
+    (tmp_path / shard_filename("job")).write_text(json.dumps({"c1": result.as_dict()}), encoding="utf-8")
+
+    repository = ScoringRepository(tmp_path)
+    assert repository.get_totals("job", ["c1"]) == {"c1": result.total_score}
+    assert repository.list_job_ids() == ["job"]
+    assert not (tmp_path / shard_filename("job")).exists()
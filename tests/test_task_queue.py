@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import multiprocessing
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from hirerank.background_jobs.scoring import ScoringCoordinator
+from hirerank.background_jobs.worker import (
+    IMPORT_TASK,
+    Requeue,
+    Worker,
+    build_failure_handlers,
+    build_task_handlers,
+)
+from hirerank.imports.models import CandidateImportJob, CandidateImportResult
+from hirerank.imports.service import ImportSettings
+from hirerank.scoring.engine import ResumeAnalysis, compute_score
+from hirerank.scoring.config import ScoringConfig
+from hirerank.storage.backends import Repositories, open_repositories
+from hirerank.storage.import_repository import CandidateImportRepository
+from hirerank.storage.scoring_repository import ScoringRepository
+from hirerank.storage.sqlite import SqliteDatabase, SqliteTaskQueue
+
+EXPIRED = timedelta(seconds=-1)
+LEASE = timedelta(minutes=5)
+
+
+@pytest.fixture
+def queue(tmp_path: Path) -> SqliteTaskQueue:
+    return SqliteTaskQueue(SqliteDatabase(tmp_path / "tasks.sqlite3"))
+
+
+def _import_job(import_id: str) -> CandidateImportJob:
+    return CandidateImportJob(
+        import_id=import_id,
+        owner_id="owner",
+        job_id="job",
+        status="queued",
+        headers=["name", "email"],
+        mapping={"name": "name", "email": "email"},
+        total_rows=1,
+        processed_rows=0,
+        success_count=0,
+        failure_count=0,
+    )
+
+
+def test_expired_lease_is_claimed_by_another_worker(queue: SqliteTaskQueue) -> None:
+    task = queue.enqueue("noop", {})
+    assert queue.claim("w1", EXPIRED).task_id == task.task_id
+
+    reclaimed = queue.claim("w2", LEASE)
+    assert reclaimed.task_id == task.task_id
+    assert reclaimed.attempts == 2
+    # The first worker lost its lease, so it can neither extend nor complete the task.
+    assert not queue.extend(task.task_id, "w1", LEASE)
+    queue.complete(task.task_id, "w1")
+    assert queue.extend(task.task_id, "w2", LEASE)
+    queue.complete(task.task_id, "w2")
+    assert queue.claim("w3", LEASE) is None
+
+
+def test_failed_task_retries_after_its_delay(queue: SqliteTaskQueue) -> None:
+    task = queue.enqueue("noop", {})
+    queue.claim("w1", LEASE)
+    queue.fail(task.task_id, "w1", "boom", timedelta(hours=1))
+    assert queue.claim("w1", LEASE) is None
+
+    task = queue.enqueue("noop", {}, max_attempts=3)
+    queue.claim("w1", LEASE)
+    queue.fail(task.task_id, "w1", "boom", timedelta(0))
+    retried = queue.claim("w1", LEASE)
+    assert retried.task_id == task.task_id
+    assert retried.attempts == 2
+    assert retried.last_error == "boom"
+
+
+def test_queue_position_counts_from_one_for_the_next_claim(queue: SqliteTaskQueue) -> None:
+    for ref in ("first", "second", "third"):
+        queue.enqueue("noop", {}, ref=ref)
+    assert [queue.queue_position(ref) for ref in ("first", "second", "third")] == [1, 2, 3]
+
+    queue.claim("w1", LEASE)
+    assert [queue.queue_position(ref) for ref in ("first", "second", "third")] == [0, 1, 2]
+    assert queue.queue_position("unknown") is None
+
+
+def _worker(queue: SqliteTaskQueue, handler, failures: List[str]) -> Worker:
+    return Worker(
+        queue,
+        {"flaky": handler},
+        worker_id="w1",
+        retry_delay=timedelta(0),
+        failure_handlers={"flaky": lambda payload, error: failures.append(error)},
+    )
+
+
+def test_worker_gives_up_after_max_attempts(queue: SqliteTaskQueue) -> None:
+    calls: List[int] = []
+    failures: List[str] = []
+
+    def handler(payload: Dict[str, object]) -> Optional[Requeue]:
+        calls.append(1)
+        raise RuntimeError(f"attempt {len(calls)}")
+
+    queue.enqueue("flaky", {}, max_attempts=3)
+    assert _worker(queue, handler, failures).run_until_idle() == 3
+    assert len(calls) == 3
+    assert failures == ["attempt 3"]
+    assert queue.claim("w1", LEASE) is None
+
+
+def test_worker_runs_failure_handler_when_last_lease_expires(queue: SqliteTaskQueue) -> None:
+    failures: List[str] = []
+    queue.enqueue("flaky", {}, max_attempts=2)
+    queue.claim("dead-1", EXPIRED)
+    queue.claim("dead-2", EXPIRED)
+
+    worker = _worker(queue, lambda payload: pytest.fail("exhausted task ran again"), failures)
+    assert worker.run_until_idle() == 1
+    assert failures == ["Lease expired."]
+    assert queue.claim("w1", LEASE) is None
+
+
+def test_exhausted_import_task_marks_the_import_failed(tmp_path: Path) -> None:
+    repositories: Repositories = open_repositories(tmp_path, "json")
+    source = tmp_path / "upload.csv"
+    source.write_text("name,email\n", encoding="utf-8")
+    repositories.imports.create(_import_job("imp-1"))
+    repositories.tasks.enqueue(
+        IMPORT_TASK,
+        {"import_id": "imp-1", "owner_id": "owner", "job_id": "job", "source": str(source)},
+        max_attempts=2,
+    )
+
+    def crash(payload: Dict[str, object]) -> Optional[Requeue]:
+        raise OSError("disk full")
+
+    worker = Worker(
+        repositories.tasks,
+        {IMPORT_TASK: crash},
+        retry_delay=timedelta(0),
+        failure_handlers=build_failure_handlers(repositories),
+    )
+    assert worker.run_until_idle() == 2
+
+    job = repositories.imports.get(owner_id="owner", job_id="job", import_id="imp-1")
+    assert job.status == "failed"
+    assert job.error_message == "disk full"
+    assert not source.exists()
+
+
+def _queue_import(repositories: Repositories, source: Path) -> None:
+    job = _import_job("imp-1")
+    job.total_rows = 0
+    repositories.imports.create(job)
+    repositories.tasks.enqueue(
+        IMPORT_TASK,
+        {"import_id": "imp-1", "owner_id": "owner", "job_id": "job", "source": str(source)},
+        max_attempts=3,
+    )
+
+
+def _import_worker(repositories: Repositories) -> Worker:
+    coordinator = ScoringCoordinator(repositories.scoring_configs, repositories.scores)
+    return Worker(
+        repositories.tasks,
+        build_task_handlers(repositories, coordinator, ImportSettings(task_rows=2)),
+        retry_delay=timedelta(0),
+        failure_handlers=build_failure_handlers(repositories),
+    )
+
+
+def test_transient_import_error_retries_from_the_checkpoint(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    repositories = open_repositories(tmp_path, "json")
+    source = tmp_path / "upload.csv"
+    source.write_text("name,email\n" + "".join(f"n{row},n{row}@example.com\n" for row in range(5)), encoding="utf-8")
+    _queue_import(repositories, source)
+
+    save_many = repositories.applications.save_many
+    calls: List[int] = []
+
+    def flaky_save_many(applications) -> None:
+        calls.append(1)
+        if len(calls) == 2:
+            raise OSError("database is locked")
+        save_many(applications)
+
+    monkeypatch.setattr(repositories.applications, "save_many", flaky_save_many)
+    worker = _import_worker(repositories)
+    assert worker.run_once()
+    assert worker.run_once()
+    # The failed slice left the job processing and the upload in place for the retry.
+    job = repositories.imports.get(owner_id="owner", job_id="job", import_id="imp-1")
+    assert (job.status, job.total_rows, job.processed_rows) == ("processing", 5, 2)
+    assert source.exists()
+
+    worker.run_until_idle()
+    job = repositories.imports.get(owner_id="owner", job_id="job", import_id="imp-1")
+    assert (job.status, job.processed_rows, job.success_count) == ("completed", 5, 5)
+    assert len(repositories.applications.list_by_job("owner", "job")) == 5
+    assert not source.exists()
+
+
+def test_unreadable_import_data_fails_the_import(tmp_path: Path) -> None:
+    repositories = open_repositories(tmp_path, "json")
+    source = tmp_path / "upload.csv"
+    # A field past the csv module's size limit is a data error, not worth retrying.
+    source.write_bytes(b"name,email\nAda,ada@example.com\n" + b"x" * 200_000 + b",b@example.com\n")
+    _queue_import(repositories, source)
+
+    assert _import_worker(repositories).run_until_idle() == 1
+    job = repositories.imports.get(owner_id="owner", job_id="job", import_id="imp-1")
+    assert job.status == "failed"
+    assert "field larger than field limit" in job.error_message
+    assert not source.exists()
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_import_can_be_read_without_its_results(tmp_path: Path, backend: str) -> None:
+    repositories = open_repositories(tmp_path, backend)
+    repositories.imports.create(_import_job("imp-1"))
+    repositories.imports.append_results("imp-1", [CandidateImportResult(1, "success", "c1")])
+
+    keys = {"owner_id": "owner", "job_id": "job", "import_id": "imp-1"}
+    assert [result.candidate_id for result in repositories.imports.get(**keys).results] == ["c1"]
+    job = repositories.imports.get(**keys, include_results=False)
+    assert (job.import_id, job.results) == ("imp-1", [])
+
+
+def _save_imports(storage_path: Path, prefix: str, count: int) -> None:
+    repository = CandidateImportRepository(storage_path)
+    for index in range(count):
+        repository.create(_import_job(f"{prefix}-{index}"))
+        repository.update(_import_job(f"{prefix}-{index}"))
+
+
+def _save_scores(storage_dir: Path, prefix: str, count: int) -> None:
+    repository = ScoringRepository(storage_dir)
+    config = ScoringConfig(job_id="job")
+    for index in range(count):
+        candidate_id = f"{prefix}-{index}"
+        repository.save(compute_score(candidate_id, "job", config, ResumeAnalysis(1, 2, 0, 0, 3.0, 2.0), None))
+
+
+@pytest.mark.parametrize("target", [_save_imports, _save_scores])
+def test_json_writers_in_separate_processes_keep_every_update(tmp_path: Path, target) -> None:
+    path = tmp_path / ("candidate_imports.json" if target is _save_imports else "scores")
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=target, args=(path, f"p{index}", 25)) for index in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    if target is _save_imports:
+        saved = {job.import_id for job in CandidateImportRepository(path).list_by_job("owner", "job")}
+    else:
+        saved = set(ScoringRepository(path).list_by_job("job"))
+    assert saved == {f"p{index}-{row}" for index in range(4) for row in range(25)}